@@ -4,11 +4,11 @@ Includes travel-specific tools + YouTube search + web search
 """
 import os
 import json
-from typing import Dict, List, Any, Optional, TypedDict
+from typing import Dict, Iterator, List, Any, Optional, TypedDict
 from openai import OpenAI
 from knowledge_graph import TravelKnowledgeGraph
 from retriever import HybridRetriever, SearchResult
-from reranker import LLMReranker, RankedResult
+from reranker import create_reranker, RankedResult, SearchHit
 from tools.serper_search import SerperSearchTool, search_web, search_youtube
 
 
@@ -38,13 +38,14 @@ class TravelRAGAgent:
         knowledge_graph: TravelKnowledgeGraph,
         retriever: Optional[HybridRetriever],
         openai_api_key: str,
-        model: str = "gpt-4o-mini"
+        model: str = "gpt-4o-mini",
+        openai_client: Optional[OpenAI] = None
     ):
         self.kg = knowledge_graph
         self.retriever = retriever
-        self.client = OpenAI(api_key=openai_api_key)
+        self.client = openai_client or OpenAI(api_key=openai_api_key)
         self.model = model
-        self.reranker = LLMReranker(openai_api_key)
+        self.reranker = create_reranker(openai_api_key, openai_client=self.client)
 
         # Tools available to the agent
         self.tools = [
@@ -354,11 +355,11 @@ class TravelRAGAgent:
                 results = self.retriever.search_hybrid(query, top_k=top_k)
 
                 docs = [
-                    {
-                        "content": r.document.content,
-                        "metadata": r.document.metadata,
-                        "score": r.score
-                    }
+                    SearchHit(
+                        content=r.document.content,
+                        metadata=r.document.metadata,
+                        score=r.score
+                    )
                     for r in results
                 ]
 
@@ -578,12 +579,13 @@ class TravelRAGAgent:
 
         return str(data)
 
-    def process_query(self, query: str) -> str:
+    def _run_tool_step(self, query: str):
         """
-        Process a user query using the agent workflow:
-        1. Let LLM decide which tools to use
-        2. Execute tools
-        3. Generate response based on tool results
+        Let the LLM decide which tools to use and execute them.
+
+        Returns:
+            (messages, direct_answer): direct_answer is set when no tools were
+            needed; otherwise messages is ready for the final generation call.
         """
         messages = [
             {
@@ -628,11 +630,10 @@ Always represent yourself as Shri Travels in your responses."""
 
         # If no tools needed, return direct response
         if not tool_calls:
-            return assistant_message.content or "I couldn't process that request."
+            return messages, assistant_message.content or "I couldn't process that request."
 
         # Execute all tool calls
         messages.append(assistant_message)
-        tool_results = []
 
         for tool_call in tool_calls:
             tool_name = tool_call.function.name
@@ -644,7 +645,6 @@ Always represent yourself as Shri Travels in your responses."""
             # Execute tool
             result = self._execute_tool(tool_name, arguments)
             formatted_result = self._format_tool_result(tool_name, result)
-            tool_results.append(formatted_result)
 
             messages.append({
                 "role": "tool",
@@ -652,6 +652,19 @@ Always represent yourself as Shri Travels in your responses."""
                 "content": formatted_result
             })
 
+        return messages, None
+
+    def process_query(self, query: str) -> str:
+        """
+        Process a user query using the agent workflow:
+        1. Let LLM decide which tools to use
+        2. Execute tools
+        3. Generate response based on tool results
+        """
+        messages, direct_answer = self._run_tool_step(query)
+        if direct_answer is not None:
+            return direct_answer
+
         # Second call - generate final response
         final_response = self.client.chat.completions.create(
             model=self.model,
@@ -660,6 +673,31 @@ Always represent yourself as Shri Travels in your responses."""
 
         return final_response.choices[0].message.content or "I couldn't generate a response."
 
+    def process_query_stream(self, query: str) -> Iterator[str]:
+        """
+        Same workflow as process_query, but the final answer is streamed:
+        yields text deltas as the model generates them.
+        """
+        messages, direct_answer = self._run_tool_step(query)
+        if direct_answer is not None:
+            yield direct_answer
+            return
+
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            stream=True
+        )
+
+        produced = False
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                produced = True
+                yield chunk.choices[0].delta.content
+
+        if not produced:
+            yield "I couldn't generate a response."
+
 
 class SimpleAgent:
     """
@@ -671,18 +709,24 @@ class SimpleAgent:
         self,
         knowledge_graph: TravelKnowledgeGraph,
         retriever: Optional[HybridRetriever],
-        openai_api_key: str
+        openai_api_key: str,
+        openai_client: Optional[OpenAI] = None
     ):
         self.agent = TravelRAGAgent(
             knowledge_graph=knowledge_graph,
             retriever=retriever,
-            openai_api_key=openai_api_key
+            openai_api_key=openai_api_key,
+            openai_client=openai_client
         )
 
     def query(self, question: str) -> str:
         """Process a question and return answer"""
         return self.agent.process_query(question)
 
+    def query_stream(self, question: str) -> Iterator[str]:
+        """Process a question and yield the answer as it is generated"""
+        return self.agent.process_query_stream(question)
+
 
 def create_agent(
     data_dir: str,
@@ -486,6 +486,16 @@ class TravelDataIngester:
 
             customers = self.extractor.extract_customers_from_text(content)
 
+            try:
+                self.kg.add_customers_parallel(customers)
+            except Exception as e:
+                # Re-add one at a time so only the bad records are counted as failures
+                print(f"  Bulk customer load failed ({e}), adding individually")
+            else:
+                for customer in customers:
+                    print(f"  Ingested customer: {customer.name}")
+                return len(customers), 0
+
             success = 0
             errors = 0
 
@@ -3,13 +3,32 @@ Knowledge Graph using NetworkX for Travel Business
 Entities: Customers, Trips, Destinations, Hotels, Bookings, Packages
 """
 import networkx as nx
-from typing import Dict, List, Optional, Any
+import orjson
+import msgspec
+from typing import Dict, List, Optional, Any, Set, Iterator, Tuple, BinaryIO
 from models import (
     Customer, TripPackage, Destination, Hotel, Booking,
     TripProgress, BusinessSummary, TripStatus
 )
 from difflib import SequenceMatcher
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+import os
 import re
+import sys
+import threading
+import warnings
+from types import MappingProxyType
+
+
+def _trigrams(text: str) -> Set[str]:
+    """Character trigrams of a string (empty for strings shorter than 3 chars)"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Intern low-cardinality string attributes (statuses, room types, payment modes)"""
+    return sys.intern(value) if isinstance(value, str) else value
 
 
 class TravelKnowledgeGraph:
@@ -26,13 +45,33 @@ class TravelKnowledgeGraph:
         self.destination_index: Dict[str, str] = {}  # city_name -> node_id
         self.package_index: Dict[str, str] = {}  # package_id -> node_id
         self.hotel_index: Dict[str, str] = {}  # hotel_name -> node_id
+        self._location_index: Dict[str, Set[str]] = {}  # current_location -> customer node_ids
+        self._progress_by_customer: Dict[str, str] = {}  # customer node_id -> progress node_id
+        self._trigram_index: Dict[str, Set[str]] = {}  # name trigram -> normalized names
+        self._short_names: Set[str] = set()  # normalized names too short for trigrams
+        self._name_order: Dict[str, int] = {}  # normalized name -> position in customer_index
         self.business_summary: Optional[BusinessSummary] = None
+        self._type_counts: Counter = Counter()  # node type -> count
+        self._edge_count = 0
+        self._lock = threading.Lock()
+
+    def _add_node(self, node_id: str, **attrs):
+        """Add or update a node, keeping per-type counts current"""
+        if node_id not in self.graph:
+            self._type_counts[attrs.get("type", "unknown")] += 1
+        self.graph.add_node(node_id, **attrs)
+
+    def _add_edge(self, source: str, target: str, relation: str):
+        """Add or update an edge, keeping the edge count current"""
+        if not self.graph.has_edge(source, target):
+            self._edge_count += 1
+        self.graph.add_edge(source, target, relation=relation)
 
     def add_customer(self, customer: Customer) -> str:
         """Add a customer node to the graph"""
         node_id = f"customer:{customer.customer_id}"
 
-        self.graph.add_node(
+        self._add_node(
             node_id,
             type="customer",
             customer_id=customer.customer_id,
@@ -53,31 +92,93 @@ class TravelKnowledgeGraph:
 
         # Add name variations for fuzzy matching
         self._index_name_variations(customer.name, customer.name_normalized)
+        self._index_trigrams(customer.name_normalized)
 
         # Add booking if exists
         if customer.booking:
             booking_id = self.add_booking(customer.booking, node_id)
-            self.graph.add_edge(node_id, booking_id, relation="HAS_BOOKING")
+            self._add_edge(node_id, booking_id, "HAS_BOOKING")
 
         # Add trip progress if exists
         if customer.trip_progress:
             progress_id = self.add_trip_progress(customer.trip_progress, node_id)
-            self.graph.add_edge(node_id, progress_id, relation="HAS_TRIP_PROGRESS")
+            self._add_edge(node_id, progress_id, "HAS_TRIP_PROGRESS")
 
         # Add preferences if exists
         if customer.preferences:
-            self.graph.nodes[node_id]["preferences"] = customer.preferences.model_dump()
+            self.graph.nodes[node_id]["preferences"] = msgspec.structs.asdict(customer.preferences)
 
         # Add emergency contact if exists
         if customer.emergency_contact:
-            self.graph.nodes[node_id]["emergency_contact"] = customer.emergency_contact.model_dump()
+            self.graph.nodes[node_id]["emergency_contact"] = msgspec.structs.asdict(customer.emergency_contact)
 
         return node_id
 
-    def _index_name_variations(self, name: str, normalized: str):
-        """Index various forms of the name for fuzzy matching"""
-        self.name_variations[normalized] = normalized
+    def add_customers_parallel(self, customers: List[Customer], workers: Optional[int] = None) -> List[str]:
+        """
+        Bulk-add customers, building per-thread shards that are merged under a lock.
+        Only parallel on free-threaded Python builds; with the GIL enabled threads
+        would just contend, so customers are added sequentially instead.
+        """
+        workers = workers or os.cpu_count() or 1
+        gil_enabled = getattr(sys, "_is_gil_enabled", lambda: True)()
+
+        if gil_enabled or workers <= 1 or len(customers) < 2:
+            return [self.add_customer(customer) for customer in customers]
+
+        # Partition by customer_id so a customer and its booking/progress stay in one shard
+        partitions: List[List[Customer]] = [[] for _ in range(workers)]
+        for customer in customers:
+            partitions[hash(customer.customer_id) % workers].append(customer)
+
+        def build_shard(partition: List[Customer]) -> "TravelKnowledgeGraph":
+            shard = TravelKnowledgeGraph()
+            for customer in partition:
+                shard.add_customer(customer)
+            return shard
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            shards = list(executor.map(build_shard, [p for p in partitions if p]))
+
+        with self._lock:
+            for shard in shards:
+                self._merge_shard(shard)
+
+        return [f"customer:{customer.customer_id}" for customer in customers]
+
+    def _merge_shard(self, shard: "TravelKnowledgeGraph"):
+        """Merge a customer shard built by add_customers_parallel into this graph"""
+        for node_id, data in shard.graph.nodes(data=True):
+            if node_id not in self.graph:
+                self._type_counts[data.get("type", "unknown")] += 1
+        for source, target in shard.graph.edges():
+            if not self.graph.has_edge(source, target):
+                self._edge_count += 1
+
+        # Customers whose progress is being replaced leave their old location
+        for customer_id, progress_id in shard._progress_by_customer.items():
+            if progress_id in self.graph:
+                old_location = (self.graph.nodes[progress_id].get("current_location") or "").lower()
+                self._location_index.get(old_location, set()).discard(customer_id)
+
+        self.graph.update(shard.graph)
+        self.customer_index.update(shard.customer_index)
+        for normalized in shard.customer_index:
+            self._name_order.setdefault(normalized, len(self._name_order))
+        self.customer_phone_index.update(shard.customer_phone_index)
+        self.name_variations.update(shard.name_variations)
+        self._progress_by_customer.update(shard._progress_by_customer)
+        self._short_names.update(shard._short_names)
+        for location, node_ids in shard._location_index.items():
+            self._location_index.setdefault(location, set()).update(node_ids)
+        for trigram, names in shard._trigram_index.items():
+            self._trigram_index.setdefault(trigram, set()).update(names)
 
+    def _index_name_variations(self, name: str, normalized: str):
+        """
+        Index various forms of the name for fuzzy matching.
+        The full normalized name is already reachable through customer_index.
+        """
         parts = name.split()
         if parts:
             # First name only
@@ -87,15 +188,20 @@ class TravelKnowledgeGraph:
             # First + Last name
             self.name_variations[f"{parts[0].lower()} {parts[-1].lower()}"] = normalized
 
-        # Handle customer ID lookup
-        if normalized.startswith("cust"):
-            self.name_variations[normalized] = normalized
+    def _index_trigrams(self, normalized: str):
+        """Index name trigrams for the partial-match fallback in find_customer"""
+        self._name_order.setdefault(normalized, len(self._name_order))
+        trigrams = _trigrams(normalized)
+        if not trigrams:
+            self._short_names.add(normalized)
+        for trigram in trigrams:
+            self._trigram_index.setdefault(trigram, set()).add(normalized)
 
     def add_booking(self, booking: Booking, customer_id: str) -> str:
         """Add a booking node connected to a customer"""
         booking_id = f"booking:{booking.booking_id}"
 
-        self.graph.add_node(
+        self._add_node(
             booking_id,
             type="booking",
             booking_id=booking.booking_id,
@@ -105,11 +211,11 @@ class TravelKnowledgeGraph:
             travel_end_date=booking.travel_end_date,
             num_travelers=booking.num_travelers,
             travelers=booking.travelers,
-            room_type=booking.room_type,
+            room_type=_intern(booking.room_type),
             total_amount=booking.total_amount,
-            payment_status=booking.payment_status.value,
+            payment_status=_intern(booking.payment_status.value),
             amount_paid=booking.amount_paid,
-            payment_mode=booking.payment_mode
+            payment_mode=_intern(booking.payment_mode)
         )
 
         return booking_id
@@ -118,27 +224,38 @@ class TravelKnowledgeGraph:
         """Add trip progress node"""
         progress_id = f"progress:{customer_id}"
 
-        self.graph.add_node(
+        # Drop the customer from their previous location when progress is updated
+        if progress_id in self.graph:
+            old_location = (self.graph.nodes[progress_id].get("current_location") or "").lower()
+            self._location_index.get(old_location, set()).discard(customer_id)
+
+        self._add_node(
             progress_id,
             type="trip_progress",
             current_day=progress.current_day,
             current_location=progress.current_location,
             current_hotel=progress.current_hotel,
             current_activities=progress.current_activities,
-            status=progress.status.value,
+            status=_intern(progress.status.value),
             completed_days=progress.completed_days
         )
 
+        location = (progress.current_location or "").lower()
+        self._location_index.setdefault(location, set()).add(customer_id)
+        self._progress_by_customer[customer_id] = progress_id
+
         return progress_id
 
     def add_destination(self, destination: Destination) -> str:
         """Add a destination node"""
-        node_id = f"destination:{destination.name.lower().replace(' ', '_')}"
+        name_lower = destination.name.lower()
+        node_id = f"destination:{name_lower.replace(' ', '_')}"
 
-        self.graph.add_node(
+        self._add_node(
             node_id,
             type="destination",
             name=destination.name,
+            name_lower=name_lower,
             state=destination.state,
             description=destination.description,
             famous_for=destination.famous_for,
@@ -148,14 +265,14 @@ class TravelKnowledgeGraph:
             tips=destination.tips
         )
 
-        self.destination_index[destination.name.lower()] = node_id
+        self.destination_index[name_lower] = node_id
         return node_id
 
     def add_package(self, package: TripPackage) -> str:
         """Add a package node"""
         node_id = f"package:{package.package_id}"
 
-        self.graph.add_node(
+        self._add_node(
             node_id,
             type="package",
             package_id=package.package_id,
@@ -177,34 +294,36 @@ class TravelKnowledgeGraph:
             dest_normalized = dest_name.lower()
             if dest_normalized in self.destination_index:
                 dest_id = self.destination_index[dest_normalized]
-                self.graph.add_edge(node_id, dest_id, relation="INCLUDES_DESTINATION")
+                self._add_edge(node_id, dest_id, "INCLUDES_DESTINATION")
 
         return node_id
 
     def add_hotel(self, hotel: Hotel) -> str:
         """Add a hotel node"""
-        node_id = f"hotel:{hotel.name.lower().replace(' ', '_')}"
+        name_lower = hotel.name.lower()
+        node_id = f"hotel:{name_lower.replace(' ', '_')}"
 
-        self.graph.add_node(
+        self._add_node(
             node_id,
             type="hotel",
             name=hotel.name,
+            name_lower=name_lower,
             city=hotel.city,
             address=hotel.address,
             phone=hotel.phone,
-            room_type=hotel.room_type,
+            room_type=_intern(hotel.room_type),
             amenities=hotel.amenities,
             check_in_time=hotel.check_in_time,
             check_out_time=hotel.check_out_time
         )
 
-        self.hotel_index[hotel.name.lower()] = node_id
+        self.hotel_index[name_lower] = node_id
 
         # Link hotel to destination/city
         city_normalized = hotel.city.lower()
         if city_normalized in self.destination_index:
             dest_id = self.destination_index[city_normalized]
-            self.graph.add_edge(node_id, dest_id, relation="LOCATED_IN")
+            self._add_edge(node_id, dest_id, "LOCATED_IN")
 
         return node_id
 
@@ -212,7 +331,7 @@ class TravelKnowledgeGraph:
         """Set the overall business summary"""
         self.business_summary = summary
 
-        self.graph.add_node(
+        self._add_node(
             "business:summary",
             type="business_summary",
             total_customers=summary.total_customers,
@@ -263,27 +382,64 @@ class TravelKnowledgeGraph:
             return self._get_customer_data(self.customer_index[best_match])
 
         # Partial match on full names
-        for normalized, node_id in self.customer_index.items():
-            if query_normalized in normalized or normalized in query_normalized:
-                return self._get_customer_data(node_id)
+        node_id = self._find_partial_name_match(query_normalized)
+        if node_id:
+            return self._get_customer_data(node_id)
 
         return None
 
+    def _find_partial_name_match(self, query_normalized: str) -> Optional[str]:
+        """
+        Find a customer whose normalized name contains, or is contained in, the query.
+        Candidates come from the trigram index, so only names sharing a trigram
+        with the query get the full substring check.
+        """
+        query_trigrams = _trigrams(query_normalized)
+        if not query_trigrams:
+            # Too short to use the trigram index
+            for normalized, node_id in self.customer_index.items():
+                if query_normalized in normalized or normalized in query_normalized:
+                    return node_id
+            return None
+
+        postings = [self._trigram_index.get(t, set()) for t in query_trigrams]
+
+        # Names containing the query must contain every query trigram
+        candidates = [n for n in set.intersection(*postings) if query_normalized in n]
+        # Names contained in the query share all of their trigrams with it
+        candidates += [n for n in set.union(*postings) if n in query_normalized]
+        # Names too short to have trigrams
+        candidates += [n for n in self._short_names if n in query_normalized]
+
+        if not candidates:
+            return None
+        # Earliest-added match wins, as with a scan of customer_index
+        return self.customer_index[min(candidates, key=self._name_order.__getitem__)]
+
     def _get_customer_data(self, node_id: str) -> Dict[str, Any]:
-        """Get full customer data including booking and trip progress"""
+        """
+        Get full customer data including booking and trip progress.
+        Booking and trip progress are read-only views over the graph attributes;
+        callers that need to modify them should copy them first.
+        """
         customer_data = dict(self.graph.nodes[node_id])
         customer_data["node_id"] = node_id
 
         # Get booking
         for _, target, data in self.graph.out_edges(node_id, data=True):
             if data.get("relation") == "HAS_BOOKING":
-                customer_data["booking"] = dict(self.graph.nodes[target])
+                customer_data["booking"] = MappingProxyType(self.graph.nodes[target])
 
             if data.get("relation") == "HAS_TRIP_PROGRESS":
-                customer_data["trip_progress"] = dict(self.graph.nodes[target])
+                customer_data["trip_progress"] = MappingProxyType(self.graph.nodes[target])
 
         return customer_data
 
+    def _iter_progress(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield (customer node_id, trip progress attrs) without rebuilding customer data"""
+        for node_id, progress_id in self._progress_by_customer.items():
+            yield node_id, self.graph.nodes[progress_id]
+
     def get_customer_by_phone(self, phone: str) -> Optional[Dict[str, Any]]:
         """Find customer by phone number"""
         normalized_phone = re.sub(r'[^0-9]', '', phone)[-10:]
@@ -316,38 +472,34 @@ class TravelKnowledgeGraph:
 
     def get_active_travelers(self) -> List[Dict[str, Any]]:
         """Get customers who are currently traveling"""
-        active = []
-        for node_id in self.customer_index.values():
-            customer_data = self._get_customer_data(node_id)
-            trip_progress = customer_data.get("trip_progress")
-            if trip_progress and trip_progress.get("status") == "in_progress":
-                active.append(customer_data)
-        return active
+        return [
+            self._get_customer_data(node_id)
+            for node_id, progress in self._iter_progress()
+            if progress.get("status") == "in_progress"
+        ]
 
     def get_upcoming_travelers(self) -> List[Dict[str, Any]]:
         """Get customers with upcoming trips"""
-        upcoming = []
-        for node_id in self.customer_index.values():
-            customer_data = self._get_customer_data(node_id)
-            trip_progress = customer_data.get("trip_progress")
-            if trip_progress and trip_progress.get("status") == "upcoming":
-                upcoming.append(customer_data)
-        return upcoming
+        return [
+            self._get_customer_data(node_id)
+            for node_id, progress in self._iter_progress()
+            if progress.get("status") == "upcoming"
+        ]
 
     def get_customers_at_destination(self, destination: str) -> List[Dict[str, Any]]:
         """Get all customers currently at a specific destination"""
         dest_lower = destination.lower()
-        customers = []
 
-        for node_id in self.customer_index.values():
-            customer_data = self._get_customer_data(node_id)
-            trip_progress = customer_data.get("trip_progress")
-            if trip_progress:
-                current_location = (trip_progress.get("current_location") or "").lower()
-                if dest_lower in current_location or current_location in dest_lower:
-                    customers.append(customer_data)
+        # Exact location hit, then partial matches against the (few) location keys
+        matched = set(self._location_index.get(dest_lower, set()))
+        for location, node_ids in self._location_index.items():
+            if location != dest_lower and (dest_lower in location or location in dest_lower):
+                matched |= node_ids
 
-        return customers
+        if not matched:
+            return []
+        # Customer insertion order, as the full scan this replaced returned them
+        return [self._get_customer_data(node_id) for node_id in self.customer_index.values() if node_id in matched]
 
     def get_destination_info(self, destination: str) -> Optional[Dict[str, Any]]:
         """Get destination information"""
@@ -357,7 +509,7 @@ class TravelKnowledgeGraph:
         if dest_lower in self.destination_index:
             return dict(self.graph.nodes[self.destination_index[dest_lower]])
 
-        # Partial match
+        # Partial match (index keys are already lowercase)
         for name, node_id in self.destination_index.items():
             if dest_lower in name or name in dest_lower:
                 return dict(self.graph.nodes[node_id])
@@ -372,7 +524,7 @@ class TravelKnowledgeGraph:
         if hotel_lower in self.hotel_index:
             return dict(self.graph.nodes[self.hotel_index[hotel_lower]])
 
-        # Partial match
+        # Partial match (index keys are already lowercase)
         for name, node_id in self.hotel_index.items():
             if hotel_lower in name or name in hotel_lower:
                 return dict(self.graph.nodes[node_id])
@@ -388,32 +540,30 @@ class TravelKnowledgeGraph:
     def search_customers_by_status(self, status: str) -> List[Dict[str, Any]]:
         """Find all customers with specific trip status"""
         status_lower = status.lower()
-        customers = []
-
-        for node_id in self.customer_index.values():
-            customer_data = self._get_customer_data(node_id)
-            trip_progress = customer_data.get("trip_progress")
-            if trip_progress:
-                trip_status = (trip_progress.get("status") or "").lower()
-                if status_lower in trip_status:
-                    customers.append(customer_data)
-
-        return customers
+        return [
+            self._get_customer_data(node_id)
+            for node_id, progress in self._iter_progress()
+            if status_lower in (progress.get("status") or "").lower()
+        ]
 
     def get_customers_by_day(self, day_number: int) -> List[Dict[str, Any]]:
         """Get customers currently on a specific day of their trip"""
-        customers = []
-
-        for node_id in self.customer_index.values():
-            customer_data = self._get_customer_data(node_id)
-            trip_progress = customer_data.get("trip_progress")
-            if trip_progress and trip_progress.get("current_day") == day_number:
-                customers.append(customer_data)
-
-        return customers
+        return [
+            self._get_customer_data(node_id)
+            for node_id, progress in self._iter_progress()
+            if progress.get("current_day") == day_number
+        ]
 
     def to_dict(self) -> Dict:
-        """Serialize graph to dict for storage"""
+        """
+        Serialize graph to dict for storage.
+        Deprecated: materializes the whole graph in memory; use to_json_stream instead.
+        """
+        warnings.warn(
+            "TravelKnowledgeGraph.to_dict is deprecated, use to_json_stream",
+            DeprecationWarning,
+            stacklevel=2
+        )
         return {
             "nodes": dict(self.graph.nodes(data=True)),
             "edges": list(self.graph.edges(data=True)),
@@ -421,23 +571,49 @@ class TravelKnowledgeGraph:
             "destination_index": self.destination_index,
             "package_index": self.package_index,
             "hotel_index": self.hotel_index,
-            "business_summary": self.business_summary.model_dump() if self.business_summary else None
+            "business_summary": msgspec.structs.asdict(self.business_summary) if self.business_summary else None
         }
 
+    def to_json_stream(self, fp: BinaryIO):
+        """
+        Stream the graph as JSON to a binary file object, node by node and edge by edge.
+        Produces the same layout as to_dict without building the full structure in memory.
+        """
+        fp.write(b'{"nodes":{')
+        for i, (node_id, data) in enumerate(self.graph.nodes(data=True)):
+            if i:
+                fp.write(b",")
+            fp.write(orjson.dumps(node_id))
+            fp.write(b":")
+            fp.write(orjson.dumps(data))
+
+        fp.write(b'},"edges":[')
+        for i, edge in enumerate(self.graph.edges(data=True)):
+            if i:
+                fp.write(b",")
+            fp.write(orjson.dumps(edge))
+        fp.write(b"]")
+
+        for key, value in (
+            ("customer_index", self.customer_index),
+            ("destination_index", self.destination_index),
+            ("package_index", self.package_index),
+            ("hotel_index", self.hotel_index),
+            ("business_summary", msgspec.structs.asdict(self.business_summary) if self.business_summary else None)
+        ):
+            fp.write(b',"' + key.encode() + b'":')
+            fp.write(orjson.dumps(value))
+        fp.write(b"}")
+
     def stats(self) -> Dict[str, int]:
         """Get graph statistics"""
-        node_types = {}
-        for _, data in self.graph.nodes(data=True):
-            t = data.get("type", "unknown")
-            node_types[t] = node_types.get(t, 0) + 1
-
         return {
             "total_nodes": self.graph.number_of_nodes(),
-            "total_edges": self.graph.number_of_edges(),
-            "customers": node_types.get("customer", 0),
-            "bookings": node_types.get("booking", 0),
-            "destinations": node_types.get("destination", 0),
-            "hotels": node_types.get("hotel", 0),
-            "packages": node_types.get("package", 0),
-            "trip_progress": node_types.get("trip_progress", 0)
+            "total_edges": self._edge_count,
+            "customers": self._type_counts["customer"],
+            "bookings": self._type_counts["booking"],
+            "destinations": self._type_counts["destination"],
+            "hotels": self._type_counts["hotel"],
+            "packages": self._type_counts["package"],
+            "trip_progress": self._type_counts["trip_progress"]
         }
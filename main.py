@@ -10,13 +10,22 @@ Main FastAPI application integrating:
 - Admin Panel REST API
 """
 import os
+import asyncio
 import hmac
 import hashlib
 import httpx
-from typing import Optional
+import orjson
+import msgspec
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Optional, Set
+from collections import Counter
 from contextlib import asynccontextmanager
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import FastAPI, Request, Response, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 
 # Import database and API router
@@ -26,6 +35,16 @@ from api_router import router as admin_router
 # Load environment variables
 load_dotenv()
 
+# Session memory helpers (rag_chain reads REDIS_URL at import, so load .env first)
+from rag_chain import (
+    create_conversational_rag_chain,
+    create_shared_openai_clients,
+    get_all_sessions,
+    get_session_preview,
+    clear_session as clear_session_func,
+    REDIS_URL,
+)
+
 # Configuration
 WHATSAPP_PHONE_NUMBER_ID = os.getenv("WHATSAPP_PHONE_NUMBER_ID")
 WHATSAPP_ACCESS_TOKEN = os.getenv("WHATSAPP_ACCESS_TOKEN")
@@ -33,13 +52,107 @@ WHATSAPP_VERIFY_TOKEN = os.getenv("WHATSAPP_VERIFY_TOKEN", "ragbot_verify_123")
 FB_APP_SECRET = os.getenv("FB_APP_SECRET")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 DATA_DIR = os.getenv("DATA_DIR", "data")
-ALLOWED_NUMBERS = os.getenv("ALLOWED_NUMBERS", "").split(",")
-ALLOWED_NUMBERS = [n.strip() for n in ALLOWED_NUMBERS if n.strip()]
+ALLOWED_NUMBERS = frozenset(n.strip() for n in os.getenv("ALLOWED_NUMBERS", "").split(",") if n.strip())
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# Morning nudge button payload: GET_PLAN_DAY_{day_number}
+GET_PLAN_DAY_PREFIX = "GET_PLAN_DAY_"
+GET_PLAN_DAY_PREFIX_LEN = len(GET_PLAN_DAY_PREFIX)
 
 # Global instances
 agent = None
 rag_chain = None  # LangChain ConversationalRAGChain with session memory
 voice_handler = None  # For Whisper voice transcription
+openai_client = None  # Shared pooled OpenAI client of the current agent (closed when /reload replaces it)
+http_client: Optional[httpx.AsyncClient] = None  # Pooled client for WhatsApp API calls
+send_semaphore = asyncio.Semaphore(8)  # Caps concurrent outbound WhatsApp requests
+background_tasks: Set[asyncio.Task] = set()  # In-flight message processing tasks
+reload_task: Optional[asyncio.Task] = None  # Background /reload run
+status_counts: Counter = Counter()  # Webhook status updates by type (sent/delivered/read/failed)
+
+
+logger = logging.getLogger("travel_bot")
+
+
+def setup_logging() -> QueueListener:
+    """
+    Route all log records through a queue; a QueueListener thread does the
+    actual stderr writes so request handlers never block on stdout/stderr.
+    """
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s [%(name)s] %(message)s"))
+
+    root = logging.getLogger()
+    root.handlers[:] = [QueueHandler(log_queue)]
+    root.setLevel(LOG_LEVEL)
+    # httpx logs every request at INFO; keep WhatsApp/OpenAI calls out of the default output
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
+# =============================================================================
+# WEBHOOK PAYLOAD
+# Typed view of Meta's webhook body. msgspec decodes straight into these
+# structs and skips every field not declared here.
+# =============================================================================
+
+class TextContent(msgspec.Struct):
+    body: str = ""
+
+
+class MediaContent(msgspec.Struct):
+    id: str = ""
+
+
+class ReplyContent(msgspec.Struct):
+    id: str = ""
+    title: str = ""
+
+
+class InteractiveContent(msgspec.Struct):
+    type: str = ""
+    button_reply: ReplyContent = msgspec.field(default_factory=ReplyContent)
+    list_reply: ReplyContent = msgspec.field(default_factory=ReplyContent)
+
+
+class WebhookMessage(msgspec.Struct):
+    from_: str = msgspec.field(default="", name="from")
+    id: str = ""
+    type: str = ""
+    text: TextContent = msgspec.field(default_factory=TextContent)
+    audio: MediaContent = msgspec.field(default_factory=MediaContent)
+    interactive: InteractiveContent = msgspec.field(default_factory=InteractiveContent)
+
+
+class WebhookStatus(msgspec.Struct):
+    id: str = ""
+    status: str = "unknown"
+    recipient_id: str = ""
+    errors: list = []
+
+
+class WebhookValue(msgspec.Struct):
+    messages: List[WebhookMessage] = []
+    statuses: List[WebhookStatus] = []
+
+
+class WebhookChange(msgspec.Struct):
+    value: WebhookValue = msgspec.field(default_factory=WebhookValue)
+
+
+class WebhookEntry(msgspec.Struct):
+    changes: List[WebhookChange] = []
+
+
+class WebhookPayload(msgspec.Struct):
+    entry: List[WebhookEntry] = []
+
+
+webhook_decoder = msgspec.json.Decoder(WebhookPayload)
 
 
 def generate_appsecret_proof(access_token: str, app_secret: str) -> str:
@@ -51,133 +164,184 @@ def generate_appsecret_proof(access_token: str, app_secret: str) -> str:
     ).hexdigest()
 
 
-async def send_whatsapp_message(to: str, message: str):
-    """Send a message via WhatsApp Business API"""
-    url = f"https://graph.facebook.com/v18.0/{WHATSAPP_PHONE_NUMBER_ID}/messages"
+# Token and secret are fixed for the process lifetime, so the proof and send URL are too
+APPSECRET_PROOF = (
+    generate_appsecret_proof(WHATSAPP_ACCESS_TOKEN, FB_APP_SECRET)
+    if WHATSAPP_ACCESS_TOKEN and FB_APP_SECRET else None
+)
+WHATSAPP_SEND_URL = f"https://graph.facebook.com/v18.0/{WHATSAPP_PHONE_NUMBER_ID}/messages"
+if APPSECRET_PROOF:
+    WHATSAPP_SEND_URL += f"?appsecret_proof={APPSECRET_PROOF}"
 
-    # Generate appsecret_proof
-    proof = generate_appsecret_proof(WHATSAPP_ACCESS_TOKEN, FB_APP_SECRET)
 
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client, creating it on first use"""
+    global http_client
+
+    if http_client is None:
+        http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20)
+        )
+    return http_client
+
+
+# WhatsApp text messages are split at this length
+WHATSAPP_MAX_LENGTH = 4000
+
+# While a reply streams, finished paragraphs are sent once at least this much
+# text has built up, so the user starts reading before generation ends
+STREAM_FLUSH_MIN_LENGTH = 300
+
+
+async def send_whatsapp_message(to: str, message: str):
+    """Send a message via WhatsApp Business API"""
     headers = {
         "Authorization": f"Bearer {WHATSAPP_ACCESS_TOKEN}",
         "Content-Type": "application/json"
     }
 
-    # Split long messages
-    max_length = 4000
-    messages = [message[i:i+max_length] for i in range(0, len(message), max_length)]
-
-    async with httpx.AsyncClient() as client:
-        for msg in messages:
-            payload = {
-                "messaging_product": "whatsapp",
-                "to": to,
-                "type": "text",
-                "text": {"body": msg}
-            }
+    client = get_http_client()
 
-            response = await client.post(
-                f"{url}?appsecret_proof={proof}",
-                json=payload,
-                headers=headers
-            )
-
-            if response.status_code != 200:
-                print(f"Error sending message: {response.status_code} - {response.text}")
+    # Chunks of one message go out one after another so WhatsApp delivers
+    # them in order; the pooled connection keeps each post cheap
+    for i in range(0, len(message), WHATSAPP_MAX_LENGTH):
+        payload = {
+            "messaging_product": "whatsapp",
+            "to": to,
+            "type": "text",
+            "text": {"body": message[i:i + WHATSAPP_MAX_LENGTH]}
+        }
+        try:
+            async with send_semaphore:
+                response = await client.post(WHATSAPP_SEND_URL, json=payload, headers=headers)
+        except Exception as e:
+            logger.error("Error sending message: %s", e)
+            continue
+        if response.status_code != 200:
+            logger.error("Error sending message: %s - %s", response.status_code, response.text)
 
 
 def initialize_agent():
     """Initialize the RAG agent with all components including LangChain session memory and voice"""
-    global agent, rag_chain, voice_handler
+    global agent, rag_chain, voice_handler, openai_client
 
-    print("\n" + "="*60)
-    print("INITIALIZING TRAVEL RAG SYSTEM")
-    print("WITH LANGCHAIN SESSION MEMORY + VOICE")
-    print("="*60)
+    logger.info("INITIALIZING TRAVEL RAG SYSTEM (LangChain session memory + voice)")
 
     # Import components
     from ingest import create_knowledge_graph
     from retriever import create_retriever_from_directory
     from agent import SimpleAgent
-    from rag_chain import create_conversational_rag_chain, get_all_sessions
     from transcriber import create_voice_handler
 
-    # Check for data directory
-    if not os.path.exists(DATA_DIR):
-        print(f"WARNING: Data directory not found: {DATA_DIR}")
-        print("Creating empty knowledge graph...")
-        from knowledge_graph import TravelKnowledgeGraph
-        kg = TravelKnowledgeGraph()
-    else:
-        print(f"\n[1/5] Loading Knowledge Graph from {DATA_DIR}...")
-        kg = create_knowledge_graph(DATA_DIR)
+    def load_knowledge_graph():
+        if not os.path.exists(DATA_DIR):
+            logger.warning("Data directory not found: %s - creating empty knowledge graph", DATA_DIR)
+            from knowledge_graph import TravelKnowledgeGraph
+            return TravelKnowledgeGraph()
+        logger.info("[1/5] Loading Knowledge Graph from %s...", DATA_DIR)
+        return create_knowledge_graph(DATA_DIR)
 
-    print(f"\n[2/5] Building Hybrid Retriever...")
-    try:
-        retriever = create_retriever_from_directory(DATA_DIR, OPENAI_API_KEY)
-    except Exception as e:
-        print(f"Warning: Could not create retriever: {e}")
-        retriever = None
-
-    print(f"\n[3/5] Initializing Agent with Travel Tools...")
-    agent = SimpleAgent(kg, retriever, OPENAI_API_KEY)
-
-    print(f"\n[4/5] Setting up LangChain Session Memory (RunnableWithMessageHistory)...")
-    print("       - Session store: In-memory dict (keyed by phone number)")
-    print("       - History-aware retrieval: contextualize_q_chain")
-    print("       - Max turns per session: 5")
-    rag_chain = create_conversational_rag_chain(
-        agent=agent,
+    def build_retriever():
+        logger.info("[2/5] Building Hybrid Retriever...")
+        try:
+            return create_retriever_from_directory(DATA_DIR, OPENAI_API_KEY)
+        except Exception as e:
+            logger.warning("Could not create retriever: %s", e)
+            return None
+
+    def build_voice_handler():
+        logger.info("[5/5] Initializing Whisper Voice Handler...")
+        return create_voice_handler(OPENAI_API_KEY, WHATSAPP_ACCESS_TOKEN, FB_APP_SECRET)
+
+    # KG, retriever and voice handler are independent - build them concurrently
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        kg_future = executor.submit(load_knowledge_graph)
+        retriever_future = executor.submit(build_retriever)
+        voice_future = executor.submit(build_voice_handler)
+        kg = kg_future.result()
+        retriever = retriever_future.result()
+        new_voice_handler = voice_future.result()
+
+    logger.info("[3/5] Initializing Agent with Travel Tools...")
+    # Agent, reranker, embeddings and the contextualize LLM share one connection pool
+    new_openai_client, llm = create_shared_openai_clients(OPENAI_API_KEY, model="gpt-4o-mini")
+    new_agent = SimpleAgent(kg, retriever, OPENAI_API_KEY, openai_client=new_openai_client)
+
+    logger.info(
+        "[4/5] Setting up LangChain Session Memory (RunnableWithMessageHistory): "
+        "store=%s (keyed by phone number), contextualize_q_chain, max 5 turns",
+        "Redis" if REDIS_URL else "In-memory dict"
+    )
+    new_rag_chain = create_conversational_rag_chain(
+        agent=new_agent,
         openai_api_key=OPENAI_API_KEY,
         model="gpt-4o-mini",
-        max_turns=5
+        max_turns=5,
+        llm=llm,
+        openai_client=new_openai_client
     )
 
-    print(f"\n[5/5] Initializing Whisper Voice Handler...")
-    voice_handler = create_voice_handler(OPENAI_API_KEY, WHATSAPP_ACCESS_TOKEN, FB_APP_SECRET)
+    # Swap everything in together; /reload closes the replaced clients afterwards
+    agent, rag_chain, voice_handler, openai_client = new_agent, new_rag_chain, new_voice_handler, new_openai_client
 
-    # Print summary
+    # Log summary
     stats = kg.stats()
-    print("\n" + "="*60)
-    print("TRAVEL RAG SYSTEM READY")
-    print("="*60)
-    print(f"  Customers: {stats.get('customers', 0)}")
-    print(f"  Bookings: {stats.get('bookings', 0)}")
-    print(f"  Destinations: {stats.get('destinations', 0)}")
-    print(f"  Hotels: {stats.get('hotels', 0)}")
-    print(f"  Graph Nodes: {stats.get('total_nodes', 0)}")
-    print(f"  Graph Edges: {stats.get('total_edges', 0)}")
-    print(f"  Memory: LangChain RunnableWithMessageHistory")
-    print(f"         - Session ID: WhatsApp phone number (wa_id)")
-    print(f"         - Store: Global dict (replace with Redis in prod)")
-    print(f"  Voice: OpenAI Whisper enabled")
+    logger.info(
+        "TRAVEL RAG SYSTEM READY - customers=%s bookings=%s destinations=%s hotels=%s "
+        "graph_nodes=%s graph_edges=%s session_store=%s voice=whisper",
+        stats.get('customers', 0), stats.get('bookings', 0), stats.get('destinations', 0),
+        stats.get('hotels', 0), stats.get('total_nodes', 0), stats.get('total_edges', 0),
+        "Redis (REDIS_URL)" if REDIS_URL else "Global dict (set REDIS_URL to share across workers)"
+    )
 
     business = kg.get_business_summary()
     if business:
-        print(f"\n  Business Summary:")
-        print(f"    Total Customers: {business.get('total_customers', 0)}")
-        print(f"    Total Revenue: Rs {business.get('total_revenue', 0):,.0f}")
-        print(f"    Active Trips: {business.get('active_trips', 0)}")
-
-    print("="*60 + "\n")
+        logger.info(
+            "Business summary - total_customers=%s total_revenue=Rs %s active_trips=%s",
+            business.get('total_customers', 0), f"{business.get('total_revenue', 0):,.0f}",
+            business.get('active_trips', 0)
+        )
 
     return agent
 
 
+def _report_init_failure(task: asyncio.Task):
+    """Log agent initialization errors (the server keeps running, /ready stays 503)"""
+    if not task.cancelled() and task.exception() is not None:
+        logger.error("Agent initialization failed", exc_info=task.exception())
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan - initialize on startup"""
     # Startup
-    print("Starting up Travel RAG Bot...")
+    log_listener = setup_logging()
+    logger.info("Starting up Travel RAG Bot...")
 
     # Initialize database
-    print("[Database] Initializing SQLAlchemy database...")
+    logger.info("[Database] Initializing SQLAlchemy database...")
     init_db()
 
-    initialize_agent()
+    # Open the pooled WhatsApp API client once for the app lifetime
+    get_http_client()
+
+    # Load KG/retriever/agent in a worker thread so the server can accept
+    # requests (and report readiness via /ready) while it warms up
+    app.state.init_task = asyncio.create_task(asyncio.to_thread(initialize_agent))
+    app.state.init_task.add_done_callback(_report_init_failure)
     yield
     # Shutdown
-    print("Shutting down...")
+    logger.info("Shutting down...")
+    if background_tasks:
+        # Let queued replies finish before the HTTP client goes away
+        await asyncio.gather(*background_tasks, return_exceptions=True)
+    if http_client is not None:
+        await http_client.aclose()
+    if voice_handler is not None:
+        await voice_handler.aclose()
+    log_listener.stop()
 
 
 # Create FastAPI app
@@ -185,7 +349,8 @@ app = FastAPI(
     title="Shri Travels RAG WhatsApp Bot",
     description="Rajasthan Tours RAG system with Knowledge Graph, Hybrid Retrieval, Agent, and Admin Panel",
     version="2.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS Configuration for Admin Panel
@@ -207,12 +372,12 @@ app.include_router(admin_router)
 @app.get("/")
 async def root():
     """Health check endpoint"""
-    global agent
+    init_task = app.state.init_task
     return {
         "status": "running",
         "system": "Travel RAG Bot",
         "version": "1.0.0",
-        "agent_initialized": agent is not None,
+        "agent_initialized": init_task.done() and init_task.exception() is None,
         "components": {
             "knowledge_graph": True,
             "hybrid_retriever": True,
@@ -223,6 +388,17 @@ async def root():
     }
 
 
+@app.get("/ready")
+async def ready():
+    """Readiness probe - 503 until the agent has finished initializing"""
+    init_task = app.state.init_task
+    if not init_task.done():
+        return ORJSONResponse(status_code=503, content={"status": "initializing"})
+    if init_task.exception() is not None:
+        return ORJSONResponse(status_code=503, content={"status": "failed", "error": str(init_task.exception())})
+    return {"status": "ready"}
+
+
 @app.get("/webhook")
 async def verify_webhook(request: Request):
     """Webhook verification for Meta WhatsApp"""
@@ -231,12 +407,149 @@ async def verify_webhook(request: Request):
     challenge = request.query_params.get("hub.challenge")
 
     if mode == "subscribe" and token == WHATSAPP_VERIFY_TOKEN:
-        print(f"Webhook verified successfully!")
+        logger.info("Webhook verified successfully!")
         return Response(content=challenge, media_type="text/plain")
 
     raise HTTPException(status_code=403, detail="Verification failed")
 
 
+async def _stream_response(session_id: str, text: str) -> str:
+    """
+    Run the streaming RAG chain in a worker thread and send the text as it
+    arrives, a run of complete paragraphs at a time. Returns the full response.
+    """
+    loop = asyncio.get_running_loop()
+    pieces: asyncio.Queue = asyncio.Queue()
+
+    def produce():
+        # The chain makes blocking OpenAI calls; keep them off the event loop
+        try:
+            for piece in rag_chain.invoke_stream(session_id, text):
+                loop.call_soon_threadsafe(pieces.put_nowait, piece)
+        finally:
+            loop.call_soon_threadsafe(pieces.put_nowait, None)
+
+    producer = asyncio.create_task(asyncio.to_thread(produce))
+    parts = []
+    pending = ""
+    while (piece := await pieces.get()) is not None:
+        parts.append(piece)
+        pending += piece
+        while len(pending) > WHATSAPP_MAX_LENGTH:
+            # Prefer breaking on a line boundary so messages don't split mid-sentence
+            cut = pending.rfind("\n", 0, WHATSAPP_MAX_LENGTH)
+            if cut <= 0:
+                cut = WHATSAPP_MAX_LENGTH
+            await send_whatsapp_message(session_id, pending[:cut])
+            pending = pending[cut:].lstrip("\n")
+        if len(pending) >= STREAM_FLUSH_MIN_LENGTH:
+            cut = pending.rfind("\n\n")
+            if cut >= STREAM_FLUSH_MIN_LENGTH:
+                await send_whatsapp_message(session_id, pending[:cut])
+                pending = pending[cut:].lstrip("\n")
+    await producer
+
+    if pending:
+        await send_whatsapp_message(session_id, pending)
+    return "".join(parts)
+
+
+async def _process_message(session_id: str, text: str, message_id: str):
+    """
+    Answer a user message with the LangChain RAG chain (session memory),
+    save the bot response and send it over WhatsApp.
+    Runs as a background task after the webhook has been acknowledged.
+    """
+    try:
+        logger.info("Processing with LangChain RAG Chain (session: %s)", session_id)
+        try:
+            # Full WhatsApp messages go out while the model is still generating
+            response = await _stream_response(session_id, text)
+            logger.debug("Agent response: %.200s...", response)
+        except Exception:
+            logger.exception("RAG Chain error")
+            response = f"I encountered an error processing your request. Please try rephrasing your question."
+            await send_whatsapp_message(session_id, response)
+
+        # =====================================================================
+        # DATABASE: Save bot response
+        # =====================================================================
+        db = SessionLocal()
+        try:
+            db_user = get_or_create_user(db, session_id)
+            save_message(db, db_user.id, response, SenderType.BOT.value)
+        finally:
+            db.close()
+
+        logger.info("RESPONSE SENT (message_id: %s)", message_id)
+
+    except Exception:
+        logger.exception("Message processing error")
+
+
+async def _process_voice_message(session_id: str, media_id: str, message_id: str):
+    """
+    Transcribe a voice message, echo the transcript, then answer it like a
+    text message. Runs as a background task after the webhook has been acknowledged.
+    """
+    try:
+        text, error = await voice_handler.process_voice_message(media_id)
+
+        if error:
+            logger.warning("Transcription error: %s", error)
+            await send_whatsapp_message(
+                session_id,
+                f"Could not transcribe voice message. Please try again or send a text message."
+            )
+            return
+
+        if not text.strip():
+            await send_whatsapp_message(
+                session_id,
+                "I couldn't hear anything in that voice message. Please try again or send a text message."
+            )
+            return
+
+        logger.debug("Transcribed: %s", text)
+
+        if not _save_incoming_message(session_id, text, message_id):
+            return
+
+        # Send acknowledgment that voice was received
+        await send_whatsapp_message(session_id, f"I heard: \"{text}\"\n\nProcessing your question...")
+
+        await _process_message(session_id, text, message_id)
+
+    except Exception:
+        logger.exception("Voice message processing error")
+
+
+def _save_incoming_message(session_id: str, text: str, message_id: str) -> bool:
+    """Save the user's message; returns False when an admin has taken over (bot must not reply)"""
+    db = SessionLocal()
+    try:
+        # Get or create user in database
+        db_user = get_or_create_user(db, session_id)
+
+        # Save user message (also while the bot is paused, so the admin sees it)
+        save_message(db, db_user.id, text, SenderType.USER.value, message_id)
+
+        # Check if bot is paused for this user (admin takeover)
+        if db_user.bot_paused:
+            logger.info("[BOT PAUSED] User %s - Admin has taken over", session_id)
+            return False
+        return True
+    finally:
+        db.close()
+
+
+def _spawn_background(coro):
+    """Run a coroutine as a tracked background task (awaited on shutdown)"""
+    task = asyncio.create_task(coro)
+    background_tasks.add(task)
+    task.add_done_callback(background_tasks.discard)
+
+
 @app.post("/webhook")
 async def handle_webhook(request: Request):
     """
@@ -252,46 +565,28 @@ async def handle_webhook(request: Request):
     global rag_chain, voice_handler
 
     try:
-        body = await request.json()
-        print(f"\n{'='*50}")
-        print("INCOMING WEBHOOK")
-        print(f"{'='*50}")
+        payload = webhook_decoder.decode(await request.body())
 
         # Extract message data
-        entry = body.get("entry", [{}])[0]
-        changes = entry.get("changes", [{}])[0]
-        value = changes.get("value", {})
+        if not payload.entry or not payload.entry[0].changes:
+            return {"status": "no_message"}
+        value = payload.entry[0].changes[0].value
 
         # =====================================================================
-        # VERBOSE LOGGING: Check for status updates (read receipts, etc.)
+        # STATUS UPDATES (sent/delivered/read/failed): most webhook traffic.
+        # Count them instead of printing each one; only failures are logged.
         # =====================================================================
-        statuses = value.get("statuses", [])
+        statuses = value.statuses
         if statuses:
             for status in statuses:
-                status_type = status.get("status", "unknown")
-                recipient_id = status.get("recipient_id", "")
-                timestamp = status.get("timestamp", "")
-                message_id = status.get("id", "")
-
-                print(f"[STATUS] {status_type.upper()}")
-                print(f"         Recipient: {recipient_id}")
-                print(f"         Message ID: {message_id}")
-                print(f"         Timestamp: {timestamp}")
-
-                if status_type == "read":
-                    print(f"         -> Message was READ by {recipient_id}")
-                elif status_type == "delivered":
-                    print(f"         -> Message DELIVERED to {recipient_id}")
-                elif status_type == "sent":
-                    print(f"         -> Message SENT to {recipient_id}")
-                elif status_type == "failed":
-                    errors = status.get("errors", [])
-                    print(f"         -> Message FAILED: {errors}")
-
+                status_counts[status.status] += 1
+                if status.status == "failed":
+                    logger.warning("[STATUS] FAILED to %s (message_id: %s): %s", status.recipient_id, status.id, status.errors)
             return {"status": "status_update_processed", "statuses": len(statuses)}
 
+
         # Check for message
-        messages = value.get("messages", [])
+        messages = value.messages
         if not messages:
             return {"status": "no_message"}
 
@@ -300,18 +595,17 @@ async def handle_webhook(request: Request):
         # =====================================================================
         # STEP 1: Extract wa_id (Sender's Phone Number) as session_id
         # =====================================================================
-        wa_id = message.get("from", "")  # Sender's WhatsApp phone number
+        wa_id = message.from_  # Sender's WhatsApp phone number
         session_id = wa_id  # Use wa_id as session identifier for memory
 
-        message_type = message.get("type", "")
-        message_id = message.get("id", "")
+        message_type = message.type
+        message_id = message.id
 
-        print(f"Session ID (wa_id): {session_id}")
-        print(f"Message Type: {message_type}")
+        logger.info("INCOMING WEBHOOK session=%s type=%s", session_id, message_type)
 
         # Check if number is allowed
         if ALLOWED_NUMBERS and session_id not in ALLOWED_NUMBERS:
-            print(f"Unauthorized number: {session_id}")
+            logger.warning("Unauthorized number: %s", session_id)
             return {"status": "unauthorized"}
 
         # Handle different message types
@@ -319,68 +613,60 @@ async def handle_webhook(request: Request):
 
         if message_type == "text":
             # Text message
-            text = message.get("text", {}).get("body", "")
-            print(f"Message: {text}")
+            text = message.text.body
+            logger.debug("Message: %s", text)
 
         elif message_type == "audio":
             # Voice message - transcribe with Whisper
-            audio_data = message.get("audio", {})
-            media_id = audio_data.get("id", "")
+            media_id = message.audio.id
 
             if not media_id:
                 await send_whatsapp_message(session_id, "Could not process voice message.")
                 return {"status": "no_media_id"}
 
-            print(f"Voice message received (media_id: {media_id})")
+            logger.info("Voice message received (media_id: %s)", media_id)
 
             if voice_handler is None:
                 await send_whatsapp_message(session_id, "Voice processing not available.")
                 return {"status": "voice_not_ready"}
 
-            # Transcribe voice
-            text, error = await voice_handler.process_voice_message(media_id)
-
-            if error:
-                print(f"Transcription error: {error}")
+            if rag_chain is None:
                 await send_whatsapp_message(
                     session_id,
-                    f"Could not transcribe voice message. Please try again or send a text message."
+                    "System is still initializing. Please try again in a moment."
                 )
-                return {"status": "transcription_error", "error": error}
-
-            print(f"Transcribed: {text}")
+                return {"status": "agent_not_ready"}
 
-            # Send acknowledgment that voice was received
-            await send_whatsapp_message(session_id, f"I heard: \"{text}\"\n\nProcessing your question...")
+            # Download + Whisper (with retries) can outlast Meta's redelivery
+            # window, so transcribe in the background and ack now
+            _spawn_background(_process_voice_message(session_id, media_id, message_id))
+            return {"status": "queued", "message_id": message_id, "session_id": session_id}
 
         elif message_type == "interactive":
             # =====================================================================
             # BUTTON CLICK HANDLING: Process interactive messages (button clicks)
             # =====================================================================
-            interactive_data = message.get("interactive", {})
-            interactive_type = interactive_data.get("type", "")
+            interactive_data = message.interactive
+            interactive_type = interactive_data.type
 
-            print(f"[INTERACTIVE] Type: {interactive_type}")
-            print(f"[INTERACTIVE] Data: {interactive_data}")
+            logger.debug("[INTERACTIVE] type=%s data=%s", interactive_type, interactive_data)
 
             if interactive_type == "button_reply":
                 # Handle quick reply button click
-                button_reply = interactive_data.get("button_reply", {})
-                button_id = button_reply.get("id", "")
-                button_title = button_reply.get("title", "")
+                button_id = interactive_data.button_reply.id
+                button_title = interactive_data.button_reply.title
 
-                print(f"[BUTTON CLICK] ID: {button_id}")
-                print(f"[BUTTON CLICK] Title: {button_title}")
+                logger.debug("[BUTTON CLICK] id=%s title=%s", button_id, button_title)
 
                 # Check for GET_PLAN_DAY_{day_number} payload
-                if button_id.startswith("GET_PLAN_DAY_"):
+                if button_id.startswith(GET_PLAN_DAY_PREFIX):
                     try:
-                        day_number = int(button_id.replace("GET_PLAN_DAY_", ""))
-                        print(f"[BUTTON CLICK] Detected Morning Nudge button for Day {day_number}")
+                        day_number = int(button_id[GET_PLAN_DAY_PREFIX_LEN:])
+                        logger.info("[BUTTON CLICK] Morning Nudge button for Day %s", day_number)
 
                         # Generate synthetic prompt for agent
                         text = f"Please give me the detailed plan for Day {day_number}. Include all activities, timings, and video guides."
-                        print(f"[SYNTHETIC PROMPT] {text}")
+                        logger.debug("[SYNTHETIC PROMPT] %s", text)
 
                     except ValueError:
                         text = "Please give me today's plan with video guides."
@@ -390,12 +676,12 @@ async def handle_webhook(request: Request):
 
             elif interactive_type == "list_reply":
                 # Handle list selection
-                list_reply = interactive_data.get("list_reply", {})
-                text = list_reply.get("id", "") or list_reply.get("title", "")
-                print(f"[LIST REPLY] {text}")
+                list_reply = interactive_data.list_reply
+                text = list_reply.id or list_reply.title
+                logger.debug("[LIST REPLY] %s", text)
             else:
                 text = ""
-                print(f"[INTERACTIVE] Unknown interactive type: {interactive_type}")
+                logger.warning("[INTERACTIVE] Unknown interactive type: %s", interactive_type)
 
         else:
             # Unsupported message type
@@ -419,59 +705,19 @@ async def handle_webhook(request: Request):
         # =====================================================================
         # DATABASE: Save incoming message and get/create user
         # =====================================================================
-        db = SessionLocal()
-        try:
-            # Get or create user in database
-            db_user = get_or_create_user(db, session_id)
-
-            # Check if bot is paused for this user (admin takeover)
-            if db_user.bot_paused:
-                print(f"[BOT PAUSED] User {session_id} - Admin has taken over")
-                # Save user message but don't respond
-                save_message(db, db_user.id, text, SenderType.USER.value, message_id)
-                return {"status": "bot_paused", "message": "Admin has taken over this conversation"}
-
-            # Save user message to database
-            save_message(db, db_user.id, text, SenderType.USER.value, message_id)
-        finally:
-            db.close()
+        if not _save_incoming_message(session_id, text, message_id):
+            return {"status": "bot_paused", "message": "Admin has taken over this conversation"}
 
         # =====================================================================
-        # STEPS 2-5: Process with LangChain RAG Chain (session memory)
+        # STEPS 2-5: Run the RAG chain in the background and ack Meta now,
+        # so slow LLM calls don't trigger webhook redelivery
         # =====================================================================
-        print(f"\nProcessing with LangChain RAG Chain (session: {session_id})...")
-        try:
-            response = rag_chain.invoke(session_id, text)
-            print(f"\nAgent Response:\n{response[:200]}...")
-        except Exception as e:
-            print(f"RAG Chain error: {e}")
-            import traceback
-            traceback.print_exc()
-            response = f"I encountered an error processing your request. Please try rephrasing your question."
+        _spawn_background(_process_message(session_id, text, message_id))
 
-        # =====================================================================
-        # DATABASE: Save bot response
-        # =====================================================================
-        db = SessionLocal()
-        try:
-            db_user = get_or_create_user(db, session_id)
-            save_message(db, db_user.id, response, SenderType.BOT.value)
-        finally:
-            db.close()
-
-        # Send response
-        await send_whatsapp_message(session_id, response)
-
-        print(f"\n{'='*50}")
-        print("RESPONSE SENT")
-        print(f"{'='*50}\n")
-
-        return {"status": "success", "message_id": message_id, "session_id": session_id}
+        return {"status": "queued", "message_id": message_id, "session_id": session_id}
 
     except Exception as e:
-        print(f"Webhook error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Webhook error")
         return {"status": "error", "error": str(e)}
 
 
@@ -483,8 +729,6 @@ async def get_stats():
     if agent is None:
         return {"error": "Agent not initialized"}
 
-    from rag_chain import get_all_sessions
-
     kg_stats = agent.agent.kg.stats()
     business = agent.agent.kg.get_business_summary()
     sessions = get_all_sessions()
@@ -495,31 +739,26 @@ async def get_stats():
         "retriever": agent.agent.retriever.stats() if agent.agent.retriever else None,
         "memory": {
             "type": "LangChain RunnableWithMessageHistory",
-            "store": "In-memory dict (keyed by phone number)",
+            "store": "Redis (keyed by phone number)" if REDIS_URL else "In-memory dict (keyed by phone number)",
             "active_sessions": len(sessions),
             "sessions": sessions
-        }
+        },
+        "message_statuses": dict(status_counts),
+        "voice": voice_handler.stats() if voice_handler else None
     }
 
 
 @app.get("/sessions")
 async def get_sessions():
     """Get all active conversation sessions"""
-    from rag_chain import get_all_sessions, store
-
     sessions = get_all_sessions()
     session_details = {}
 
     for session_id, msg_count in sessions.items():
-        if session_id in store:
-            history = store[session_id]
-            session_details[session_id] = {
-                "message_count": msg_count,
-                "messages": [
-                    {"role": msg.type, "content": msg.content[:100] + "..." if len(msg.content) > 100 else msg.content}
-                    for msg in history.messages
-                ]
-            }
+        session_details[session_id] = {
+            "message_count": msg_count,
+            "messages": get_session_preview(session_id, msg_count)
+        }
 
     return {
         "total_sessions": len(sessions),
@@ -530,9 +769,8 @@ async def get_sessions():
 @app.delete("/sessions/{session_id}")
 async def clear_session(session_id: str):
     """Clear conversation history for a specific session"""
-    from rag_chain import clear_session as clear_session_func
-
-    result = clear_session_func(session_id)
+    # May hit Redis; keep it off the event loop
+    result = await asyncio.to_thread(clear_session_func, session_id)
     if result:
         return {"status": "cleared", "session_id": session_id}
     else:
@@ -627,7 +865,7 @@ async def query_agent(request: Request):
     if agent is None:
         return {"error": "Agent not initialized"}
 
-    body = await request.json()
+    body = orjson.loads(await request.body())
     question = body.get("question", "")
     session_id = body.get("session_id", "api_user")
 
@@ -636,9 +874,9 @@ async def query_agent(request: Request):
 
     # Use the RAG chain with memory if available
     if rag_chain is not None:
-        response = rag_chain.invoke(session_id, question)
+        response = await asyncio.to_thread(rag_chain.invoke, session_id, question)
     else:
-        response = agent.query(question)
+        response = await asyncio.to_thread(agent.query, question)
 
     return {
         "question": question,
@@ -647,12 +885,44 @@ async def query_agent(request: Request):
     }
 
 
-@app.post("/reload")
+@app.post("/reload", status_code=202)
 async def reload_data():
-    """Reload data and reinitialize agent"""
-    global agent
-    agent = initialize_agent()
-    return {"status": "reloaded", "stats": agent.agent.kg.stats()}
+    """Reload data and reinitialize agent in the background (poll GET /reload for progress)"""
+    global reload_task
+    if not app.state.init_task.done() or (reload_task is not None and not reload_task.done()):
+        return {"status": "in_progress"}
+    # The current agent keeps serving until initialize_agent swaps in the new one
+    reload_task = asyncio.create_task(_reload_agent())
+    return {"status": "started"}
+
+
+async def _reload_agent():
+    """Rebuild the agent, then close the pooled clients of the components it replaced"""
+    old_agent, old_openai_client, old_voice_handler = agent, openai_client, voice_handler
+    new_agent = await asyncio.to_thread(initialize_agent)
+
+    # Turns already running on the old components finish before their pools close
+    if background_tasks:
+        await asyncio.gather(*background_tasks, return_exceptions=True)
+    if old_voice_handler is not None:
+        await old_voice_handler.aclose()
+    if old_openai_client is not None:
+        old_openai_client.close()
+    if old_agent is not None and old_agent.agent.retriever is not None:
+        old_agent.agent.retriever.client.close()
+    return new_agent
+
+
+@app.get("/reload")
+async def reload_status():
+    """Status of the last /reload"""
+    if reload_task is None:
+        return {"status": "idle"}
+    if not reload_task.done():
+        return {"status": "in_progress"}
+    if reload_task.exception() is not None:
+        return {"status": "failed", "error": str(reload_task.exception())}
+    return {"status": "reloaded", "stats": reload_task.result().agent.kg.stats()}
 
 
 if __name__ == "__main__":
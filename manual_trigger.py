@@ -12,9 +12,10 @@ This script:
 3. Template includes button with payload: GET_PLAN_DAY_{day_number}
 """
 import os
+import asyncio
 import hmac
 import hashlib
-import requests
+import httpx
 from datetime import datetime, date
 from dotenv import load_dotenv
 
@@ -54,18 +55,27 @@ def generate_appsecret_proof(access_token: str, app_secret: str) -> str:
     ).hexdigest()
 
 
-def calculate_trip_day(start_date: date) -> int:
+# Computed once per run (token and secret come from .env)
+APPSECRET_PROOF = (
+    generate_appsecret_proof(WHATSAPP_ACCESS_TOKEN, FB_APP_SECRET)
+    if WHATSAPP_ACCESS_TOKEN and FB_APP_SECRET else None
+)
+WHATSAPP_SEND_URL = f"https://graph.facebook.com/v18.0/{WHATSAPP_PHONE_NUMBER_ID}/messages"
+if APPSECRET_PROOF:
+    WHATSAPP_SEND_URL += f"?appsecret_proof={APPSECRET_PROOF}"
+
+
+def trip_day(today: date, start_date: date) -> int:
     """
-    Calculate the current day of the trip.
+    Calculate the day of the trip on a given date.
 
     Args:
+        today: The date to evaluate
         start_date: Trip start date
 
     Returns:
         Day number (1-8), or 0 if trip hasn't started, or -1 if completed
     """
-    today = date.today()
-
     if today < start_date:
         return 0  # Trip hasn't started
 
@@ -77,11 +87,12 @@ def calculate_trip_day(start_date: date) -> int:
     return delta
 
 
-def send_template_message(phone: str, customer_name: str, day_number: int) -> bool:
+async def send_template_message(client: httpx.AsyncClient, phone: str, customer_name: str, day_number: int) -> bool:
     """
     Send WhatsApp template message with morning nudge.
 
     Args:
+        client: Shared HTTP client
         phone: Phone number (with country code, no +)
         customer_name: Customer's name for personalization
         day_number: Current day of the trip
@@ -89,11 +100,6 @@ def send_template_message(phone: str, customer_name: str, day_number: int) -> bo
     Returns:
         True if successful, False otherwise
     """
-    url = f"https://graph.facebook.com/v18.0/{WHATSAPP_PHONE_NUMBER_ID}/messages"
-
-    # Generate appsecret_proof
-    proof = generate_appsecret_proof(WHATSAPP_ACCESS_TOKEN, FB_APP_SECRET)
-
     headers = {
         "Authorization": f"Bearer {WHATSAPP_ACCESS_TOKEN}",
         "Content-Type": "application/json"
@@ -141,8 +147,8 @@ def send_template_message(phone: str, customer_name: str, day_number: int) -> bo
     }
 
     try:
-        response = requests.post(
-            f"{url}?appsecret_proof={proof}",
+        response = await client.post(
+            WHATSAPP_SEND_URL,
             json=payload,
             headers=headers
         )
@@ -160,12 +166,13 @@ def send_template_message(phone: str, customer_name: str, day_number: int) -> bo
         return False
 
 
-def send_text_fallback(phone: str, customer_name: str, day_number: int) -> bool:
+async def send_text_fallback(client: httpx.AsyncClient, phone: str, customer_name: str, day_number: int) -> bool:
     """
     Fallback: Send regular text message if template fails or isn't set up.
     This is useful for testing before the template is approved.
 
     Args:
+        client: Shared HTTP client
         phone: Phone number
         customer_name: Customer's name
         day_number: Current day of the trip
@@ -173,9 +180,6 @@ def send_text_fallback(phone: str, customer_name: str, day_number: int) -> bool:
     Returns:
         True if successful
     """
-    url = f"https://graph.facebook.com/v18.0/{WHATSAPP_PHONE_NUMBER_ID}/messages"
-    proof = generate_appsecret_proof(WHATSAPP_ACCESS_TOKEN, FB_APP_SECRET)
-
     headers = {
         "Authorization": f"Bearer {WHATSAPP_ACCESS_TOKEN}",
         "Content-Type": "application/json"
@@ -201,8 +205,8 @@ Have a wonderful day! 🏰"""
     }
 
     try:
-        response = requests.post(
-            f"{url}?appsecret_proof={proof}",
+        response = await client.post(
+            WHATSAPP_SEND_URL,
             json=payload,
             headers=headers
         )
@@ -220,6 +224,54 @@ Have a wonderful day! 🏰"""
         return False
 
 
+async def send_for_user(client: httpx.AsyncClient, user: dict, day_number: int) -> bool:
+    """
+    Send the morning nudge to one user who is on an active trip.
+
+    Returns:
+        True if the template or the text fallback was sent
+    """
+    phone = user["phone"]
+    name = user["name"]
+
+    print(f"\n[Trigger] Processing {name} ({phone}) - Day {day_number}")
+
+    # Send morning nudge
+    print(f"[Trigger] Sending Morning Nudge to {phone}...")
+    print(f"[Trigger] Button Payload: GET_PLAN_DAY_{day_number}")
+
+    # Try template first, fall back to text message
+    success = await send_template_message(client, phone, name, day_number)
+
+    if not success:
+        print(f"[Trigger] Template failed, trying text fallback...")
+        success = await send_text_fallback(client, phone, name, day_number)
+
+    return success
+
+
+async def send_all(users: list) -> list:
+    """Send morning nudges to users on an active trip, concurrently over one connection pool"""
+    today = date.today()
+
+    active = []
+    for user in users:
+        day_number = trip_day(today, user["start_date"])
+        if day_number == 0:
+            print(f"[Trigger] Skipping {user['name']} - Trip hasn't started yet (starts {user['start_date']})")
+        elif day_number == -1:
+            print(f"[Trigger] Skipping {user['name']} - Trip already completed")
+        else:
+            active.append((user, day_number))
+
+    if not active:
+        return []
+
+    limits = httpx.Limits(max_keepalive_connections=len(active))
+    async with httpx.AsyncClient(limits=limits, timeout=30.0) as client:
+        return await asyncio.gather(*[send_for_user(client, user, day) for user, day in active])
+
+
 def main():
     """Main function to trigger morning concierge messages"""
     print("\n" + "="*60)
@@ -235,43 +287,10 @@ def main():
         print("Required: WHATSAPP_PHONE_NUMBER_ID, WHATSAPP_ACCESS_TOKEN, FB_APP_SECRET")
         return
 
-    success_count = 0
-    fail_count = 0
-
-    for user in TEST_USERS:
-        phone = user["phone"]
-        name = user["name"]
-        start_date = user["start_date"]
+    results = asyncio.run(send_all(TEST_USERS))
 
-        # Calculate current trip day
-        day_number = calculate_trip_day(start_date)
-
-        print(f"\n[Trigger] Processing {name} ({phone})")
-        print(f"[Trigger] Trip Start: {start_date}")
-        print(f"[Trigger] Current Day: {day_number}")
-
-        if day_number == 0:
-            print(f"[Trigger] Skipping - Trip hasn't started yet")
-            continue
-        elif day_number == -1:
-            print(f"[Trigger] Skipping - Trip already completed")
-            continue
-
-        # Send morning nudge
-        print(f"[Trigger] Sending Morning Nudge to {phone}...")
-        print(f"[Trigger] Button Payload: GET_PLAN_DAY_{day_number}")
-
-        # Try template first, fall back to text message
-        success = send_template_message(phone, name, day_number)
-
-        if not success:
-            print(f"[Trigger] Template failed, trying text fallback...")
-            success = send_text_fallback(phone, name, day_number)
-
-        if success:
-            success_count += 1
-        else:
-            fail_count += 1
+    success_count = sum(1 for r in results if r)
+    fail_count = len(results) - success_count
 
     print("\n" + "="*60)
     print("TRIGGER COMPLETE")
@@ -1,8 +1,12 @@
 """
-Pydantic models for Travel Business RAG System
+Entity models for Travel Business RAG System
 Entities: Customers, Trips, Destinations, Hotels, Bookings, Packages
+
+These are built by trusted extraction code, so they are plain msgspec
+Structs (no per-instance validation); use msgspec.convert / msgspec.json
+to validate data coming from outside.
 """
-from pydantic import BaseModel, Field
+import msgspec
 from typing import List, Optional, Dict, Any
 from enum import Enum
 from datetime import date, datetime
@@ -34,21 +38,21 @@ class RoomType(str, Enum):
     DELUXE = "deluxe"
 
 
-class Hotel(BaseModel):
+class Hotel(msgspec.Struct, kw_only=True):
     """Hotel entity"""
-    name: str = Field(description="Hotel name")
-    city: str = Field(description="City where hotel is located")
+    name: str  # Hotel name
+    city: str  # City where hotel is located
     address: Optional[str] = None
     phone: Optional[str] = None
     room_type: Optional[str] = None
-    amenities: List[str] = Field(default_factory=list)
+    amenities: List[str] = []
     check_in_time: Optional[str] = None
     check_out_time: Optional[str] = None
 
 
-class Activity(BaseModel):
+class Activity(msgspec.Struct, kw_only=True):
     """Activity/sightseeing item"""
-    name: str = Field(description="Activity or place name")
+    name: str  # Activity or place name
     time: Optional[str] = None
     duration: Optional[str] = None
     location: Optional[str] = None
@@ -57,19 +61,19 @@ class Activity(BaseModel):
     tips: Optional[str] = None
 
 
-class DayItinerary(BaseModel):
+class DayItinerary(msgspec.Struct, kw_only=True):
     """Single day itinerary"""
-    day_number: int = Field(description="Day number (1, 2, 3...)")
+    day_number: int  # Day number (1, 2, 3...)
     date: Optional[str] = None
-    title: str = Field(description="Day title/description")
-    cities: List[str] = Field(default_factory=list)
+    title: str  # Day title/description
+    cities: List[str] = []
     hotel: Optional[Hotel] = None
-    activities: List[Activity] = Field(default_factory=list)
-    meals_included: List[str] = Field(default_factory=list, description="breakfast, lunch, dinner")
+    activities: List[Activity] = []
+    meals_included: List[str] = []  # breakfast, lunch, dinner
     notes: Optional[str] = None
 
 
-class FlightDetails(BaseModel):
+class FlightDetails(msgspec.Struct, kw_only=True):
     """Flight information"""
     flight_number: str
     departure_city: str
@@ -81,7 +85,7 @@ class FlightDetails(BaseModel):
     duration: Optional[str] = None
 
 
-class DriverDetails(BaseModel):
+class DriverDetails(msgspec.Struct, kw_only=True):
     """Driver/transport information"""
     name: str
     phone: str
@@ -89,32 +93,32 @@ class DriverDetails(BaseModel):
     vehicle_number: Optional[str] = None
 
 
-class TripPackage(BaseModel):
+class TripPackage(msgspec.Struct, kw_only=True):
     """Travel package details"""
-    package_id: str = Field(description="Package code")
-    name: str = Field(description="Package name")
+    package_id: str  # Package code
+    name: str  # Package name
     duration_days: int
     duration_nights: int
-    destinations: List[str] = Field(default_factory=list)
+    destinations: List[str] = []
     price_per_person: float
     single_supplement: Optional[float] = None
-    inclusions: List[str] = Field(default_factory=list)
-    exclusions: List[str] = Field(default_factory=list)
+    inclusions: List[str] = []
+    exclusions: List[str] = []
     best_season: Optional[str] = None
-    day_itineraries: List[DayItinerary] = Field(default_factory=list)
-    flights: List[FlightDetails] = Field(default_factory=list)
+    day_itineraries: List[DayItinerary] = []
+    flights: List[FlightDetails] = []
 
 
-class Booking(BaseModel):
+class Booking(msgspec.Struct, kw_only=True):
     """Booking entity"""
-    booking_id: str = Field(description="Unique booking ID")
+    booking_id: str  # Unique booking ID
     package: Optional[TripPackage] = None
     package_name: Optional[str] = None
     booking_date: Optional[str] = None
     travel_start_date: str
     travel_end_date: str
     num_travelers: int = 1
-    travelers: List[str] = Field(default_factory=list)
+    travelers: List[str] = []
     room_type: Optional[str] = None
     total_amount: float
     payment_status: PaymentStatus = PaymentStatus.PENDING
@@ -122,37 +126,37 @@ class Booking(BaseModel):
     payment_mode: Optional[str] = None
 
 
-class TripProgress(BaseModel):
+class TripProgress(msgspec.Struct, kw_only=True):
     """Current trip progress for active travelers"""
-    current_day: int = Field(description="Current day number")
-    current_location: str = Field(description="Current city/location")
+    current_day: int  # Current day number
+    current_location: str  # Current city/location
     current_hotel: Optional[str] = None
-    current_activities: List[str] = Field(default_factory=list)
+    current_activities: List[str] = []
     status: TripStatus = TripStatus.UPCOMING
-    completed_days: List[int] = Field(default_factory=list)
+    completed_days: List[int] = []
 
 
-class CustomerPreferences(BaseModel):
+class CustomerPreferences(msgspec.Struct, kw_only=True):
     """Customer preferences"""
     food_preference: Optional[str] = None  # veg, non-veg, vegan, jain
-    special_requirements: List[str] = Field(default_factory=list)
-    interests: List[str] = Field(default_factory=list)
+    special_requirements: List[str] = []
+    interests: List[str] = []
     budget_category: Optional[str] = None  # standard, premium, luxury
-    medical_conditions: List[str] = Field(default_factory=list)
+    medical_conditions: List[str] = []
 
 
-class EmergencyContact(BaseModel):
+class EmergencyContact(msgspec.Struct, kw_only=True):
     """Emergency contact details"""
     name: str
     phone: str
     relationship: Optional[str] = None
 
 
-class Customer(BaseModel):
+class Customer(msgspec.Struct, kw_only=True):
     """Customer entity"""
-    customer_id: str = Field(description="Unique customer ID")
-    name: str = Field(description="Full name")
-    name_normalized: str = Field(description="Lowercase normalized name")
+    customer_id: str  # Unique customer ID
+    name: str  # Full name
+    name_normalized: str  # Lowercase normalized name
     phone: str
     email: Optional[str] = None
     address: Optional[str] = None
@@ -165,19 +169,19 @@ class Customer(BaseModel):
     notes: Optional[str] = None
 
 
-class Destination(BaseModel):
+class Destination(msgspec.Struct, kw_only=True):
     """Destination/City information"""
-    name: str = Field(description="City/destination name")
+    name: str  # City/destination name
     state: Optional[str] = None
     description: Optional[str] = None
-    famous_for: List[str] = Field(default_factory=list)
+    famous_for: List[str] = []
     best_time_to_visit: Optional[str] = None
-    local_cuisine: List[str] = Field(default_factory=list)
-    attractions: List[str] = Field(default_factory=list)
-    tips: List[str] = Field(default_factory=list)
+    local_cuisine: List[str] = []
+    attractions: List[str] = []
+    tips: List[str] = []
 
 
-class BusinessSummary(BaseModel):
+class BusinessSummary(msgspec.Struct, kw_only=True):
     """Overall business summary"""
     total_customers: int = 0
     total_bookings: int = 0
@@ -190,11 +194,11 @@ class BusinessSummary(BaseModel):
     payment_pending_amount: float = 0
 
 
-class ExtractedEntities(BaseModel):
+class ExtractedEntities(msgspec.Struct, kw_only=True):
     """Container for all extracted entities"""
-    customers: List[Customer] = Field(default_factory=list)
-    packages: List[TripPackage] = Field(default_factory=list)
-    destinations: List[Destination] = Field(default_factory=list)
-    hotels: List[Hotel] = Field(default_factory=list)
+    customers: List[Customer] = []
+    packages: List[TripPackage] = []
+    destinations: List[Destination] = []
+    hotels: List[Hotel] = []
     business_summary: Optional[BusinessSummary] = None
     source_file: str = ""
@@ -4,61 +4,324 @@ For Travel Business WhatsApp Bot
 
 This module implements history-aware retrieval using:
 - RunnableWithMessageHistory for session management
-- Global dict store (keyed by phone number)
+- Bounded in-memory store (LRU + idle TTL, keyed by phone number), or Redis when REDIS_URL is set
 - Question reformulation for follow-up handling
 """
 import os
-from typing import Dict, List, Any, Optional
-from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain_core.messages import HumanMessage, AIMessage, BaseMessage
-from langchain_core.runnables import RunnablePassthrough, RunnableLambda
+import re
+import logging
+import hashlib
+import sys
+import time
+import threading
+import weakref
+import functools
+from collections import OrderedDict, deque
+import numpy as np
+from typing import TYPE_CHECKING, Dict, Iterator, List, Any, Optional, Tuple
+from langchain_core.prompts.chat import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.messages.base import BaseMessage
+from langchain_core.runnables.base import RunnableLambda
 from langchain_core.runnables.history import RunnableWithMessageHistory
-from langchain_core.output_parsers import StrOutputParser
+from langchain_core.output_parsers.string import StrOutputParser
 from langchain_core.chat_history import BaseChatMessageHistory
-from langchain_community.chat_message_histories import ChatMessageHistory
-from langchain_openai import ChatOpenAI
 
+if TYPE_CHECKING:
+    # langchain_openai/openai are imported where the clients are built, to keep module import light
+    from langchain_openai import ChatOpenAI
+    from openai import OpenAI
+
+# Module logger; DEBUG records are dropped at the level check when disabled
+logger = logging.getLogger("travel_bot.rag")
 
 # =============================================================================
 # SESSION STORE
-# In production, replace this dict with RedisChatMessageHistory or similar
+# In-memory LRU + idle-TTL map by default. Set REDIS_URL to share history
+# across workers/replicas via RedisChatMessageHistory.
 # =============================================================================
-store: Dict[str, ChatMessageHistory] = {}
+REDIS_URL = os.getenv("REDIS_URL")
+SESSION_TTL = int(os.getenv("SESSION_TTL", "3600"))  # seconds
+SESSION_MAX = int(os.getenv("SESSION_MAX", "10000"))  # in-memory sessions kept before LRU eviction
+SESSION_MAX_MESSAGES = 10  # default per-session history length (5 turns)
+REDIS_KEY_PREFIX = "message_store:"  # RedisChatMessageHistory default prefix
+
+_redis_client = None
+
+# /sessions preview cache: session_id -> (message_count, preview list);
+# pruned to the live sessions whenever get_all_sessions lists them
+_sessions_cache: Dict[str, tuple] = {}
+PREVIEW_LENGTH = 100
 
 
-def get_session_history(session_id: str) -> BaseChatMessageHistory:
+class BoundedChatMessageHistory(BaseChatMessageHistory):
+    """
+    In-memory chat history backed by deque(maxlen): appends are O(1) and the
+    oldest messages fall off automatically, so no trimming pass is needed.
+    """
+
+    def __init__(self, max_messages: int):
+        self._messages: deque = deque(maxlen=max_messages)
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        return list(self._messages)
+
+    def add_message(self, message: BaseMessage) -> None:
+        self._messages.append(message)
+
+    def add_messages(self, messages) -> None:
+        self._messages.extend(messages)
+
+    def clear(self) -> None:
+        self._messages.clear()
+
+
+class SessionStore:
+    """
+    Bounded session_id -> BoundedChatMessageHistory map.
+    Sessions idle for longer than ttl expire, and the least recently used
+    session is evicted once maxsize is reached. All access is under one lock.
+    """
+
+    def __init__(self, maxsize: int, ttl: int):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, Tuple[float, BoundedChatMessageHistory]]" = OrderedDict()
+        self._lock = threading.RLock()
+
+    def _expire(self, now: float):
+        """Drop idle sessions (oldest are at the front)"""
+        while self._data:
+            session_id, (last_used, _) = next(iter(self._data.items()))
+            if now - last_used < self.ttl:
+                break
+            del self._data[session_id]
+
+    def get(self, session_id: str) -> Optional[BoundedChatMessageHistory]:
+        """Get a live session and mark it as recently used"""
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            entry = self._data.get(session_id)
+            if entry is None:
+                return None
+            self._data[session_id] = (now, entry[1])
+            self._data.move_to_end(session_id)
+            return entry[1]
+
+    def get_or_create(self, session_id: str, max_messages: int) -> Tuple[BoundedChatMessageHistory, bool]:
+        """Get a session, creating it (keeping max_messages) if needed; returns (history, created)"""
+        # Phone numbers arrive as fresh strings from each webhook body; store an interned key
+        session_id = sys.intern(session_id)
+        with self._lock:
+            history = self.get(session_id)
+            if history is not None:
+                return history, False
+            history = BoundedChatMessageHistory(max_messages)
+            self._data[session_id] = (time.monotonic(), history)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            return history, True
+
+    def pop(self, session_id: str) -> Optional[BoundedChatMessageHistory]:
+        with self._lock:
+            entry = self._data.pop(session_id, None)
+            return entry[1] if entry is not None else None
+
+    def items(self) -> List[Tuple[str, BoundedChatMessageHistory]]:
+        """Snapshot of the live sessions"""
+        with self._lock:
+            self._expire(time.monotonic())
+            return [(session_id, history) for session_id, (_, history) in self._data.items()]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+store = SessionStore(maxsize=SESSION_MAX, ttl=SESSION_TTL)
+
+# Per-session locks: a burst of messages from one user is processed one at a
+# time (history stays ordered) while other users never wait on it. Entries
+# vanish once no turn holds a reference, so the map stays bounded.
+_session_locks: "weakref.WeakValueDictionary[str, threading.Lock]" = weakref.WeakValueDictionary()
+_session_locks_guard = threading.Lock()
+
+
+def _session_lock(session_id: str) -> threading.Lock:
+    with _session_locks_guard:
+        lock = _session_locks.get(session_id)
+        if lock is None:
+            lock = threading.Lock()
+            _session_locks[session_id] = lock
+        return lock
+
+
+def _get_redis():
+    """Get the shared Redis client (only used when REDIS_URL is set)"""
+    global _redis_client
+    if _redis_client is None:
+        import redis
+        _redis_client = redis.Redis.from_url(REDIS_URL)
+    return _redis_client
+
+
+def get_session_history(session_id: str, max_messages: int = SESSION_MAX_MESSAGES) -> BaseChatMessageHistory:
     """
     Get or create chat history for a session.
 
     Args:
         session_id: The WhatsApp phone number (wa_id) of the user
+        max_messages: History length kept for a new in-memory session
 
     Returns:
-        ChatMessageHistory instance for this session
+        BoundedChatMessageHistory (or RedisChatMessageHistory) instance for this session
     """
-    if session_id not in store:
-        store[session_id] = ChatMessageHistory()
-        print(f"[Memory] Created new session for: {session_id}")
+    if REDIS_URL:
+        from langchain_community.chat_message_histories import RedisChatMessageHistory
+        return RedisChatMessageHistory(
+            session_id,
+            url=REDIS_URL,
+            key_prefix=REDIS_KEY_PREFIX,
+            ttl=SESSION_TTL
+        )
+
+    history, created = store.get_or_create(session_id, max_messages)
+    if created:
+        logger.debug("Created new session for: %s", session_id)
     else:
-        print(f"[Memory] Retrieved session for: {session_id} ({len(store[session_id].messages)} messages)")
-    return store[session_id]
+        logger.debug("Retrieved session for: %s (%d messages)", session_id, len(history.messages))
+    return history
+
+
+def get_session_messages(session_id: str) -> List[BaseMessage]:
+    """Get the messages of an existing session (empty if the session doesn't exist)"""
+    if REDIS_URL:
+        return get_session_history(session_id).messages
+    history = store.get(session_id)
+    return history.messages if history is not None else []
+
+
+def get_session_preview(session_id: str, message_count: int) -> List[Dict[str, str]]:
+    """Get truncated role/content previews for a session, reusing the cached list while the message count is unchanged"""
+    cached = _sessions_cache.get(session_id)
+    if cached is not None and cached[0] == message_count:
+        return cached[1]
+
+    preview = [
+        {
+            "role": msg.type,
+            "content": msg.content[:PREVIEW_LENGTH] + "..." if len(msg.content) > PREVIEW_LENGTH else msg.content
+        }
+        for msg in get_session_messages(session_id)
+    ]
+    _sessions_cache[session_id] = (message_count, preview)
+    return preview
 
 
 def clear_session(session_id: str) -> bool:
     """Clear chat history for a session"""
-    if session_id in store:
-        del store[session_id]
-        print(f"[Memory] Cleared session for: {session_id}")
+    _sessions_cache.pop(session_id, None)
+    with _response_cache_lock:
+        _response_cache.pop(session_id, None)
+    if REDIS_URL:
+        cleared = _get_redis().delete(f"{REDIS_KEY_PREFIX}{session_id}") > 0
+        if cleared:
+            logger.debug("Cleared session for: %s", session_id)
+        return cleared
+
+    if store.pop(session_id) is not None:
+        logger.debug("Cleared session for: %s", session_id)
         return True
     return False
 
 
 def get_all_sessions() -> Dict[str, int]:
     """Get all active sessions with message counts"""
-    return {
-        session_id: len(history.messages)
-        for session_id, history in store.items()
-    }
+    if REDIS_URL:
+        client = _get_redis()
+        sessions = {}
+        for key in client.scan_iter(match=f"{REDIS_KEY_PREFIX}*"):
+            key = key.decode("utf-8") if isinstance(key, bytes) else key
+            sessions[key[len(REDIS_KEY_PREFIX):]] = client.llen(key)
+    else:
+        sessions = {
+            session_id: len(history.messages)
+            for session_id, history in store.items()
+        }
+
+    # Previews are only built for listed sessions; forget the ones that expired or were evicted since
+    for session_id in _sessions_cache.keys() - sessions.keys():
+        _sessions_cache.pop(session_id, None)
+    return sessions
+
+
+# =============================================================================
+# SEMANTIC RESPONSE CACHE
+# Per-session (query embedding, response) pairs. A near-duplicate question
+# within the TTL (e.g. repeated "Day 1 plan" button taps) is answered from
+# the cache without retrieval, reranking or LLM calls. Only standalone
+# questions are cached: "yes" or "what time does it open?" embed the same
+# whatever was discussed before, so follow-ups always go to the agent.
+# =============================================================================
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))  # cosine similarity
+SEMANTIC_CACHE_TTL = int(os.getenv("SEMANTIC_CACHE_TTL", "300"))  # seconds
+SEMANTIC_CACHE_MAX_ENTRIES = 32  # per session, oldest evicted first
+
+# session_id -> [(created_at, unit query embedding, digits in query, response)].
+# Sessions are kept in order of their last write, so once the newest entry of
+# the front session has expired every session before it has too; at most
+# SESSION_MAX sessions are kept, like the history store.
+_response_cache: "OrderedDict[str, List[Tuple[float, np.ndarray, Tuple[str, ...], str]]]" = OrderedDict()
+_response_cache_lock = threading.Lock()
+
+_DIGITS_RE = re.compile(r"\d+")
+
+
+def _expire_cached_responses(cutoff: float):
+    """Drop sessions whose newest cached response is older than cutoff (call under _response_cache_lock)"""
+    while _response_cache:
+        entries = next(iter(_response_cache.values()))
+        if entries[-1][0] >= cutoff:
+            break
+        _response_cache.popitem(last=False)
+
+
+def _lookup_cached_response(session_id: str, embedding: np.ndarray, question: str) -> Optional[str]:
+    """Return a cached response for a semantically equivalent question, or None"""
+    with _response_cache_lock:
+        entries = _response_cache.get(session_id)
+        if not entries:
+            return None
+
+        # Drop expired entries (they are stored oldest first)
+        cutoff = time.monotonic() - SEMANTIC_CACHE_TTL
+        while entries and entries[0][0] < cutoff:
+            entries.pop(0)
+        if not entries:
+            del _response_cache[session_id]
+            return None
+
+        similarities = np.stack([entry[1] for entry in entries]) @ embedding
+        best = int(np.argmax(similarities))
+        # "Day 3 plan" and "Day 4 plan" embed almost identically, so numbers must match exactly
+        if similarities[best] >= SEMANTIC_CACHE_THRESHOLD and entries[best][2] == tuple(_DIGITS_RE.findall(question)):
+            return entries[best][3]
+        return None
+
+
+def _cache_response(session_id: str, embedding: np.ndarray, question: str, response: str):
+    """Remember a response for this session's question"""
+    now = time.monotonic()
+    with _response_cache_lock:
+        _expire_cached_responses(now - SEMANTIC_CACHE_TTL)
+        entries = _response_cache.setdefault(session_id, [])
+        _response_cache.move_to_end(session_id)
+        entries.append((now, embedding, tuple(_DIGITS_RE.findall(question)), response))
+        if len(entries) > SEMANTIC_CACHE_MAX_ENTRIES:
+            entries.pop(0)
+        if len(_response_cache) > SESSION_MAX:
+            _response_cache.popitem(last=False)
 
 
 # =============================================================================
@@ -79,7 +342,59 @@ Examples for a travel assistant context:
 """
 
 
-def create_contextualize_chain(llm: ChatOpenAI):
+# Built once at import; every chain instance reuses it
+_CONTEXTUALIZE_PROMPT = ChatPromptTemplate.from_messages([
+    ("system", CONTEXTUALIZE_SYSTEM_PROMPT),
+    MessagesPlaceholder("chat_history"),
+    ("human", "{input}")
+])
+
+REFORMULATION_CACHE_SIZE = 512
+
+# Words that usually mean the question leans on earlier turns. Questions
+# without any of them (and longer than a few words) are sent as-is.
+_FOLLOWUP_RE = re.compile(
+    r"\b(he|she|him|his|her|hers|they|them|their|there|it|its|that|this|those|these|"
+    r"tomorrow|yesterday|next|previous|same|again|recheck|else|more)\b",
+    re.IGNORECASE
+)
+
+
+def _is_followup(question: str) -> bool:
+    """Whether the question probably leans on earlier turns (reference words, or only a few words)"""
+    return bool(_FOLLOWUP_RE.search(question)) or len(question.split()) <= 3
+
+
+# =============================================================================
+# SHARED OPENAI CLIENTS
+# One pooled HTTP/2 connection set for the agent, reranker, embeddings and
+# the contextualize LLM, so they reuse warm keep-alive connections.
+# =============================================================================
+
+def create_shared_openai_clients(
+    openai_api_key: str,
+    model: str = "gpt-4o-mini"
+) -> Tuple["OpenAI", "ChatOpenAI"]:
+    """Build an OpenAI client and a ChatOpenAI that share one httpx connection pool"""
+    import httpx
+    from langchain_openai import ChatOpenAI
+    from openai import OpenAI
+
+    http_client = httpx.Client(
+        http2=True,
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32)
+    )
+    client = OpenAI(api_key=openai_api_key, http_client=http_client)
+    llm = ChatOpenAI(
+        api_key=openai_api_key,
+        model=model,
+        temperature=0,
+        http_client=http_client
+    )
+    return client, llm
+
+
+def create_contextualize_chain(llm: "ChatOpenAI"):
     """
     Create a chain that reformulates questions based on chat history.
 
@@ -87,13 +402,7 @@ def create_contextualize_chain(llm: ChatOpenAI):
     - "what about tomorrow?" -> "What are the activities for Day 4?"
     - "where is he now?" -> "Where is Amit Sharma now?"
     """
-    contextualize_prompt = ChatPromptTemplate.from_messages([
-        ("system", CONTEXTUALIZE_SYSTEM_PROMPT),
-        MessagesPlaceholder("chat_history"),
-        ("human", "{input}")
-    ])
-
-    return contextualize_prompt | llm | StrOutputParser()
+    return _CONTEXTUALIZE_PROMPT | llm | StrOutputParser()
 
 
 # =============================================================================
@@ -134,46 +443,63 @@ class ConversationalRAGChain:
         agent,  # SimpleAgent or TravelRAGAgent
         openai_api_key: str,
         model: str = "gpt-4o-mini",
-        max_history_messages: int = 10  # Keep last 10 messages (5 turns)
+        max_history_messages: int = 10,  # Keep last 10 messages (5 turns)
+        embedding_model: str = "text-embedding-3-small",
+        llm: Optional["ChatOpenAI"] = None,
+        openai_client: Optional["OpenAI"] = None
     ):
+        if llm is None:
+            from langchain_openai import ChatOpenAI
+            llm = ChatOpenAI(
+                api_key=openai_api_key,
+                model=model,
+                temperature=0
+            )
+        if openai_client is None:
+            from openai import OpenAI
+            openai_client = OpenAI(api_key=openai_api_key)
+
         self.agent = agent
-        self.llm = ChatOpenAI(
-            api_key=openai_api_key,
-            model=model,
-            temperature=0
-        )
+        self.llm = llm
         self.max_history_messages = max_history_messages
+        self._get_session_history = functools.partial(get_session_history, max_messages=max_history_messages)
+        self.embedding_client = openai_client
+        self.embedding_model = embedding_model
 
         # Create the contextualize chain
         self.contextualize_chain = create_contextualize_chain(self.llm)
 
+        # (question, history digest) -> reformulated question, LRU-bounded
+        self._reformulation_cache: "OrderedDict[Tuple[str, bytes], str]" = OrderedDict()
+        self._reformulation_lock = threading.Lock()
+
         # Create the main chain wrapped with message history
         self._setup_chain()
 
     def _setup_chain(self):
         """Setup the conversational chain with history"""
 
-        # The core chain that processes queries
-        def process_with_context(inputs: Dict[str, Any]) -> str:
-            """Process the reformulated question through the agent"""
+        # The core chain that processes queries. It is a generator, so
+        # chain_with_history.stream() yields text as the agent generates it and
+        # .invoke() returns the joined response; both write history the same way.
+        def process_with_context(inputs: Dict[str, Any], config: Dict[str, Any]) -> Iterator[str]:
+            """Process the reformulated question through the agent (or the semantic cache)"""
+            session_id = config["configurable"]["session_id"]
             question = inputs.get("input", "")
-            chat_history = inputs.get("chat_history", [])
-
-            # Reformulate question if there's chat history
-            if chat_history:
-                reformulated = self.contextualize_chain.invoke({
-                    "input": question,
-                    "chat_history": chat_history
-                })
-                print(f"[RAG Chain] Original: '{question}'")
-                print(f"[RAG Chain] Reformulated: '{reformulated}'")
-            else:
-                reformulated = question
-                print(f"[RAG Chain] Query (no history): '{question}'")
+            reformulated = self._contextualize(question, inputs.get("chat_history", []))
+
+            embedding, cached = self._lookup_cache(session_id, question, reformulated)
+            if cached is not None:
+                yield cached
+                return
 
             # Process through the agent (which handles tools, retrieval, etc.)
-            response = self.agent.query(reformulated)
-            return response
+            parts = []
+            for part in self.agent.query_stream(reformulated):
+                parts.append(part)
+                yield part
+            if embedding is not None:
+                _cache_response(session_id, embedding, reformulated, "".join(parts))
 
         # Create the runnable
         self.chain = RunnableLambda(process_with_context)
@@ -181,7 +507,7 @@ class ConversationalRAGChain:
         # Wrap with message history
         self.chain_with_history = RunnableWithMessageHistory(
             self.chain,
-            get_session_history,
+            self._get_session_history,
             input_messages_key="input",
             history_messages_key="chat_history"
         )
@@ -197,9 +523,17 @@ class ConversationalRAGChain:
         Returns:
             Agent's response
         """
+        # One turn per session at a time, so concurrent webhooks from the same
+        # user can't interleave history reads/writes or race the trim
+        with _session_lock(session_id):
+            return self._invoke(session_id, question)
+
+    def _invoke(self, session_id: str, question: str) -> str:
+        """Run one conversation turn (caller holds the session lock)"""
         config = {"configurable": {"session_id": session_id}}
 
         try:
+            # Cache hits go through the chain too, so the turn is still written to history
             response = self.chain_with_history.invoke(
                 {"input": question},
                 config=config
@@ -210,26 +544,109 @@ class ConversationalRAGChain:
 
             return response
 
-        except Exception as e:
-            print(f"[RAG Chain] Error: {e}")
-            import traceback
-            traceback.print_exc()
+        except Exception:
+            logger.exception("RAG chain error")
             return f"I encountered an error processing your request. Please try rephrasing your question."
 
+    def invoke_stream(self, session_id: str, question: str) -> Iterator[str]:
+        """
+        Like invoke, but yields the response text as the agent generates it.
+        The full response is written to history once generation finishes.
+        """
+        config = {"configurable": {"session_id": session_id}}
+
+        with _session_lock(session_id):
+            try:
+                yield from self.chain_with_history.stream({"input": question}, config=config)
+                self._trim_history(session_id)
+
+            except Exception:
+                logger.exception("RAG chain error")
+                yield f"I encountered an error processing your request. Please try rephrasing your question."
+
+    def _lookup_cache(
+        self,
+        session_id: str,
+        question: str,
+        standalone: str
+    ) -> Tuple[Optional[np.ndarray], Optional[str]]:
+        """
+        Semantic cache lookup keyed on the standalone question.
+        Returns (embedding to cache the answer under, cached response); both
+        are None for follow-ups, which are never cached.
+        """
+        if _is_followup(question):
+            return None, None
+        embedding = self._embed_question(standalone)
+        if embedding is None:
+            return None, None
+        cached = _lookup_cached_response(session_id, embedding, standalone)
+        if cached is not None:
+            logger.debug("Semantic cache hit for: %r", standalone)
+        return embedding, cached
+
+    def _contextualize(self, question: str, chat_history: List[BaseMessage]) -> str:
+        """Standalone version of the question (reformulated only when it looks like a follow-up)"""
+        if chat_history and not _is_followup(question):
+            logger.debug("Query (standalone, no reformulation): %r", question)
+            return question
+        if chat_history:
+            reformulated = self._reformulate(question, chat_history)
+            logger.debug("Original: %r, reformulated: %r", question, reformulated)
+            return reformulated
+        logger.debug("Query (no history): %r", question)
+        return question
+
+    def _reformulate(self, question: str, chat_history: List[BaseMessage]) -> str:
+        """Run the contextualize chain, reusing the result for an identical question + history"""
+        history_digest = hashlib.blake2b(
+            b"\x00".join(f"{m.type}:{m.content}".encode("utf-8") for m in chat_history),
+            digest_size=16
+        ).digest()
+        key = (question, history_digest)
+
+        with self._reformulation_lock:
+            cached = self._reformulation_cache.get(key)
+            if cached is not None:
+                self._reformulation_cache.move_to_end(key)
+                return cached
+
+        reformulated = self.contextualize_chain.invoke({
+            "input": question,
+            "chat_history": chat_history
+        })
+
+        with self._reformulation_lock:
+            self._reformulation_cache[key] = reformulated
+            if len(self._reformulation_cache) > REFORMULATION_CACHE_SIZE:
+                self._reformulation_cache.popitem(last=False)
+        return reformulated
+
+    def _embed_question(self, question: str) -> Optional[np.ndarray]:
+        """Unit-length embedding of the normalized question (None if the embedding call fails)"""
+        try:
+            response = self.embedding_client.embeddings.create(
+                model=self.embedding_model,
+                input=" ".join(question.lower().split())
+            )
+        except Exception as e:
+            logger.warning("Semantic cache disabled for this query: %s", e)
+            return None
+        embedding = np.asarray(response.data[0].embedding, dtype=np.float32)
+        return embedding / np.linalg.norm(embedding)
+
     def _trim_history(self, session_id: str):
-        """Keep only the last max_history_messages"""
-        if session_id in store:
-            history = store[session_id]
-            if len(history.messages) > self.max_history_messages:
-                # Keep only the most recent messages
-                history.messages = history.messages[-self.max_history_messages:]
-                print(f"[Memory] Trimmed history for {session_id} to {len(history.messages)} messages")
+        """Keep only the last max_history_messages (in-memory histories are bounded deques already)"""
+        # Trimming keeps the count steady while the content shifts, so drop the preview
+        _sessions_cache.pop(session_id, None)
+
+        if REDIS_URL:
+            # RedisChatMessageHistory LPUSHes, so the newest messages are at the head
+            _get_redis().ltrim(f"{REDIS_KEY_PREFIX}{session_id}", 0, self.max_history_messages - 1)
 
     def get_history(self, session_id: str) -> List[BaseMessage]:
         """Get chat history for a session"""
-        if session_id in store:
-            return store[session_id].messages
-        return []
+        return get_session_messages(session_id)
 
     def clear_history(self, session_id: str):
         """Clear history for a session"""
@@ -244,7 +661,9 @@ def create_conversational_rag_chain(
     agent,
     openai_api_key: str,
     model: str = "gpt-4o-mini",
-    max_turns: int = 5
+    max_turns: int = 5,
+    llm: Optional["ChatOpenAI"] = None,
+    openai_client: Optional["OpenAI"] = None
 ) -> ConversationalRAGChain:
     """
     Create a conversational RAG chain with session memory.
@@ -254,6 +673,8 @@ def create_conversational_rag_chain(
         openai_api_key: OpenAI API key
         model: Model to use for contextualization
         max_turns: Max conversation turns to keep (1 turn = user + assistant)
+        llm: Shared ChatOpenAI (see create_shared_openai_clients); built from the key if omitted
+        openai_client: Shared OpenAI client for embeddings; built from the key if omitted
 
     Returns:
         ConversationalRAGChain instance
@@ -262,7 +683,9 @@ def create_conversational_rag_chain(
         agent=agent,
         openai_api_key=openai_api_key,
         model=model,
-        max_history_messages=max_turns * 2  # Each turn has 2 messages
+        max_history_messages=max_turns * 2,  # Each turn has 2 messages
+        llm=llm,
+        openai_client=openai_client
     )
 
 
@@ -280,6 +703,7 @@ if __name__ == "__main__":
         exit(1)
 
     # Test the contextualize chain directly
+    from langchain_openai import ChatOpenAI
     llm = ChatOpenAI(api_key=api_key, model="gpt-4o-mini", temperature=0)
     contextualize = create_contextualize_chain(llm)
 
@@ -3,12 +3,25 @@ Reranker Module using LLM-based reranking
 For Travel Business RAG System
 """
 import os
+import logging
+import numpy as np
+import orjson
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 from openai import OpenAI
 
+logger = logging.getLogger("travel_bot.reranker")
 
-@dataclass
+@dataclass(slots=True, frozen=True)
+class SearchHit:
+    """A retrieved document passed in for reranking"""
+    content: str
+    metadata: Dict[str, Any]
+    score: float = 0.0
+
+
+@dataclass(slots=True)
 class RankedResult:
     """A reranked search result"""
     content: str
@@ -18,78 +31,99 @@ class RankedResult:
     relevance_explanation: Optional[str] = None
 
 
+# Per-document budget in the batch scoring prompt (~500 chars of English)
+DOC_TOKEN_LIMIT = 128
+
+
+@lru_cache(maxsize=4)
+def _encoding(model: str):
+    """tiktoken encoding for model, loaded on first use (None if unavailable)"""
+    try:
+        import tiktoken
+        return tiktoken.encoding_for_model(model)
+    except Exception as e:
+        logger.warning("tiktoken encoding for %s unavailable (%s), truncating by characters", model, e)
+        return None
+
+
+@lru_cache(maxsize=1024)
+def _truncate_tokens(text: str, max_tokens: int, model: str) -> str:
+    """Cut text to at most max_tokens tokens; retrieved chunks repeat across sessions, so results are cached"""
+    encoding = _encoding(model)
+    if encoding is None:
+        return text[:max_tokens * 4]
+    tokens = encoding.encode(text)
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+
+def _top_k_results(results: List[SearchHit], scores: np.ndarray, top_k: int) -> List[RankedResult]:
+    """Build RankedResults for the top_k scores, highest first (ties keep input order)"""
+    order = np.argsort(-scores, kind="stable")[:top_k]
+    return [
+        RankedResult(
+            content=results[i].content,
+            metadata=results[i].metadata,
+            original_score=results[i].score,
+            rerank_score=float(scores[i])
+        )
+        for i in order
+    ]
+
+
+def _passthrough_results(results: List[SearchHit], top_k: int) -> List[RankedResult]:
+    """Keep the retrieval order and scores when reranking is unavailable"""
+    return [
+        RankedResult(
+            content=r.content,
+            metadata=r.metadata,
+            original_score=r.score,
+            rerank_score=r.score
+        )
+        for r in results[:top_k]
+    ]
+
+
 class LLMReranker:
     """
     Reranker using LLM (GPT-4) for intelligent relevance scoring.
     Best for complex queries where semantic understanding matters.
     """
 
-    def __init__(self, openai_api_key: str, model: str = "gpt-4o-mini"):
-        self.client = OpenAI(api_key=openai_api_key)
+    def __init__(
+        self,
+        openai_api_key: str,
+        model: str = "gpt-4o-mini",
+        openai_client: Optional[OpenAI] = None
+    ):
+        # Prefer the app-wide client so scoring calls reuse its warm connections
+        self.client = openai_client or OpenAI(api_key=openai_api_key)
         self.model = model
+        # Static part of the batch scoring prompt, built once
+        self._prompt_prefix = (
+            'Score each document\'s relevance to the travel query (0-10). '
+            'Respond with JSON: {"scores": [{"doc": <n>, "score": <0-10>}, ...]}\n\n'
+            'Query: '
+        )
 
     def rerank(
         self,
         query: str,
-        results: List[Dict[str, Any]],
+        results: List[SearchHit],
         top_k: int = 5
     ) -> List[RankedResult]:
         """
         Rerank results using LLM scoring.
-        Scores each result for relevance to the query.
+        Same as batch_rerank: all documents are scored in one LLM call
+        rather than one round trip per document.
         """
-        if not results:
-            return []
-
-        ranked_results = []
-
-        for result in results:
-            content = result.get('content', '')[:1500]
-            score, explanation = self._score_relevance(query, content)
-
-            ranked_results.append(RankedResult(
-                content=result.get('content', ''),
-                metadata=result.get('metadata', {}),
-                original_score=result.get('score', 0),
-                rerank_score=score,
-                relevance_explanation=explanation
-            ))
-
-        ranked_results.sort(key=lambda x: x.rerank_score, reverse=True)
-        return ranked_results[:top_k]
-
-    def _score_relevance(self, query: str, content: str) -> tuple:
-        """Score content relevance to query using LLM"""
-        prompt = f"""Score the relevance of this travel information to the query on a scale of 0-10.
-
-Query: {query}
-
-Information:
-{content}
-
-Respond with ONLY a JSON object:
-{{"score": <number 0-10>, "reason": "<brief explanation>"}}"""
-
-        try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[{"role": "user", "content": prompt}],
-                temperature=0,
-                max_tokens=100
-            )
-
-            import json
-            result = json.loads(response.choices[0].message.content)
-            return float(result.get('score', 5)) / 10.0, result.get('reason', '')
-
-        except Exception as e:
-            print(f"LLM scoring error: {e}")
-            return 0.5, "Error scoring"
+        return self.batch_rerank(query, results, top_k=top_k)
 
     def batch_rerank(
         self,
         query: str,
-        results: List[Dict[str, Any]],
+        results: List[SearchHit],
         top_k: int = 5
     ) -> List[RankedResult]:
         """
@@ -101,54 +135,29 @@ Respond with ONLY a JSON object:
         # Format documents for batch scoring
         docs_text = ""
         for i, result in enumerate(results):
-            content = result.get('content', '')[:500]
+            content = _truncate_tokens(result.content, DOC_TOKEN_LIMIT, self.model)
             docs_text += f"\n[Doc {i+1}]: {content}\n"
 
-        prompt = f"""Score each document's relevance to the travel query (0-10).
-
-Query: {query}
-
-Documents:{docs_text}
-
-Respond with ONLY a JSON array of scores:
-[{{"doc": 1, "score": <0-10>}}, {{"doc": 2, "score": <0-10>}}, ...]"""
+        prompt = f"{self._prompt_prefix}{query}\n\nDocuments:{docs_text}"
 
         try:
             response = self.client.chat.completions.create(
                 model=self.model,
                 messages=[{"role": "user", "content": prompt}],
                 temperature=0,
-                max_tokens=500
+                max_tokens=500,
+                response_format={"type": "json_object"}  # guarantees parseable JSON
             )
 
-            import json
-            scores_data = json.loads(response.choices[0].message.content)
+            scores_data = orjson.loads(response.choices[0].message.content).get("scores", [])
             scores_map = {s['doc']: s['score'] for s in scores_data}
 
-            ranked_results = []
-            for i, result in enumerate(results):
-                score = scores_map.get(i + 1, 5) / 10.0
-                ranked_results.append(RankedResult(
-                    content=result.get('content', ''),
-                    metadata=result.get('metadata', {}),
-                    original_score=result.get('score', 0),
-                    rerank_score=score
-                ))
-
-            ranked_results.sort(key=lambda x: x.rerank_score, reverse=True)
-            return ranked_results[:top_k]
+            scores = np.array([scores_map.get(i + 1, 5) for i in range(len(results))], dtype=np.float64) / 10.0
+            return _top_k_results(results, scores, top_k)
 
         except Exception as e:
-            print(f"Batch reranking error: {e}")
-            return [
-                RankedResult(
-                    content=r.get('content', ''),
-                    metadata=r.get('metadata', {}),
-                    original_score=r.get('score', 0),
-                    rerank_score=r.get('score', 0)
-                )
-                for r in results[:top_k]
-            ]
+            logger.warning("Batch reranking error: %s", e)
+            return _passthrough_results(results, top_k)
 
 
 class CrossEncoderReranker:
@@ -163,20 +172,30 @@ class CrossEncoderReranker:
         self._load_model()
 
     def _load_model(self):
-        """Try to load the cross-encoder model"""
+        """Try to load the cross-encoder model (ONNX Runtime on CPU when available)"""
         try:
             from sentence_transformers import CrossEncoder
-            self.cross_encoder = CrossEncoder(self.model_name)
-            print(f"Cross-encoder loaded: {self.model_name}")
+            try:
+                self.cross_encoder = CrossEncoder(
+                    self.model_name,
+                    backend="onnx",
+                    model_kwargs={"provider": "CPUExecutionProvider"}
+                )
+                logger.info("Cross-encoder loaded (ONNX): %s", self.model_name)
+            except Exception as e:
+                # Older sentence-transformers or no onnxruntime: plain PyTorch backend
+                logger.info("ONNX backend unavailable (%s), loading PyTorch cross-encoder", e)
+                self.cross_encoder = CrossEncoder(self.model_name)
+                logger.info("Cross-encoder loaded: %s", self.model_name)
         except ImportError:
-            print("sentence-transformers not installed, using fallback reranking")
+            logger.warning("sentence-transformers not installed, using fallback reranking")
         except Exception as e:
-            print(f"Failed to load cross-encoder: {e}")
+            logger.warning("Failed to load cross-encoder: %s", e)
 
     def rerank(
         self,
         query: str,
-        results: List[Dict[str, Any]],
+        results: List[SearchHit],
         top_k: int = 5
     ) -> List[RankedResult]:
         """Rerank results using cross-encoder"""
@@ -184,42 +203,37 @@ class CrossEncoderReranker:
             return []
 
         if self.cross_encoder is None:
-            return [
-                RankedResult(
-                    content=r.get('content', ''),
-                    metadata=r.get('metadata', {}),
-                    original_score=r.get('score', 0),
-                    rerank_score=r.get('score', 0)
-                )
-                for r in results[:top_k]
-            ]
+            return _passthrough_results(results, top_k)
 
-        pairs = [(query, r.get('content', '')) for r in results]
-        scores = self.cross_encoder.predict(pairs)
+        # All pairs go through predict() together so the model batches them
+        pairs = [(query, r.content) for r in results]
+        scores = self.cross_encoder.predict(pairs, batch_size=32)
 
-        ranked_results = []
-        for i, (result, score) in enumerate(zip(results, scores)):
-            ranked_results.append(RankedResult(
-                content=result.get('content', ''),
-                metadata=result.get('metadata', {}),
-                original_score=result.get('score', 0),
-                rerank_score=float(score)
-            ))
+        return _top_k_results(results, np.asarray(scores), top_k)
 
-        ranked_results.sort(key=lambda x: x.rerank_score, reverse=True)
-        return ranked_results[:top_k]
+    # Same call shape as LLMReranker; the cross-encoder always scores in one batch
+    batch_rerank = rerank
 
 
 def create_reranker(
     openai_api_key: str,
-    use_cross_encoder: bool = False,
-    use_llm: bool = True
+    use_cross_encoder: bool = True,
+    use_llm: bool = False,
+    openai_client: Optional[OpenAI] = None
 ) -> Any:
-    """Factory function to create appropriate reranker"""
-    if use_llm:
-        return LLMReranker(openai_api_key)
-    elif use_cross_encoder:
-        return CrossEncoderReranker()
+    """
+    Factory function to create appropriate reranker.
+    Defaults to the local cross-encoder; falls back to the LLM reranker if
+    sentence-transformers (or the model) can't be loaded.
+    """
+    if use_cross_encoder and not use_llm:
+        reranker = CrossEncoderReranker()
+        if reranker.cross_encoder is not None:
+            return reranker
+        logger.info("Falling back to LLM reranker")
+        return LLMReranker(openai_api_key, openai_client=openai_client)
+    elif use_llm:
+        return LLMReranker(openai_api_key, openai_client=openai_client)
     else:
         return None
 
@@ -233,21 +247,21 @@ if __name__ == "__main__":
     # Test data
     query = "What should I do on Day 1 of the Rajasthan trip?"
     results = [
-        {
-            "content": "DAY 1: PUNE TO JAIPUR - Arrival at 08:15 AM. Visit Amber Fort (11:30 AM), Hawa Mahal (04:15 PM), City Palace (05:15 PM). Dinner at hotel.",
-            "metadata": {"source": "itinerary.txt", "section": "day_1"},
-            "score": 0.85
-        },
-        {
-            "content": "Amit Sharma - Customer ID CUST001, traveling from 15-Dec to 22-Dec. Currently on Day 3 in Pushkar.",
-            "metadata": {"source": "customers.txt", "section": "customer_1"},
-            "score": 0.72
-        },
-        {
-            "content": "Hotel Clarks Amer in Jaipur. Address: JLN Marg, Malviya Nagar. Check-in arranged for 09:15 AM.",
-            "metadata": {"source": "itinerary.txt", "section": "hotel"},
-            "score": 0.68
-        }
+        SearchHit(
+            content="DAY 1: PUNE TO JAIPUR - Arrival at 08:15 AM. Visit Amber Fort (11:30 AM), Hawa Mahal (04:15 PM), City Palace (05:15 PM). Dinner at hotel.",
+            metadata={"source": "itinerary.txt", "section": "day_1"},
+            score=0.85
+        ),
+        SearchHit(
+            content="Amit Sharma - Customer ID CUST001, traveling from 15-Dec to 22-Dec. Currently on Day 3 in Pushkar.",
+            metadata={"source": "customers.txt", "section": "customer_1"},
+            score=0.72
+        ),
+        SearchHit(
+            content="Hotel Clarks Amer in Jaipur. Address: JLN Marg, Malviya Nagar. Check-in arranged for 09:15 AM.",
+            metadata={"source": "itinerary.txt", "section": "hotel"},
+            score=0.68
+        )
     ]
 
     print("=== Testing Rerankers ===\n")
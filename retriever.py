@@ -3,13 +3,194 @@ Hybrid Retriever: BM25 + Vector Search with Reciprocal Rank Fusion
 For Travel Business RAG System
 """
 import os
+import asyncio
+import re
+import hashlib
+import multiprocessing
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict, deque
 import numpy as np
 from typing import List, Dict, Any, Tuple, Optional
 from dataclasses import dataclass
-from rank_bm25 import BM25Okapi
-from openai import OpenAI
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from openai import AsyncOpenAI, OpenAI
 import tiktoken
 
+try:
+    # Optional SIMD distance kernels; the numpy matmul is used without it
+    import simsimd
+except ImportError:
+    simsimd = None
+
+try:
+    # Optional HNSW index for large corpora (VECTOR_BACKEND=faiss)
+    import faiss
+except ImportError:
+    faiss = None
+
+try:
+    # Optional JIT for the BM25 postings loop; numpy slicing is used without it
+    from numba import njit
+except ImportError:
+    njit = None
+
+# Embedding requests: texts per request, and requests in flight at once
+EMBEDDING_BATCH_SIZE = 128
+EMBEDDING_CONCURRENCY = 8
+
+QUERY_EMBEDDING_CACHE_SIZE = 1024
+
+# Nearest-neighbour search: "numpy" (exact, brute force) or "faiss" (HNSW, approximate)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "numpy")
+HNSW_M = 32
+HNSW_EF_SEARCH = 64
+
+# On-disk index cache: built indices keyed by corpus, plus per-chunk embeddings
+RETRIEVER_CACHE_DIR = os.getenv("RETRIEVER_CACHE_DIR", ".cache")
+
+# Chunk files in worker processes once the directory holds at least this much text;
+# below it, process start-up costs more than the tokenizing saved
+PARALLEL_CHUNKING_MIN_BYTES = 1_000_000
+
+# BM25 parameters (Lucene defaults)
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Hybrid results are reused for a recent query this similar (cosine) with the same numbers in it
+QUERY_RESULT_CACHE_SIZE = 256
+QUERY_SIMILARITY_THRESHOLD = 0.95
+_DIGITS_RE = re.compile(r"\d+")
+
+# BM25 tokens: maximal runs of alphanumeric characters ([^\W_] = \w without underscore)
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    """Scale each row to unit length (zero rows stay zero)"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.ascontiguousarray(matrix / np.where(norms == 0, 1, norms))
+
+
+def _bm25_scores_loop(term_ids, indptr, doc_ids, weights, num_docs):
+    """Sum the postings of the query terms (compiled with numba when available)"""
+    scores = np.zeros(num_docs, dtype=np.float32)
+    for term_id in term_ids:
+        for j in range(indptr[term_id], indptr[term_id + 1]):
+            scores[doc_ids[j]] += weights[j]
+    return scores
+
+
+def _bm25_scores_numpy(term_ids, indptr, doc_ids, weights, num_docs):
+    """Sum the postings of the query terms, one vectorized slice per term"""
+    scores = np.zeros(num_docs, dtype=np.float32)
+    for term_id in term_ids:
+        start, end = indptr[term_id], indptr[term_id + 1]
+        # A document appears at most once per term, so fancy-index += is safe
+        scores[doc_ids[start:end]] += weights[start:end]
+    return scores
+
+
+# nogil lets concurrent webhook threads score queries in parallel
+_bm25_scores = njit(cache=True, nogil=True)(_bm25_scores_loop) if njit is not None else _bm25_scores_numpy
+
+
+def _top_indices(scores: np.ndarray, top_k: int) -> np.ndarray:
+    """
+    Indices of the top_k scores, highest first: an O(N) argpartition, then
+    only the k selected scores are sorted.
+    """
+    k = min(top_k, scores.size)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+# ============================================
+# VECTOR BACKENDS
+# ============================================
+# Both hold unit-length float32 rows in document order, so a row index is a
+# position in HybridRetriever.documents and inner product is cosine similarity.
+
+class NumpyVectorBackend:
+    """Exact search: one matmul over every row, then an argpartition top-k"""
+
+    def __init__(self):
+        self._rows: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return 0 if self._rows is None else len(self._rows)
+
+    def reset(self):
+        self._rows = None
+
+    def add(self, unit_embeddings: np.ndarray):
+        """Append unit rows (memory-mapped arrays are kept as they are)"""
+        if self._rows is None or len(self._rows) == 0:
+            self._rows = unit_embeddings
+        else:
+            self._rows = np.vstack([self._rows, unit_embeddings])
+
+    def query(self, query_unit: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Row indices and cosine similarities of the k nearest rows, highest first"""
+        if self._rows is None or len(self._rows) == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)
+        if simsimd is not None:
+            distances = simsimd.cdist(self._rows, query_unit[np.newaxis, :], metric="cosine")
+            similarities = 1.0 - np.asarray(distances, dtype=np.float32)[:, 0]
+        else:
+            similarities = self._rows @ query_unit
+        top_indices = _top_indices(similarities, k)
+        return top_indices, similarities[top_indices]
+
+
+class FaissVectorBackend:
+    """Approximate search over a FAISS HNSW graph: O(log N) per query instead of O(N)"""
+
+    def __init__(self, m: int = HNSW_M, ef_search: int = HNSW_EF_SEARCH):
+        if faiss is None:
+            raise ImportError("VECTOR_BACKEND=faiss requires faiss-cpu (pip install faiss-cpu)")
+        self.m = m
+        self.ef_search = ef_search
+        self._index = None
+
+    def __len__(self) -> int:
+        return 0 if self._index is None else self._index.ntotal
+
+    def reset(self):
+        self._index = None
+
+    def add(self, unit_embeddings: np.ndarray):
+        """Insert unit rows into the graph; the dimension is fixed by the first batch"""
+        rows = np.ascontiguousarray(unit_embeddings, dtype=np.float32)
+        if len(rows) == 0:
+            return
+        if self._index is None:
+            self._index = faiss.IndexHNSWFlat(rows.shape[1], self.m, faiss.METRIC_INNER_PRODUCT)
+        self._index.add(rows)
+
+    def query(self, query_unit: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Row indices and cosine similarities of (approximately) the k nearest rows, highest first"""
+        k = min(k, len(self))
+        if k <= 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)
+        # The candidate list must be at least k long to return k results
+        self._index.hnsw.efSearch = max(self.ef_search, k)
+        scores, ids = self._index.search(np.ascontiguousarray(query_unit[np.newaxis, :], dtype=np.float32), k)
+        found = ids[0] >= 0  # -1 pads a short result
+        return ids[0][found].astype(np.intp), scores[0][found]
+
+
+def create_vector_backend(name: str = VECTOR_BACKEND):
+    """Vector backend by name: 'numpy' or 'faiss'"""
+    if name == "numpy":
+        return NumpyVectorBackend()
+    if name == "faiss":
+        return FaissVectorBackend()
+    raise ValueError(f"Unknown vector backend: {name!r} (expected 'numpy' or 'faiss')")
+
 
 @dataclass
 class Document:
@@ -34,128 +215,376 @@ class HybridRetriever:
     using Reciprocal Rank Fusion (RRF) for final ranking.
     """
 
-    def __init__(self, openai_api_key: str, embedding_model: str = "text-embedding-3-small"):
+    def __init__(
+        self,
+        openai_api_key: str,
+        embedding_model: str = "text-embedding-3-small",
+        similarity_threshold: float = QUERY_SIMILARITY_THRESHOLD,
+        embedding_cache_path: Optional[str] = None,
+        vector_backend=None
+    ):
         self.client = OpenAI(api_key=openai_api_key)
+        self._openai_api_key = openai_api_key  # for the per-call async client used during indexing
         self.embedding_model = embedding_model
         self.tokenizer = tiktoken.get_encoding("cl100k_base")
 
-        # Storage
-        self.documents: List[Document] = []
+        # Storage: document fields as parallel columns indexed by position;
+        # Document objects are only built for returned results
+        self._ids: List[str] = []
+        self._contents: List[str] = []
+        self._metadata: List[Dict[str, Any]] = []
+        self._sources: List[str] = []
         self.embeddings: np.ndarray = None
-        self.bm25: BM25Okapi = None
+        # Nearest-neighbour index over the row-normalized embeddings
+        self._vector_index = vector_backend if vector_backend is not None else create_vector_backend()
+        # BM25 postings in CSR layout: term id -> slice indptr[t]:indptr[t + 1] of
+        # doc ids and the precomputed BM25 weight of the term in each doc.
+        # Term ids come from _bm25_vocab, which grows as documents are added.
+        self._bm25_vocab: Dict[str, int] = {}
+        self._bm25_indptr: np.ndarray = np.zeros(1, dtype=np.int64)
+        self._bm25_doc_ids: np.ndarray = np.empty(0, dtype=np.int64)
+        self._bm25_weights: np.ndarray = np.empty(0, dtype=np.float32)
+
+        # BM25 tokenized corpus, as term-id arrays
+        self._tokenized_corpus: List[np.ndarray] = []
+
+        # Optional sqlite cache of document embeddings: sha256(model|text) -> float32 bytes
+        self._embedding_db: Optional[sqlite3.Connection] = None
+        self._embedding_db_lock = threading.Lock()
+        if embedding_cache_path:
+            self._embedding_db = sqlite3.connect(embedding_cache_path, check_same_thread=False)
+            self._embedding_db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)"
+            )
 
-        # BM25 tokenized corpus
-        self._tokenized_corpus: List[List[str]] = []
+        # sha256(model|query) -> query embedding, LRU-bounded
+        self._query_embedding_cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._query_embedding_lock = threading.Lock()
+        self._query_cache_hits = 0
+        self._query_cache_misses = 0
+
+        # Recent hybrid searches: (unit query embedding, search params, results).
+        # Paraphrased repeats reuse the results; the matrix is rebuilt lazily.
+        self.similarity_threshold = similarity_threshold
+        self._result_cache: deque = deque(maxlen=QUERY_RESULT_CACHE_SIZE)
+        self._result_cache_mat: Optional[np.ndarray] = None
+        self._result_cache_lock = threading.Lock()
+        self._result_cache_hits = 0
 
     def add_documents(self, documents: List[Document]):
-        """Add documents to the retriever"""
-        self.documents.extend(documents)
-        self._rebuild_indices()
+        """Add documents to the retriever (only the new documents are tokenized and embedded)"""
+        if not documents:
+            return
+        self._append_documents(documents)
+        self._index_documents([doc.content for doc in documents])
+        self._clear_result_cache()
 
     def add_document(self, doc: Document):
         """Add a single document"""
-        self.documents.append(doc)
-        self._rebuild_indices()
+        self.add_documents([doc])
+
+    def _append_documents(self, documents: List[Document]):
+        """Append document fields to the storage columns"""
+        for doc in documents:
+            self._ids.append(doc.id)
+            self._contents.append(doc.content)
+            self._metadata.append(doc.metadata)
+            self._sources.append(doc.source)
+
+    def document(self, idx: int) -> Document:
+        """Document at position idx"""
+        return Document(
+            id=self._ids[idx],
+            content=self._contents[idx],
+            metadata=self._metadata[idx],
+            source=self._sources[idx]
+        )
+
+    @property
+    def documents(self) -> List[Document]:
+        """All documents, in index order (built on each access)"""
+        return [self.document(idx) for idx in range(len(self._contents))]
+
+    def _index_documents(self, new_contents: List[str]):
+        """Extend the BM25 and vector indices with newly added document texts"""
+        self._tokenized_corpus.extend(self._term_ids(content) for content in new_contents)
+        # Document lengths (and so every weight) change with the corpus; rebuild from the kept tokens
+        self._build_bm25_index()
+
+        new_embeddings = self._embed_documents(new_contents)
+        if self.embeddings is None or len(self.embeddings) == 0:
+            self.embeddings = new_embeddings
+        else:
+            self.embeddings = np.vstack([self.embeddings, new_embeddings])
+        self._vector_index.add(_unit_rows(new_embeddings))
 
     def _rebuild_indices(self):
-        """Rebuild both BM25 and vector indices"""
-        if not self.documents:
+        """Rebuild both BM25 and vector indices from scratch"""
+        if not self._contents:
             return
 
         # Build BM25 index
+        self._bm25_vocab = {}
         self._tokenized_corpus = [
-            self._tokenize(doc.content) for doc in self.documents
+            self._term_ids(content) for content in self._contents
         ]
-        self.bm25 = BM25Okapi(self._tokenized_corpus)
+        self._build_bm25_index()
 
         # Build vector index
-        texts = [doc.content for doc in self.documents]
-        self.embeddings = self._get_embeddings_batch(texts)
+        self.embeddings = self._embed_documents(self._contents)
+        self._vector_index.reset()
+        self._vector_index.add(_unit_rows(self.embeddings))
+        self._clear_result_cache()
+
+    def save_index(self, path_prefix: str):
+        """Write documents, BM25 tokens (<prefix>.pkl) and embeddings (<prefix>.npy)"""
+        with open(f"{path_prefix}.pkl.tmp", "wb") as f:
+            pickle.dump(
+                {
+                    "ids": self._ids,
+                    "contents": self._contents,
+                    "metadata": self._metadata,
+                    "sources": self._sources,
+                    "vocab": self._bm25_vocab,
+                    "tokenized_corpus": self._tokenized_corpus,
+                    "unit_rows": True
+                },
+                f, protocol=pickle.HIGHEST_PROTOCOL
+            )
+        with open(f"{path_prefix}.npy.tmp", "wb") as f:
+            # Stored already normalized so load_index can hand the memory map straight to the vector index
+            np.save(f, _unit_rows(np.asarray(self.embeddings, dtype=np.float32)))
+        # Rename into place so a crash never leaves a half-written cache behind
+        os.replace(f"{path_prefix}.npy.tmp", f"{path_prefix}.npy")
+        os.replace(f"{path_prefix}.pkl.tmp", f"{path_prefix}.pkl")
+
+    def load_index(self, path_prefix: str) -> bool:
+        """Load an index written by save_index; embeddings are memory-mapped. Returns False if unavailable."""
+        if not (os.path.exists(f"{path_prefix}.pkl") and os.path.exists(f"{path_prefix}.npy")):
+            return False
+        try:
+            with open(f"{path_prefix}.pkl", "rb") as f:
+                data = pickle.load(f)
+            embeddings = np.load(f"{path_prefix}.npy", mmap_mode="r")
+        except Exception as e:
+            print(f"  Ignoring unreadable index cache {path_prefix}: {e}")
+            return False
+        if "contents" not in data:
+            return False  # written before column storage; rebuild
+
+        self._ids = data["ids"]
+        self._contents = data["contents"]
+        self._metadata = data["metadata"]
+        self._sources = data["sources"]
+        self._bm25_vocab = data["vocab"]
+        self._tokenized_corpus = data["tokenized_corpus"]
+        self._build_bm25_index()
+        if not data.get("unit_rows"):
+            embeddings = _unit_rows(embeddings)  # older cache with raw rows; normalized in memory
+        self.embeddings = embeddings
+        self._vector_index.reset()
+        self._vector_index.add(embeddings)
+        self._clear_result_cache()
+        return True
+
+    def _embed_documents(self, texts: List[str]) -> np.ndarray:
+        """Embed document texts, reusing vectors from the sqlite cache when configured"""
+        if self._embedding_db is None or not texts:
+            return self._get_embeddings_batch(texts)
+
+        keys = [hashlib.sha256(f"{self.embedding_model}|{text}".encode()).digest() for text in texts]
+        cached: Dict[bytes, np.ndarray] = {}
+        with self._embedding_db_lock:
+            # Stay under sqlite's bound-parameter limit
+            for i in range(0, len(keys), 500):
+                batch = keys[i:i + 500]
+                rows = self._embedding_db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                    batch
+                )
+                cached.update((key, np.frombuffer(vector, dtype=np.float32)) for key, vector in rows)
+
+        missing = [i for i, key in enumerate(keys) if key not in cached]
+        if missing:
+            new_embeddings = self._get_embeddings_batch([texts[i] for i in missing])
+            with self._embedding_db_lock, self._embedding_db:
+                self._embedding_db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(keys[i], embedding.tobytes()) for i, embedding in zip(missing, new_embeddings)]
+                )
+            cached.update((keys[i], embedding) for i, embedding in zip(missing, new_embeddings))
+
+        return np.array([cached[key] for key in keys], dtype=np.float32)
+
+    def _build_bm25_index(self):
+        """
+        Precompute BM25 scores per (token, document) at index time, so a query
+        only adds up the postings of its tokens.
+        score(t, D) = IDF(t) * tf / (tf + k1 * (1 - b + b * |D| / avgdl))
+        with the Lucene IDF(t) = ln(1 + (N - df + 0.5) / (df + 0.5)).
+        """
+        num_docs = len(self._tokenized_corpus)
+        num_terms = len(self._bm25_vocab)
+        doc_len = np.fromiter((len(ids) for ids in self._tokenized_corpus), dtype=np.int64, count=num_docs)
+        avgdl = float(doc_len.mean()) if num_docs else 0.0
+        length_norm = (BM25_K1 * (1 - BM25_B + BM25_B * doc_len / (avgdl or 1.0))).astype(np.float32)
+
+        # Count (term, doc) pairs in one pass: np.unique sorts by term, then doc,
+        # which is exactly the CSR postings order
+        all_terms = np.concatenate(self._tokenized_corpus) if num_docs else np.empty(0, dtype=np.int32)
+        doc_of_token = np.repeat(np.arange(num_docs, dtype=np.int64), doc_len)
+        pairs, tf = np.unique(all_terms.astype(np.int64) * num_docs + doc_of_token, return_counts=True)
+        term_of_pair = pairs // max(num_docs, 1)
+
+        df = np.bincount(term_of_pair, minlength=num_terms)
+        self._bm25_indptr = np.concatenate(([0], np.cumsum(df))).astype(np.int64)
+        self._bm25_doc_ids = (pairs - term_of_pair * num_docs).astype(np.int64)
+        tf = tf.astype(np.float32)
+        idf = np.log1p((num_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+        self._bm25_weights = (idf[term_of_pair] * tf / (tf + length_norm[self._bm25_doc_ids])).astype(np.float32)
+
+    def _clear_result_cache(self):
+        """Drop cached hybrid results (they no longer reflect the indexed documents)"""
+        with self._result_cache_lock:
+            self._result_cache.clear()
+            self._result_cache_mat = None
+
+    def _lookup_results(self, unit_embedding: np.ndarray, params: tuple) -> Optional[List[SearchResult]]:
+        """Return cached results of a similar earlier query with the same params, if any"""
+        with self._result_cache_lock:
+            if not self._result_cache:
+                return None
+            if self._result_cache_mat is None:
+                self._result_cache_mat = np.vstack([entry[0] for entry in self._result_cache])
+            similarities = self._result_cache_mat @ unit_embedding
+            matching = np.fromiter((entry[1] == params for entry in self._result_cache), dtype=bool)
+            similarities[~matching] = -1.0
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.similarity_threshold:
+                return None
+            self._result_cache_hits += 1
+            return self._result_cache[best][2]
+
+    def _store_results(self, unit_embedding: np.ndarray, params: tuple, results: List[SearchResult]):
+        with self._result_cache_lock:
+            self._result_cache.append((unit_embedding, params, results))
+            self._result_cache_mat = None
 
     def _tokenize(self, text: str) -> List[str]:
-        """Tokenize text for BM25"""
-        text = text.lower()
-        tokens = []
-        current_token = ""
-        for char in text:
-            if char.isalnum():
-                current_token += char
-            else:
-                if current_token:
-                    tokens.append(current_token)
-                    current_token = ""
-        if current_token:
-            tokens.append(current_token)
-        return tokens
+        """Tokenize text for BM25 (runs of letters/digits, lowercased)"""
+        return _TOKEN_RE.findall(text.lower())
+
+    def _term_ids(self, text: str) -> np.ndarray:
+        """Tokenize text for BM25 and map tokens to term ids, adding new terms to the vocabulary"""
+        vocab = self._bm25_vocab
+        return np.fromiter(
+            (vocab.setdefault(token, len(vocab)) for token in self._tokenize(text)),
+            dtype=np.int32
+        )
 
     def _get_embeddings_batch(self, texts: List[str]) -> np.ndarray:
-        """Get embeddings for multiple texts"""
+        """Get embeddings for multiple texts (sub-batches are requested concurrently)"""
         if not texts:
             return np.array([])
 
-        # Batch API call
-        response = self.client.embeddings.create(
-            model=self.embedding_model,
-            input=texts
-        )
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._aget_embeddings_batch(texts))
+
+        # Called from inside an event loop: run the requests on a helper thread's loop
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(asyncio.run, self._aget_embeddings_batch(texts)).result()
+
+    async def _aget_embeddings_batch(self, texts: List[str]) -> np.ndarray:
+        """Embed texts in EMBEDDING_BATCH_SIZE chunks, at most EMBEDDING_CONCURRENCY requests at a time"""
+        semaphore = asyncio.Semaphore(EMBEDDING_CONCURRENCY)
+
+        # A fresh client per call: its connection pool belongs to this event loop
+        async with AsyncOpenAI(api_key=self._openai_api_key) as aclient:
+
+            async def embed_chunk(chunk: List[str]) -> List[List[float]]:
+                async with semaphore:
+                    response = await aclient.embeddings.create(
+                        model=self.embedding_model,
+                        input=chunk
+                    )
+                return [item.embedding for item in response.data]
+
+            # gather keeps the input order, so rows line up with texts
+            chunks = await asyncio.gather(*(
+                embed_chunk(texts[i:i + EMBEDDING_BATCH_SIZE])
+                for i in range(0, len(texts), EMBEDDING_BATCH_SIZE)
+            ))
 
-        embeddings = [item.embedding for item in response.data]
-        return np.array(embeddings)
+        # float32 halves memory traffic in the similarity matmul versus numpy's float64 default
+        return np.array([embedding for chunk in chunks for embedding in chunk], dtype=np.float32)
 
     def _get_embedding(self, text: str) -> np.ndarray:
-        """Get embedding for single text"""
+        """Get embedding for single text (repeated queries are served from an LRU cache)"""
+        key = hashlib.sha256(f"{self.embedding_model}|{text}".encode()).digest()
+        with self._query_embedding_lock:
+            embedding = self._query_embedding_cache.get(key)
+            if embedding is not None:
+                self._query_embedding_cache.move_to_end(key)
+                self._query_cache_hits += 1
+                return embedding
+            self._query_cache_misses += 1
+
         response = self.client.embeddings.create(
             model=self.embedding_model,
             input=[text]
         )
-        return np.array(response.data[0].embedding)
+        embedding = np.array(response.data[0].embedding, dtype=np.float32)
+        embedding.flags.writeable = False  # shared between callers via the cache
+
+        with self._query_embedding_lock:
+            self._query_embedding_cache[key] = embedding
+            if len(self._query_embedding_cache) > QUERY_EMBEDDING_CACHE_SIZE:
+                self._query_embedding_cache.popitem(last=False)
+        return embedding
+
+    def _get_unit_embedding(self, text: str) -> np.ndarray:
+        """Query embedding scaled to unit length"""
+        embedding = self._get_embedding(text)
+        return embedding / np.sqrt(np.vdot(embedding, embedding))
+
+    def _bm25_top(self, query: str, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices and scores of the best BM25 matches (positive scores only), highest first"""
+        if not self._bm25_vocab:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)
+
+        vocab = self._bm25_vocab
+        term_ids = np.fromiter(
+            (vocab[token] for token in self._tokenize(query) if token in vocab),
+            dtype=np.int64
+        )
+        scores = _bm25_scores(term_ids, self._bm25_indptr, self._bm25_doc_ids, self._bm25_weights, len(self._contents))
 
-    def search_bm25(self, query: str, top_k: int = 10) -> List[SearchResult]:
-        """Lexical search using BM25"""
-        if not self.bm25:
-            return []
+        top_indices = _top_indices(scores, top_k)
+        top_indices = top_indices[scores[top_indices] > 0]
+        return top_indices, scores[top_indices]
 
-        tokenized_query = self._tokenize(query)
-        scores = self.bm25.get_scores(tokenized_query)
+    def _vector_top(self, query: str, top_k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Indices and cosine similarities of the nearest documents, highest first"""
+        if self.embeddings is None or len(self.embeddings) == 0:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)
 
-        # Get top-k indices
-        top_indices = np.argsort(scores)[::-1][:top_k]
+        return self._vector_index.query(self._get_unit_embedding(query), top_k)
 
-        results = []
-        for idx in top_indices:
-            if scores[idx] > 0:
-                results.append(SearchResult(
-                    document=self.documents[idx],
-                    score=float(scores[idx]),
-                    source='bm25'
-                ))
+    def _to_results(self, indices: np.ndarray, scores: np.ndarray, source: str) -> List[SearchResult]:
+        return [
+            SearchResult(document=self.document(idx), score=float(score), source=source)
+            for idx, score in zip(indices, scores)
+        ]
 
-        return results
+    def search_bm25(self, query: str, top_k: int = 10) -> List[SearchResult]:
+        """Lexical search using BM25"""
+        return self._to_results(*self._bm25_top(query, top_k), 'bm25')
 
     def search_vector(self, query: str, top_k: int = 10) -> List[SearchResult]:
         """Semantic search using vector similarity"""
-        if self.embeddings is None or len(self.embeddings) == 0:
-            return []
-
-        query_embedding = self._get_embedding(query)
-
-        # Cosine similarity
-        similarities = np.dot(self.embeddings, query_embedding) / (
-            np.linalg.norm(self.embeddings, axis=1) * np.linalg.norm(query_embedding)
-        )
-
-        # Get top-k indices
-        top_indices = np.argsort(similarities)[::-1][:top_k]
-
-        results = []
-        for idx in top_indices:
-            results.append(SearchResult(
-                document=self.documents[idx],
-                score=float(similarities[idx]),
-                source='vector'
-            ))
-
-        return results
+        return self._to_results(*self._vector_top(query, top_k), 'vector')
 
     def search_hybrid(
         self,
@@ -167,106 +596,95 @@ class HybridRetriever:
     ) -> List[SearchResult]:
         """
         Hybrid search combining BM25 and Vector results.
+        Results of a recent near-identical query are reused.
         """
-        # Get results from both methods
-        bm25_results = self.search_bm25(query, top_k * 2)
-        vector_results = self.search_vector(query, top_k * 2)
-
+        unit_embedding = None
+        if self.embeddings is not None and len(self.embeddings) > 0:
+            unit_embedding = self._get_unit_embedding(query)
+            params = (top_k, use_rrf, bm25_weight, vector_weight, tuple(_DIGITS_RE.findall(query)))
+            cached = self._lookup_results(unit_embedding, params)
+            if cached is not None:
+                return list(cached)
+
+        # Fusion works on document positions; only the final top_k become Documents
+        bm25_indices, bm25_scores = self._bm25_top(query, top_k * 2)
+        vector_indices, vector_scores = self._vector_top(query, top_k * 2)
         if use_rrf:
-            return self._reciprocal_rank_fusion(bm25_results, vector_results, top_k)
+            results = self._reciprocal_rank_fusion(bm25_indices, vector_indices, top_k)
         else:
-            return self._weighted_fusion(
-                bm25_results, vector_results,
+            results = self._weighted_fusion(
+                bm25_indices, bm25_scores, vector_indices, vector_scores,
                 bm25_weight, vector_weight, top_k
             )
 
+        if unit_embedding is not None:
+            self._store_results(unit_embedding, params, results)
+        return results
+
     def _reciprocal_rank_fusion(
         self,
-        bm25_results: List[SearchResult],
-        vector_results: List[SearchResult],
+        bm25_indices: np.ndarray,
+        vector_indices: np.ndarray,
         top_k: int,
         k: int = 60
     ) -> List[SearchResult]:
         """
         Combine results using Reciprocal Rank Fusion.
         RRF score = sum(1 / (k + rank)) for each ranking list
+        Rankings are document positions; scores accumulate in one array.
         """
-        doc_scores: Dict[str, float] = {}
-        doc_map: Dict[str, Document] = {}
-
-        # Score from BM25 ranking
-        for rank, result in enumerate(bm25_results, 1):
-            doc_id = result.document.id
-            rrf_score = 1.0 / (k + rank)
-            doc_scores[doc_id] = doc_scores.get(doc_id, 0) + rrf_score
-            doc_map[doc_id] = result.document
-
-        # Score from Vector ranking
-        for rank, result in enumerate(vector_results, 1):
-            doc_id = result.document.id
-            rrf_score = 1.0 / (k + rank)
-            doc_scores[doc_id] = doc_scores.get(doc_id, 0) + rrf_score
-            doc_map[doc_id] = result.document
-
-        # Sort by RRF score
-        sorted_docs = sorted(doc_scores.items(), key=lambda x: x[1], reverse=True)
-
-        results = []
-        for doc_id, score in sorted_docs[:top_k]:
-            results.append(SearchResult(
-                document=doc_map[doc_id],
-                score=score,
-                source='hybrid'
-            ))
+        scores = np.zeros(len(self._contents))
+        scores[bm25_indices] += 1.0 / (k + np.arange(1, len(bm25_indices) + 1))
+        scores[vector_indices] += 1.0 / (k + np.arange(1, len(vector_indices) + 1))
 
-        return results
+        # Candidates in first-seen order (BM25 first) so ties keep that order
+        ranked = np.concatenate([bm25_indices, vector_indices])
+        _, first_seen = np.unique(ranked, return_index=True)
+        candidates = ranked[np.sort(first_seen)]
+        top = candidates[np.argsort(-scores[candidates], kind="stable")[:top_k]]
+
+        return self._to_results(top, scores[top], 'hybrid')
 
     def _weighted_fusion(
         self,
-        bm25_results: List[SearchResult],
-        vector_results: List[SearchResult],
+        bm25_indices: np.ndarray,
+        bm25_scores: np.ndarray,
+        vector_indices: np.ndarray,
+        vector_scores: np.ndarray,
         bm25_weight: float,
         vector_weight: float,
         top_k: int
     ) -> List[SearchResult]:
         """Combine results using weighted score fusion"""
-        doc_scores: Dict[str, float] = {}
-        doc_map: Dict[str, Document] = {}
+        scores = np.zeros(len(self._contents))
 
         # Normalize BM25 scores
-        if bm25_results:
-            max_bm25 = max(r.score for r in bm25_results)
-            for result in bm25_results:
-                doc_id = result.document.id
-                normalized_score = result.score / max_bm25 if max_bm25 > 0 else 0
-                doc_scores[doc_id] = doc_scores.get(doc_id, 0) + bm25_weight * normalized_score
-                doc_map[doc_id] = result.document
+        if len(bm25_scores) > 0:
+            max_bm25 = bm25_scores.max()
+            if max_bm25 > 0:
+                scores[bm25_indices] += bm25_weight * (bm25_scores / max_bm25)
 
         # Vector scores are already normalized
-        for result in vector_results:
-            doc_id = result.document.id
-            doc_scores[doc_id] = doc_scores.get(doc_id, 0) + vector_weight * result.score
-            doc_map[doc_id] = result.document
-
-        # Sort by combined score
-        sorted_docs = sorted(doc_scores.items(), key=lambda x: x[1], reverse=True)
-
-        results = []
-        for doc_id, score in sorted_docs[:top_k]:
-            results.append(SearchResult(
-                document=doc_map[doc_id],
-                score=score,
-                source='hybrid'
-            ))
+        scores[vector_indices] += vector_weight * vector_scores
 
-        return results
+        # Candidates in first-seen order (BM25 first) so ties keep that order
+        ranked = np.concatenate([bm25_indices, vector_indices])
+        _, first_seen = np.unique(ranked, return_index=True)
+        candidates = ranked[np.sort(first_seen)]
+        top = candidates[np.argsort(-scores[candidates], kind="stable")[:top_k]]
+
+        return self._to_results(top, scores[top], 'hybrid')
 
     def stats(self) -> Dict[str, Any]:
         """Get retriever statistics"""
         return {
-            "num_documents": len(self.documents),
+            "num_documents": len(self._contents),
             "embedding_dim": self.embeddings.shape[1] if self.embeddings is not None and len(self.embeddings) > 0 else 0,
-            "bm25_initialized": self.bm25 is not None
+            "bm25_initialized": bool(self._bm25_vocab),
+            "vector_backend": type(self._vector_index).__name__,
+            "query_cache_hits": self._query_cache_hits,
+            "query_cache_misses": self._query_cache_misses,
+            "result_cache_hits": self._result_cache_hits
         }
 
 
@@ -293,14 +711,17 @@ class DocumentChunker:
                 source=metadata.get("source", "unknown")
             )]
 
+        # Decode once and slice by token character offsets instead of decoding every chunk
+        decoded, offsets = self.tokenizer.decode_with_offsets(tokens)
+        offsets.append(len(decoded))
+
         chunks = []
         start = 0
         chunk_idx = 0
 
         while start < len(tokens):
             end = start + self.chunk_size
-            chunk_tokens = tokens[start:end]
-            chunk_text = self.tokenizer.decode(chunk_tokens)
+            chunk_text = decoded[offsets[start]:offsets[min(end, len(tokens))]]
 
             chunks.append(Document(
                 id=f"{doc_id}_{chunk_idx}",
@@ -384,33 +805,83 @@ class DocumentChunker:
         return sections
 
 
+def _chunk_one_file(file_path: str, chunk_size: int, chunk_overlap: int) -> List[Document]:
+    """Chunk a single file (module-level so worker processes can run it)"""
+    return DocumentChunker(chunk_size, chunk_overlap).chunk_text_file(file_path)
+
+
+def _corpus_hash(paths: List[str], *params: Any) -> str:
+    """Fingerprint of the input files (name, size, mtime) and the indexing parameters"""
+    digest = hashlib.sha256(repr(params).encode())
+    for path in sorted(paths):
+        stat = os.stat(path)
+        digest.update(f"{os.path.basename(path)}|{stat.st_size}|{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()[:16]
+
+
 def create_retriever_from_directory(
     directory: str,
     openai_api_key: str,
     chunk_size: int = 500,
-    chunk_overlap: int = 100
+    chunk_overlap: int = 100,
+    cache_dir: Optional[str] = RETRIEVER_CACHE_DIR,
+    vector_backend: str = VECTOR_BACKEND
 ) -> HybridRetriever:
     """
     Create a retriever from a directory of text files.
+    With cache_dir set, the built index is reused while the files are
+    unchanged, and chunk embeddings are cached so edits only re-embed
+    the chunks that changed.
     """
-    retriever = HybridRetriever(openai_api_key)
-    chunker = DocumentChunker(chunk_size, chunk_overlap)
+    filenames = [f for f in os.listdir(directory) if f.endswith('.txt')]
+    paths = [os.path.join(directory, f) for f in filenames]
+
+    index_prefix = None
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        retriever = HybridRetriever(
+            openai_api_key,
+            embedding_cache_path=os.path.join(cache_dir, "embeddings.sqlite3"),
+            vector_backend=create_vector_backend(vector_backend)
+        )
+        corpus_hash = _corpus_hash(paths, chunk_size, chunk_overlap, retriever.embedding_model)
+        index_prefix = os.path.join(cache_dir, f"retriever-{corpus_hash}")
+        if retriever.load_index(index_prefix):
+            print(f"Retriever loaded from cache: {retriever.stats()}")
+            return retriever
+    else:
+        retriever = HybridRetriever(openai_api_key, vector_backend=create_vector_backend(vector_backend))
+
+    # tiktoken encoding is CPU-bound: spread large directories across processes.
+    # Spawned, not forked: this runs on a worker thread while other threads may
+    # hold locks (logging, httpx) that a forked child would inherit locked.
+    if len(paths) > 1 and sum(os.path.getsize(p) for p in paths) >= PARALLEL_CHUNKING_MIN_BYTES:
+        with ProcessPoolExecutor(
+            max_workers=min(len(paths), os.cpu_count() or 1),
+            mp_context=multiprocessing.get_context("spawn")
+        ) as executor:
+            futures = [executor.submit(_chunk_one_file, p, chunk_size, chunk_overlap) for p in paths]
+    else:
+        futures = None
 
     all_documents = []
 
-    for filename in os.listdir(directory):
-        if filename.endswith('.txt'):
-            file_path = os.path.join(directory, filename)
-            try:
-                chunks = chunker.chunk_text_file(file_path)
-                all_documents.extend(chunks)
-                print(f"  Chunked: {filename} -> {len(chunks)} chunks")
-            except Exception as e:
-                print(f"  Error chunking {filename}: {e}")
+    for i, (filename, file_path) in enumerate(zip(filenames, paths)):
+        try:
+            if futures is not None:
+                chunks = futures[i].result()
+            else:
+                chunks = _chunk_one_file(file_path, chunk_size, chunk_overlap)
+            all_documents.extend(chunks)
+            print(f"  Chunked: {filename} -> {len(chunks)} chunks")
+        except Exception as e:
+            print(f"  Error chunking {filename}: {e}")
 
     if all_documents:
         print(f"\nBuilding indices for {len(all_documents)} documents...")
         retriever.add_documents(all_documents)
+        if index_prefix:
+            retriever.save_index(index_prefix)
         print(f"Retriever ready: {retriever.stats()}")
 
     return retriever
@@ -3,9 +3,138 @@ Brave Search API Tool for Travel RAG Bot
 Provides real-time web search capabilities similar to Perplexity AI
 """
 import os
+import json
+import time
+import sqlite3
+import asyncio
+import logging
+import threading
 import httpx
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+import orjson
+from collections import OrderedDict
+from urllib.parse import quote_plus
+from typing import List, Dict, Any, Optional, Tuple
+from dataclasses import dataclass, asdict
+
+logger = logging.getLogger("travel_bot.brave")
+
+# Shared pooled client: keep-alive connections (and HTTP/2) are reused across
+# searches instead of paying a TLS handshake per call
+_http_client: Optional[httpx.Client] = None
+
+
+def _get_http_client() -> httpx.Client:
+    """Get or create the shared Brave API client"""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.Client(
+            http2=True,
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5)
+        )
+    return _http_client
+
+
+# =============================================================================
+# RESULT CACHE
+# Identical searches within SEARCH_CACHE_TTL are answered locally: an
+# in-memory LRU in front of a sqlite file, so the cache survives restarts.
+# Set BRAVE_CACHE_PATH to "" to keep it in memory only.
+# =============================================================================
+SEARCH_CACHE_TTL = 3600  # seconds
+SEARCH_CACHE_SIZE = 512
+BRAVE_CACHE_PATH = os.getenv("BRAVE_CACHE_PATH", os.path.join(".cache", "brave_search.sqlite3"))
+
+_search_cache: "OrderedDict[Tuple[str, int, str], Tuple[float, List[SearchResult]]]" = OrderedDict()
+_search_cache_lock = threading.Lock()
+_cache_db: Optional[sqlite3.Connection] = None
+_cache_db_lock = threading.Lock()  # sqlite I/O stays off _search_cache_lock
+
+
+def _get_cache_db() -> Optional[sqlite3.Connection]:
+    """Open the sqlite cache on first use (None when disabled or unavailable); call under _cache_db_lock"""
+    global _cache_db
+    if _cache_db is None and BRAVE_CACHE_PATH:
+        try:
+            os.makedirs(os.path.dirname(BRAVE_CACHE_PATH) or ".", exist_ok=True)
+            _cache_db = sqlite3.connect(BRAVE_CACHE_PATH, check_same_thread=False)
+            _cache_db.execute(
+                "CREATE TABLE IF NOT EXISTS searches (key TEXT PRIMARY KEY, expires REAL NOT NULL, results TEXT NOT NULL)"
+            )
+        except sqlite3.Error as e:
+            logger.warning("Brave disk cache disabled: %s", e)
+            return None
+    return _cache_db
+
+
+def _cache_key(query: str, count: int, freshness: Optional[str]) -> Tuple[str, int, str]:
+    return (query.strip().lower(), count, freshness or "")
+
+
+def _disk_get(key: Tuple[str, int, str]) -> Optional[Tuple[float, List["SearchResult"]]]:
+    with _cache_db_lock:
+        db = _get_cache_db()
+        if db is None:
+            return None
+        try:
+            row = db.execute(
+                "SELECT expires, results FROM searches WHERE key = ?", (json.dumps(key),)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Brave disk cache read failed: %s", e)
+            return None
+    if row is None or row[0] <= time.time():
+        return None
+    try:
+        return row[0], [SearchResult(**item) for item in json.loads(row[1])]
+    except (ValueError, TypeError) as e:
+        logger.warning("Brave disk cache entry unreadable: %s", e)
+        return None
+
+
+def _disk_put(key: Tuple[str, int, str], expires: float, results: List["SearchResult"]):
+    with _cache_db_lock:
+        db = _get_cache_db()
+        if db is None:
+            return
+        try:
+            with db:
+                db.execute(
+                    "INSERT OR REPLACE INTO searches (key, expires, results) VALUES (?, ?, ?)",
+                    (json.dumps(key), expires, json.dumps([asdict(r) for r in results]))
+                )
+        except sqlite3.Error as e:
+            logger.warning("Brave disk cache write failed: %s", e)
+
+
+def _cache_get(key: Tuple[str, int, str]) -> Optional[List["SearchResult"]]:
+    now = time.time()
+    with _search_cache_lock:
+        entry = _search_cache.get(key)
+        if entry is not None:
+            if entry[0] > now:
+                _search_cache.move_to_end(key)
+                return entry[1]
+            del _search_cache[key]
+
+    stored = _disk_get(key)
+    if stored is None:
+        return None
+    with _search_cache_lock:
+        _search_cache[key] = stored
+        if len(_search_cache) > SEARCH_CACHE_SIZE:
+            _search_cache.popitem(last=False)
+    return stored[1]
+
+
+def _cache_put(key: Tuple[str, int, str], results: List["SearchResult"]):
+    expires = time.time() + SEARCH_CACHE_TTL
+    with _search_cache_lock:
+        _search_cache[key] = (expires, results)
+        _search_cache.move_to_end(key)
+        if len(_search_cache) > SEARCH_CACHE_SIZE:
+            _search_cache.popitem(last=False)
+    _disk_put(key, expires, results)
 
 
 @dataclass
@@ -43,58 +172,107 @@ class BraveSearchTool:
         if not self.api_key:
             return self._fallback_response(query)
 
+        key = _cache_key(query, count, freshness)
+        cached = _cache_get(key)
+        if cached is not None:
+            return list(cached)
+
         try:
-            headers = {
-                "Accept": "application/json",
-                "Accept-Encoding": "gzip",
-                "X-Subscription-Token": self.api_key
-            }
-
-            params = {
-                "q": query,
-                "count": min(count, 20),
-                "text_decorations": False,
-                "search_lang": "en",
-                "country": "in",  # India for travel-relevant results
-            }
-
-            if freshness:
-                params["freshness"] = freshness
-
-            with httpx.Client(timeout=10.0) as client:
-                response = client.get(
-                    self.base_url,
-                    headers=headers,
-                    params=params
-                )
-                response.raise_for_status()
-                data = response.json()
+            response = _get_http_client().get(
+                self.base_url,
+                headers=self._headers(),
+                params=self._params(query, count, freshness)
+            )
+            response.raise_for_status()
+            results = self._parse_results(orjson.loads(response.content), count)
+            _cache_put(key, results)
+            return results
 
-            results = []
-            web_results = data.get("web", {}).get("results", [])
+        except httpx.HTTPStatusError as e:
+            logger.warning("Brave Search API error: HTTP %d: %s", e.response.status_code, e)
+            return self._fallback_response(query)
+        except Exception as e:
+            logger.warning("Brave Search error: %s", e)
+            return self._fallback_response(query)
+
+    async def asearch(
+        self,
+        query: str,
+        count: int = 5,
+        freshness: Optional[str] = None,
+        client: Optional[httpx.AsyncClient] = None
+    ) -> List[SearchResult]:
+        """Async version of search(); pass an AsyncClient to share its connections across calls"""
+        if not self.api_key:
+            return self._fallback_response(query)
 
-            for item in web_results[:count]:
-                results.append(SearchResult(
-                    title=item.get("title", ""),
-                    url=item.get("url", ""),
-                    description=item.get("description", ""),
-                    age=item.get("age", None)
-                ))
+        key = _cache_key(query, count, freshness)
+        # The cache may hit sqlite; keep that off the event loop
+        cached = await asyncio.to_thread(_cache_get, key)
+        if cached is not None:
+            return list(cached)
 
+        own_client = httpx.AsyncClient(http2=True, timeout=10.0) if client is None else None
+        try:
+            response = await (client or own_client).get(
+                self.base_url,
+                headers=self._headers(),
+                params=self._params(query, count, freshness)
+            )
+            response.raise_for_status()
+            results = self._parse_results(orjson.loads(response.content), count)
+            await asyncio.to_thread(_cache_put, key, results)
             return results
 
         except httpx.HTTPStatusError as e:
-            print(f"[Brave Search API Error] HTTP {e.response.status_code}: {e}")
+            logger.warning("Brave Search API error: HTTP %d: %s", e.response.status_code, e)
             return self._fallback_response(query)
         except Exception as e:
-            print(f"[Brave Search Error] {e}")
+            logger.warning("Brave Search error: %s", e)
             return self._fallback_response(query)
+        finally:
+            if own_client is not None:
+                await own_client.aclose()
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Accept": "application/json",
+            "Accept-Encoding": "gzip",
+            "X-Subscription-Token": self.api_key
+        }
+
+    def _params(self, query: str, count: int, freshness: Optional[str]) -> Dict[str, Any]:
+        params = {
+            "q": query,
+            "count": min(count, 20),
+            "text_decorations": False,
+            "search_lang": "en",
+            "country": "in",  # India for travel-relevant results
+        }
+
+        if freshness:
+            params["freshness"] = freshness
+        return params
+
+    def _parse_results(self, data: Dict[str, Any], count: int) -> List[SearchResult]:
+        results = []
+        web_results = data.get("web", {}).get("results", [])
+
+        for item in web_results[:count]:
+            results.append(SearchResult(
+                title=item.get("title", ""),
+                url=item.get("url", ""),
+                description=item.get("description", ""),
+                age=item.get("age", None)
+            ))
+
+        return results
 
     def _fallback_response(self, query: str) -> List[SearchResult]:
         """Fallback when API is not available"""
         return [SearchResult(
             title=f"Search results for: {query}",
-            url=f"https://search.brave.com/search?q={query.replace(' ', '+')}",
+            url=f"https://search.brave.com/search?q={quote_plus(query)}",
             description=f"BRAVE_API_KEY not configured. Click to search manually for '{query}'",
             age=None
         )]
@@ -111,6 +289,31 @@ class BraveSearchTool:
         Returns:
             List of SearchResult objects
         """
+        return self.search(self._travel_query(destination, info_type), count=5)
+
+    async def asearch_travel_info(
+        self,
+        destination: str,
+        info_types: List[str]
+    ) -> Dict[str, List[SearchResult]]:
+        """
+        Run search_travel_info for several info types concurrently.
+
+        Returns:
+            Dict of info_type -> list of SearchResult objects
+        """
+        async with httpx.AsyncClient(
+            http2=True,
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=10, max_keepalive_connections=5)
+        ) as client:
+            results = await asyncio.gather(*(
+                self.asearch(self._travel_query(destination, info_type), count=5, client=client)
+                for info_type in info_types
+            ))
+        return dict(zip(info_types, results))
+
+    def _travel_query(self, destination: str, info_type: str) -> str:
         query_templates = {
             "general": f"{destination} travel guide 2024",
             "restaurants": f"best restaurants in {destination} local food",
@@ -120,8 +323,7 @@ class BraveSearchTool:
             "tips": f"{destination} travel tips tourists"
         }
 
-        query = query_templates.get(info_type, query_templates["general"])
-        return self.search(query, count=5)
+        return query_templates.get(info_type, query_templates["general"])
 
     def format_results(self, results: List[SearchResult], include_urls: bool = True) -> str:
         """
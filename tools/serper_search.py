@@ -1,14 +1,63 @@
 """
 Serper API Tool for Travel RAG Bot
 Provides real-time Google search results for web, images, videos, and news
+
+Errors are logged to the "travel_bot.serper" logger (configured by main.py).
 """
 import os
+import sys
+import time
+import random
+import logging
+import sqlite3
+import asyncio
+import threading
 import httpx
-from typing import List, Dict, Any, Optional
+import msgspec
+from collections import OrderedDict
+from urllib.parse import quote_plus
+from typing import Callable, List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
 
+logger = logging.getLogger("travel_bot.serper")
+
+# Identical searches within SEARCH_CACHE_TTL are answered from memory
+SEARCH_CACHE_TTL = 900  # seconds
+SEARCH_CACHE_SIZE = 512
+
+# Transient failures (429, 5xx, network errors) are retried with jittered
+# exponential backoff. After CIRCUIT_FAILURE_THRESHOLD failed requests in a row
+# the API is skipped for CIRCUIT_OPEN_SECONDS and searches go straight to fallback.
+MAX_ATTEMPTS = 3
+BACKOFF_BASE = 0.1  # seconds
+BACKOFF_MAX = 1.0
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_OPEN_SECONDS = 30.0
+
+# Error statuses are logged and answered with the fallback; SERPER_STRICT=1
+# raises httpx.HTTPStatusError instead (for debugging)
+SERPER_STRICT = os.getenv("SERPER_STRICT", "") == "1"
+
+
+class SerperUnavailableError(Exception):
+    """Raised instead of calling the API while the circuit breaker is open"""
+
+
+def _is_retryable(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
 
-@dataclass
+def _intern(value: Optional[str]) -> Optional[str]:
+    """Intern a low-cardinality field (channel, source) so repeats share one string"""
+    return sys.intern(value) if value else value
+
+
+def _backoff(attempt: int) -> float:
+    """Full-jitter delay before retry number attempt + 1"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+@dataclass(slots=True, frozen=True)
 class SearchResult:
     """Web search result"""
     title: str
@@ -17,7 +66,7 @@ class SearchResult:
     position: int = 0
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class VideoResult:
     """Video search result"""
     title: str
@@ -27,6 +76,130 @@ class VideoResult:
     thumbnail: str
 
 
+# =============================================================================
+# API RESPONSE
+# Typed view of a Serper response. msgspec decodes straight into these structs
+# and skips every field not declared here (image thumbnails and sizes, sitelinks,
+# knowledge graph) without allocating them; each endpoint fills one list.
+# The structs only hold strings and lists of structs, so they can never form a
+# reference cycle and are left untracked by the garbage collector (gc=False).
+# =============================================================================
+
+class SerperOrganic(msgspec.Struct, gc=False):
+    title: Optional[str] = ""
+    link: Optional[str] = ""
+    snippet: Optional[str] = ""
+
+
+class SerperVideo(msgspec.Struct, gc=False):
+    title: Optional[str] = ""
+    link: Optional[str] = ""
+    channel: Optional[str] = ""
+    duration: Optional[str] = ""
+    imageUrl: Optional[str] = ""
+
+
+class SerperImage(msgspec.Struct, gc=False):
+    title: Optional[str] = ""
+    link: Optional[str] = ""
+    imageUrl: Optional[str] = ""
+    source: Optional[str] = ""
+
+
+class SerperResponse(msgspec.Struct, gc=False):
+    organic: List[SerperOrganic] = []
+    videos: List[SerperVideo] = []
+    images: List[SerperImage] = []
+
+
+serper_decoder = msgspec.json.Decoder(SerperResponse)
+# A batch request (JSON array of queries) returns one response per query, in order
+serper_batch_decoder = msgspec.json.Decoder(List[SerperResponse])
+
+
+# =============================================================================
+# DISK CACHE
+# Responses are shared across tool instances and restarts through a sqlite
+# file (key -> encoded SerperResponse), checked after the in-memory LRU.
+# Travel queries repeat across users, so most popular searches never reach
+# the API. Set SERPER_CACHE_PATH to "" to disable it.
+# =============================================================================
+DISK_CACHE_TTL = 86400  # seconds
+SERPER_CACHE_PATH = os.getenv("SERPER_CACHE_PATH", os.path.join(".cache", "serper_search.sqlite3"))
+
+_disk_cache_db: Optional[sqlite3.Connection] = None
+_disk_cache_lock = threading.Lock()
+
+
+def _get_disk_cache_db() -> Optional[sqlite3.Connection]:
+    """Open the sqlite cache on first use (None when disabled or unavailable)"""
+    global _disk_cache_db
+    if _disk_cache_db is None and SERPER_CACHE_PATH:
+        try:
+            os.makedirs(os.path.dirname(SERPER_CACHE_PATH) or ".", exist_ok=True)
+            _disk_cache_db = sqlite3.connect(SERPER_CACHE_PATH, check_same_thread=False)
+            _disk_cache_db.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, expires REAL NOT NULL, body BLOB NOT NULL)"
+            )
+        except sqlite3.Error as e:
+            logger.warning("Serper disk cache disabled: %s", e)
+            return None
+    return _disk_cache_db
+
+
+def _disk_key(key: Tuple[str, str, int]) -> str:
+    path, query, num_results = key
+    return f"{path}|{num_results}|{query}"
+
+
+def _disk_get(key: Tuple[str, str, int]) -> Optional[SerperResponse]:
+    with _disk_cache_lock:
+        db = _get_disk_cache_db()
+        if db is None:
+            return None
+        try:
+            row = db.execute(
+                "SELECT expires, body FROM responses WHERE key = ?", (_disk_key(key),)
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Serper disk cache read failed: %s", e)
+            return None
+    if row is None or row[0] <= time.time():
+        return None
+    try:
+        return serper_decoder.decode(row[1])
+    except msgspec.DecodeError as e:  # also covers ValidationError
+        logger.warning("Serper disk cache entry unreadable: %s", e)
+        return None
+
+
+def _disk_put(key: Tuple[str, str, int], data: SerperResponse):
+    with _disk_cache_lock:
+        db = _get_disk_cache_db()
+        if db is None:
+            return
+        try:
+            with db:
+                db.execute(
+                    "INSERT OR REPLACE INTO responses (key, expires, body) VALUES (?, ?, ?)",
+                    (_disk_key(key), time.time() + DISK_CACHE_TTL, msgspec.json.encode(data))
+                )
+        except sqlite3.Error as e:
+            logger.warning("Serper disk cache write failed: %s", e)
+
+
+def _disk_clear():
+    with _disk_cache_lock:
+        db = _get_disk_cache_db()
+        if db is None:
+            return
+        try:
+            with db:
+                db.execute("DELETE FROM responses")
+        except sqlite3.Error as e:
+            logger.warning("Serper disk cache clear failed: %s", e)
+
+
 class SerperSearchTool:
     """
     Serper API integration for real-time Google search.
@@ -36,6 +209,285 @@ class SerperSearchTool:
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or os.getenv("SERPER_API_KEY")
         self.base_url = "https://google.serper.dev"
+        self._client: Optional[httpx.Client] = None
+        self._aclient: Optional[httpx.AsyncClient] = None
+
+        # (endpoint, normalized query, num_results) -> (expires, results), LRU-bounded
+        self._cache: "OrderedDict[Tuple[str, str, int], Tuple[float, list]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        # Circuit breaker state
+        self._consecutive_failures = 0
+        self._circuit_open_until = 0.0
+        self._http_version_logged = False
+
+    def _get_client(self) -> httpx.Client:
+        """Get or create this tool's pooled client (keep-alive connections are reused across searches)"""
+        if self._client is None:
+            self._client = httpx.Client(
+                http2=True,
+                timeout=10.0,
+                headers=self._headers(),
+                limits=httpx.Limits(max_keepalive_connections=16, max_connections=20, keepalive_expiry=60.0)
+            )
+        return self._client
+
+    def _get_aclient(self) -> httpx.AsyncClient:
+        """Get or create the pooled async client (bound to the event loop that first uses it)"""
+        if self._aclient is None:
+            self._aclient = httpx.AsyncClient(
+                http2=True,
+                timeout=10.0,
+                headers=self._headers(),
+                limits=httpx.Limits(max_keepalive_connections=32, keepalive_expiry=60.0)
+            )
+        return self._aclient
+
+    def close(self):
+        """Close the pooled client"""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self):
+        """Close both pooled clients"""
+        self.close()
+        if self._aclient is not None:
+            await self._aclient.aclose()
+            self._aclient = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "X-API-KEY": self.api_key,
+            "Content-Type": "application/json"
+        }
+
+    def _cache_get(self, key: Tuple[str, str, int]) -> Optional[list]:
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return list(entry[1])
+
+    def _cache_put(self, key: Tuple[str, str, int], results: list):
+        with self._cache_lock:
+            self._cache[key] = (time.time() + SEARCH_CACHE_TTL, list(results))
+            self._cache.move_to_end(key)
+            if len(self._cache) > SEARCH_CACHE_SIZE:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self, disk: bool = False):
+        """Drop this tool's cached results; disk=True also empties the shared sqlite cache"""
+        with self._cache_lock:
+            self._cache.clear()
+        if disk:
+            _disk_clear()
+
+    def _check_circuit(self):
+        if self._circuit_open_until > time.monotonic():
+            raise SerperUnavailableError("circuit open after repeated failures")
+
+    def _record_result(self, ok: bool):
+        if ok:
+            self._consecutive_failures = 0
+            return
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= CIRCUIT_FAILURE_THRESHOLD:
+            self._circuit_open_until = time.monotonic() + CIRCUIT_OPEN_SECONDS
+            self._consecutive_failures = 0
+            logger.warning("Serper failing repeatedly; skipping it for %.0fs", CIRCUIT_OPEN_SECONDS)
+
+    def _log_http_version(self, response: httpx.Response):
+        """Log the negotiated protocol once, to confirm HTTP/2 is in use"""
+        if not self._http_version_logged:
+            self._http_version_logged = True
+            logger.debug("Serper connection uses %s", response.http_version)
+
+    def _check_response(self, path: str, response: httpx.Response, final: bool) -> Optional[bool]:
+        """
+        True for a success, False for an error status that ends the request
+        (logged), None for one worth retrying.
+        """
+        status = response.status_code
+        if status < 400:
+            self._record_result(True)
+            self._log_http_version(response)
+            return True
+        if not final and _is_retryable(status):
+            return None
+        self._record_result(False)
+        if SERPER_STRICT:
+            response.raise_for_status()
+        logger.warning("Serper %s -> HTTP %d", path, status)
+        return False
+
+    def _post_raw(self, path: str, payload: Any) -> Optional[bytes]:
+        """POST to the Serper API with retries; returns the response body, or None on an error status"""
+        self._check_circuit()
+        for attempt in range(MAX_ATTEMPTS):
+            final = attempt == MAX_ATTEMPTS - 1
+            try:
+                response = self._get_client().post(f"{self.base_url}{path}", json=payload)
+            except httpx.TransportError:
+                if final:
+                    self._record_result(False)
+                    raise
+            else:
+                ok = self._check_response(path, response, final)
+                if ok is not None:
+                    return response.content if ok else None
+            time.sleep(_backoff(attempt))
+
+    async def _apost_raw(self, path: str, payload: Any) -> Optional[bytes]:
+        """Async version of _post_raw()"""
+        self._check_circuit()
+        for attempt in range(MAX_ATTEMPTS):
+            final = attempt == MAX_ATTEMPTS - 1
+            try:
+                response = await self._get_aclient().post(f"{self.base_url}{path}", json=payload)
+            except httpx.TransportError:
+                if final:
+                    self._record_result(False)
+                    raise
+            else:
+                ok = self._check_response(path, response, final)
+                if ok is not None:
+                    return response.content if ok else None
+            await asyncio.sleep(_backoff(attempt))
+
+    def _post(self, path: str, payload: Dict[str, Any]) -> Optional[SerperResponse]:
+        """POST a search to the Serper API and return the decoded response (None on an error status)"""
+        body = self._post_raw(path, payload)
+        return serper_decoder.decode(body) if body is not None else None
+
+    async def _apost(self, path: str, payload: Dict[str, Any]) -> Optional[SerperResponse]:
+        """Async version of _post()"""
+        body = await self._apost_raw(path, payload)
+        return serper_decoder.decode(body) if body is not None else None
+
+    def _post_json(
+        self,
+        path: str,
+        query: str,
+        num_results: int,
+        parser: Callable[[SerperResponse, int], list]
+    ) -> Optional[list]:
+        """Parsed results of one Serper endpoint (cached); None if the request failed"""
+        key = (path, query.strip().lower(), num_results)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            data = _disk_get(key)
+            if data is None:
+                data = self._post(path, self._payload(path, query, num_results))
+                if data is None:
+                    return None
+                _disk_put(key, data)
+            results = parser(data, num_results)
+        except SerperUnavailableError:
+            return None
+        except httpx.HTTPStatusError as e:
+            if SERPER_STRICT:
+                raise
+            logger.warning("Serper %s error: HTTP %d: %s", path, e.response.status_code, e)
+            return None
+        except Exception as e:
+            logger.warning("Serper %s error: %s", path, e)
+            return None
+
+        self._cache_put(key, results)
+        return results
+
+    async def _apost_json(
+        self,
+        path: str,
+        query: str,
+        num_results: int,
+        parser: Callable[[SerperResponse, int], list]
+    ) -> Optional[list]:
+        """Async version of _post_json()"""
+        key = (path, query.strip().lower(), num_results)
+        cached = self._cache_get(key)
+        if cached is not None:
+            return cached
+
+        try:
+            # sqlite I/O (and its lock, shared with sync searches) stays off the event loop
+            data = await asyncio.to_thread(_disk_get, key)
+            if data is None:
+                data = await self._apost(path, self._payload(path, query, num_results))
+                if data is None:
+                    return None
+                await asyncio.to_thread(_disk_put, key, data)
+            results = parser(data, num_results)
+        except SerperUnavailableError:
+            return None
+        except httpx.HTTPStatusError as e:
+            if SERPER_STRICT:
+                raise
+            logger.warning("Serper %s error: HTTP %d: %s", path, e.response.status_code, e)
+            return None
+        except Exception as e:
+            logger.warning("Serper %s error: %s", path, e)
+            return None
+
+        self._cache_put(key, results)
+        return results
+
+    def _post_many(
+        self,
+        path: str,
+        queries: List[str],
+        num_results: int,
+        parser: Callable[[SerperResponse, int], list]
+    ) -> List[Optional[list]]:
+        """
+        Parsed results for several queries, with every uncached query sent in
+        one batch request. Entries are None where the request failed.
+        """
+        keys = [(path, query.strip().lower(), num_results) for query in queries]
+        results = [self._cache_get(key) for key in keys]
+        missing = []
+        for i, cached in enumerate(results):
+            if cached is None:
+                data = _disk_get(keys[i])
+                if data is None:
+                    missing.append(i)
+                else:
+                    results[i] = parser(data, num_results)
+                    self._cache_put(keys[i], results[i])
+        if not missing:
+            return results
+
+        try:
+            body = self._post_raw(path, [self._payload(path, queries[i], num_results) for i in missing])
+            batch = serper_batch_decoder.decode(body) if body is not None else []
+            for i, data in zip(missing, batch):
+                _disk_put(keys[i], data)
+                results[i] = parser(data, num_results)
+                self._cache_put(keys[i], results[i])
+        except SerperUnavailableError:
+            pass
+        except httpx.HTTPStatusError as e:
+            if SERPER_STRICT:
+                raise
+            logger.warning("Serper %s batch error: HTTP %d: %s", path, e.response.status_code, e)
+        except Exception as e:
+            logger.warning("Serper %s batch error: %s", path, e)
+
+        return results
 
     def search(self, query: str, num_results: int = 5) -> List[SearchResult]:
         """
@@ -51,47 +503,27 @@ class SerperSearchTool:
         if not self.api_key:
             return self._fallback_response(query)
 
-        try:
-            headers = {
-                "X-API-KEY": self.api_key,
-                "Content-Type": "application/json"
-            }
-
-            payload = {
-                "q": query,
-                "num": min(num_results, 10),
-                "gl": "in",  # India for travel-relevant results
-                "hl": "en"
-            }
-
-            with httpx.Client(timeout=10.0) as client:
-                response = client.post(
-                    f"{self.base_url}/search",
-                    headers=headers,
-                    json=payload
-                )
-                response.raise_for_status()
-                data = response.json()
+        results = self._post_json("/search", query, num_results, self._parse_web)
+        return results if results is not None else self._fallback_response(query)
 
-            results = []
-            organic = data.get("organic", [])
+    async def asearch(self, query: str, num_results: int = 5) -> List[SearchResult]:
+        """Async version of search()"""
+        if not self.api_key:
+            return self._fallback_response(query)
 
-            for i, item in enumerate(organic[:num_results], 1):
-                results.append(SearchResult(
-                    title=item.get("title", ""),
-                    url=item.get("link", ""),
-                    snippet=item.get("snippet", ""),
-                    position=i
-                ))
+        results = await self._apost_json("/search", query, num_results, self._parse_web)
+        return results if results is not None else self._fallback_response(query)
 
-            return results
+    def search_many(self, queries: List[str], num_results: int = 5) -> List[List[SearchResult]]:
+        """Web results for several queries in one API call (one result list per query, in order)"""
+        if not self.api_key:
+            return [self._fallback_response(query) for query in queries]
 
-        except httpx.HTTPStatusError as e:
-            print(f"[Serper API Error] HTTP {e.response.status_code}: {e}")
-            return self._fallback_response(query)
-        except Exception as e:
-            print(f"[Serper Error] {e}")
-            return self._fallback_response(query)
+        batch = self._post_many("/search", queries, num_results, self._parse_web)
+        return [
+            results if results is not None else self._fallback_response(query)
+            for query, results in zip(queries, batch)
+        ]
 
     def search_videos(self, query: str, num_results: int = 3) -> List[VideoResult]:
         """
@@ -107,43 +539,27 @@ class SerperSearchTool:
         if not self.api_key:
             return self._fallback_video_response(query)
 
-        try:
-            headers = {
-                "X-API-KEY": self.api_key,
-                "Content-Type": "application/json"
-            }
-
-            payload = {
-                "q": query,
-                "num": min(num_results, 10)
-            }
-
-            with httpx.Client(timeout=10.0) as client:
-                response = client.post(
-                    f"{self.base_url}/videos",
-                    headers=headers,
-                    json=payload
-                )
-                response.raise_for_status()
-                data = response.json()
+        results = self._post_json("/videos", query, num_results, self._parse_videos)
+        return results if results is not None else self._fallback_video_response(query)
 
-            results = []
-            videos = data.get("videos", [])
+    async def asearch_videos(self, query: str, num_results: int = 3) -> List[VideoResult]:
+        """Async version of search_videos()"""
+        if not self.api_key:
+            return self._fallback_video_response(query)
 
-            for item in videos[:num_results]:
-                results.append(VideoResult(
-                    title=item.get("title", ""),
-                    url=item.get("link", ""),
-                    channel=item.get("channel", ""),
-                    duration=item.get("duration", ""),
-                    thumbnail=item.get("imageUrl", "")
-                ))
+        results = await self._apost_json("/videos", query, num_results, self._parse_videos)
+        return results if results is not None else self._fallback_video_response(query)
 
-            return results
+    def search_videos_many(self, queries: List[str], num_results: int = 3) -> List[List[VideoResult]]:
+        """Video results for several queries in one API call (one result list per query, in order)"""
+        if not self.api_key:
+            return [self._fallback_video_response(query) for query in queries]
 
-        except Exception as e:
-            print(f"[Serper Video Error] {e}")
-            return self._fallback_video_response(query)
+        batch = self._post_many("/videos", queries, num_results, self._parse_videos)
+        return [
+            results if results is not None else self._fallback_video_response(query)
+            for query, results in zip(queries, batch)
+        ]
 
     def search_images(self, query: str, num_results: int = 5) -> List[Dict[str, str]]:
         """
@@ -159,48 +575,84 @@ class SerperSearchTool:
         if not self.api_key:
             return []
 
-        try:
-            headers = {
-                "X-API-KEY": self.api_key,
-                "Content-Type": "application/json"
-            }
-
-            payload = {
-                "q": query,
-                "num": min(num_results, 10)
-            }
-
-            with httpx.Client(timeout=10.0) as client:
-                response = client.post(
-                    f"{self.base_url}/images",
-                    headers=headers,
-                    json=payload
-                )
-                response.raise_for_status()
-                data = response.json()
+        return self._post_json("/images", query, num_results, self._parse_images) or []
 
-            results = []
-            images = data.get("images", [])
-
-            for item in images[:num_results]:
-                results.append({
-                    "title": item.get("title", ""),
-                    "url": item.get("link", ""),
-                    "image_url": item.get("imageUrl", ""),
-                    "source": item.get("source", "")
-                })
-
-            return results
-
-        except Exception as e:
-            print(f"[Serper Image Error] {e}")
+    async def asearch_images(self, query: str, num_results: int = 5) -> List[Dict[str, str]]:
+        """Async version of search_images()"""
+        if not self.api_key:
             return []
 
+        return await self._apost_json("/images", query, num_results, self._parse_images) or []
+
+    async def asearch_all(
+        self,
+        query: str,
+        num_results: int = 5,
+        num_videos: int = 3,
+        num_images: int = 5
+    ) -> Tuple[List[SearchResult], List[VideoResult], List[Dict[str, str]]]:
+        """Web, video and image results for one query, fetched concurrently"""
+        return await asyncio.gather(
+            self.asearch(query, num_results),
+            self.asearch_videos(query, num_videos),
+            self.asearch_images(query, num_images)
+        )
+
+    def _payload(self, path: str, query: str, num_results: int) -> Dict[str, Any]:
+        payload = {
+            "q": query,
+            "num": min(num_results, 10)
+        }
+        if path == "/search":
+            payload["gl"] = "in"  # India for travel-relevant results
+            payload["hl"] = "en"
+        return payload
+
+    def _parse_web(self, data: SerperResponse, num_results: int) -> List[SearchResult]:
+        results = []
+
+        for i, item in enumerate(data.organic[:num_results], 1):
+            results.append(SearchResult(
+                title=item.title,
+                url=item.link,
+                snippet=item.snippet,
+                position=i
+            ))
+
+        return results
+
+    def _parse_videos(self, data: SerperResponse, num_results: int) -> List[VideoResult]:
+        results = []
+
+        for item in data.videos[:num_results]:
+            results.append(VideoResult(
+                title=item.title,
+                url=item.link,
+                channel=_intern(item.channel),
+                duration=item.duration,
+                thumbnail=item.imageUrl
+            ))
+
+        return results
+
+    def _parse_images(self, data: SerperResponse, num_results: int) -> List[Dict[str, str]]:
+        results = []
+
+        for item in data.images[:num_results]:
+            results.append({
+                "title": item.title,
+                "url": item.link,
+                "image_url": item.imageUrl,
+                "source": _intern(item.source)
+            })
+
+        return results
+
     def _fallback_response(self, query: str) -> List[SearchResult]:
         """Fallback when API is not available"""
         return [SearchResult(
             title=f"Search results for: {query}",
-            url=f"https://www.google.com/search?q={query.replace(' ', '+')}",
+            url=f"https://www.google.com/search?q={quote_plus(query)}",
             snippet=f"SERPER_API_KEY not configured. Click to search manually for '{query}'",
             position=1
         )]
@@ -209,7 +661,7 @@ class SerperSearchTool:
         """Fallback for video search when API is not available"""
         return [VideoResult(
             title=f"Search YouTube: {query}",
-            url=f"https://www.youtube.com/results?search_query={query.replace(' ', '+')}",
+            url=f"https://www.youtube.com/results?search_query={quote_plus(query)}",
             channel="YouTube Search",
             duration="",
             thumbnail=""
@@ -220,45 +672,44 @@ class SerperSearchTool:
         if not results:
             return "No search results found."
 
-        output = "Web Search Results:\n\n"
+        parts = ["Web Search Results:\n\n"]
         for result in results:
-            output += f"{result.position}. {result.title}\n"
+            parts.append(f"{result.position}. {result.title}\n")
             if result.snippet:
-                output += f"   {result.snippet[:200]}{'...' if len(result.snippet) > 200 else ''}\n"
-            output += f"   Link: {result.url}\n\n"
+                ellipsis = "..." if len(result.snippet) > 200 else ""
+                parts.append(f"   {result.snippet[:200]}{ellipsis}\n")
+            parts.append(f"   Link: {result.url}\n\n")
 
-        return output
+        return "".join(parts)
 
     def format_video_results(self, results: List[VideoResult]) -> str:
         """Format video search results for display"""
         if not results:
             return "No videos found."
 
-        output = "YouTube Videos:\n\n"
+        parts = ["YouTube Videos:\n\n"]
         for i, video in enumerate(results, 1):
-            output += f"{i}. {video.title}\n"
-            output += f"   Channel: {video.channel}\n"
+            parts.append(f"{i}. {video.title}\n   Channel: {video.channel}\n")
             if video.duration:
-                output += f"   Duration: {video.duration}\n"
-            output += f"   Watch: {video.url}\n\n"
+                parts.append(f"   Duration: {video.duration}\n")
+            parts.append(f"   Watch: {video.url}\n\n")
 
-        return output
+        return "".join(parts)
 
 
-def search_web(query: str, num_results: int = 5) -> List[Dict[str, str]]:
-    """
-    Convenience function to search the web.
+# Shared by the convenience functions so their searches reuse one connection pool
+_default_tool: Optional[SerperSearchTool] = None
 
-    Args:
-        query: Search query
-        num_results: Number of results
 
-    Returns:
-        List of result dictionaries
-    """
-    tool = SerperSearchTool()
-    results = tool.search(query, num_results)
+def _get_default_tool() -> SerperSearchTool:
+    """Get or create the shared SerperSearchTool"""
+    global _default_tool
+    if _default_tool is None:
+        _default_tool = SerperSearchTool()
+    return _default_tool
+
 
+def _web_dicts(results: List[SearchResult]) -> List[Dict[str, str]]:
     return [
         {
             "title": r.title,
@@ -270,9 +721,43 @@ def search_web(query: str, num_results: int = 5) -> List[Dict[str, str]]:
     ]
 
 
+def _video_dicts(results: List[VideoResult]) -> List[Dict[str, str]]:
+    return [
+        {
+            "title": v.title,
+            "url": v.url,
+            "channel": v.channel,
+            "duration": v.duration,
+            "thumbnail": v.thumbnail
+        }
+        for v in results
+    ]
+
+
+def search_web(query: str, num_results: int = 5) -> List[Dict[str, str]]:
+    """
+    Convenience function to search the web.
+    Blocks on the network: inside an event loop, use asearch_web instead.
+
+    Args:
+        query: Search query
+        num_results: Number of results
+
+    Returns:
+        List of result dictionaries
+    """
+    return _web_dicts(_get_default_tool().search(query, num_results))
+
+
+async def asearch_web(query: str, num_results: int = 5) -> List[Dict[str, str]]:
+    """Async version of search_web(), on the shared tool's AsyncClient"""
+    return _web_dicts(await _get_default_tool().asearch(query, num_results))
+
+
 def search_youtube(query: str, num_results: int = 3) -> List[Dict[str, str]]:
     """
     Convenience function to search YouTube videos.
+    Blocks on the network: inside an event loop, use asearch_youtube instead.
 
     Args:
         query: Search query
@@ -281,19 +766,12 @@ def search_youtube(query: str, num_results: int = 3) -> List[Dict[str, str]]:
     Returns:
         List of video dictionaries
     """
-    tool = SerperSearchTool()
-    results = tool.search_videos(query, num_results)
+    return _video_dicts(_get_default_tool().search_videos(query, num_results))
 
-    return [
-        {
-            "title": v.title,
-            "url": v.url,
-            "channel": v.channel,
-            "duration": v.duration,
-            "thumbnail": v.thumbnail
-        }
-        for v in results
-    ]
+
+async def asearch_youtube(query: str, num_results: int = 3) -> List[Dict[str, str]]:
+    """Async version of search_youtube(), on the shared tool's AsyncClient"""
+    return _video_dicts(await _get_default_tool().asearch_videos(query, num_results))
 
 
 if __name__ == "__main__":
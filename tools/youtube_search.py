@@ -1,14 +1,24 @@
 """
 YouTube Video Search Tool for Travel RAG Bot
 Uses YouTube Data API v3 to search for travel-related videos
+
+Errors are logged to the "travel_bot.youtube" logger (configured by main.py).
 """
 import os
 import re
-from typing import List, Dict, Any, Optional
+import sys
+import asyncio
+import logging
+import httpx
+from urllib.parse import quote_plus
+from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass
+from functools import lru_cache
+
+logger = logging.getLogger("travel_bot.youtube")
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class YouTubeVideo:
     """YouTube video result"""
     title: str
@@ -19,6 +29,211 @@ class YouTubeVideo:
     thumbnail: str
 
 
+# Popular video mappings for Rajasthan destinations, built once at import
+_VIDEO_DATABASE: Dict[str, Tuple[YouTubeVideo, ...]] = {
+    "amber fort": (
+        YouTubeVideo(
+            title="Amber Fort Jaipur - Complete Tour Guide",
+            video_id="amber_fort_guide",
+            url="https://www.youtube.com/results?search_query=amber+fort+jaipur+complete+guide",
+            channel="Travel Guide",
+            description="Complete walkthrough of Amber Fort with history and tips",
+            thumbnail=""
+        ),
+        YouTubeVideo(
+            title="Amber Fort History & Architecture",
+            video_id="amber_fort_history",
+            url="https://www.youtube.com/results?search_query=amber+fort+history+architecture",
+            channel="India Travel",
+            description="Learn about the rich history of Amber Fort",
+            thumbnail=""
+        )
+    ),
+    "jaipur": (
+        YouTubeVideo(
+            title="Jaipur Travel Guide - Top Things to Do",
+            video_id="jaipur_guide",
+            url="https://www.youtube.com/results?search_query=jaipur+travel+guide+things+to+do",
+            channel="Travel Vlog",
+            description="Complete Jaipur travel guide with top attractions",
+            thumbnail=""
+        ),
+        YouTubeVideo(
+            title="Pink City Jaipur - Full Day Tour",
+            video_id="jaipur_tour",
+            url="https://www.youtube.com/results?search_query=jaipur+pink+city+full+day+tour",
+            channel="India Explorer",
+            description="Explore the Pink City of India",
+            thumbnail=""
+        )
+    ),
+    "hawa mahal": (
+        YouTubeVideo(
+            title="Hawa Mahal - Palace of Winds Jaipur",
+            video_id="hawa_mahal_guide",
+            url="https://www.youtube.com/results?search_query=hawa+mahal+palace+of+winds+jaipur",
+            channel="Heritage Tours",
+            description="Explore the iconic Hawa Mahal",
+            thumbnail=""
+        )
+    ),
+    "mehrangarh": (
+        YouTubeVideo(
+            title="Mehrangarh Fort Jodhpur - Complete Guide",
+            video_id="mehrangarh_guide",
+            url="https://www.youtube.com/results?search_query=mehrangarh+fort+jodhpur+complete+guide",
+            channel="Fort Tours",
+            description="Explore one of India's largest forts",
+            thumbnail=""
+        ),
+        YouTubeVideo(
+            title="Mehrangarh Fort - Blue City Views",
+            video_id="mehrangarh_views",
+            url="https://www.youtube.com/results?search_query=mehrangarh+fort+blue+city+jodhpur",
+            channel="Travel India",
+            description="Amazing views of the Blue City from Mehrangarh",
+            thumbnail=""
+        )
+    ),
+    "jodhpur": (
+        YouTubeVideo(
+            title="Jodhpur Travel Guide - Blue City",
+            video_id="jodhpur_guide",
+            url="https://www.youtube.com/results?search_query=jodhpur+blue+city+travel+guide",
+            channel="Rajasthan Travel",
+            description="Complete guide to exploring Jodhpur",
+            thumbnail=""
+        )
+    ),
+    "udaipur": (
+        YouTubeVideo(
+            title="Udaipur - Venice of the East",
+            video_id="udaipur_guide",
+            url="https://www.youtube.com/results?search_query=udaipur+venice+of+east+travel+guide",
+            channel="Lake City Tours",
+            description="Explore the romantic city of Udaipur",
+            thumbnail=""
+        ),
+        YouTubeVideo(
+            title="Lake Pichola Udaipur Boat Ride",
+            video_id="pichola_boat",
+            url="https://www.youtube.com/results?search_query=lake+pichola+udaipur+boat+ride",
+            channel="Udaipur Vlogs",
+            description="Experience the beautiful Lake Pichola",
+            thumbnail=""
+        )
+    ),
+    "city palace": (
+        YouTubeVideo(
+            title="City Palace Udaipur - Royal Heritage",
+            video_id="city_palace_udaipur",
+            url="https://www.youtube.com/results?search_query=city+palace+udaipur+tour+guide",
+            channel="Royal Rajasthan",
+            description="Tour the magnificent City Palace of Udaipur",
+            thumbnail=""
+        )
+    ),
+    "pushkar": (
+        YouTubeVideo(
+            title="Pushkar Travel Guide - Holy Town",
+            video_id="pushkar_guide",
+            url="https://www.youtube.com/results?search_query=pushkar+travel+guide+brahma+temple",
+            channel="Spiritual India",
+            description="Explore the sacred town of Pushkar",
+            thumbnail=""
+        )
+    ),
+    "ranakpur": (
+        YouTubeVideo(
+            title="Ranakpur Jain Temple - Marble Marvel",
+            video_id="ranakpur_temple",
+            url="https://www.youtube.com/results?search_query=ranakpur+jain+temple+guide",
+            channel="Temple Tours",
+            description="Explore the stunning Ranakpur Jain Temple",
+            thumbnail=""
+        )
+    ),
+    "chokhi dhani": (
+        YouTubeVideo(
+            title="Chokhi Dhani Jaipur - Village Experience",
+            video_id="chokhi_dhani",
+            url="https://www.youtube.com/results?search_query=chokhi+dhani+jaipur+village+experience",
+            channel="Food & Culture",
+            description="Experience Rajasthani culture at Chokhi Dhani",
+            thumbnail=""
+        )
+    ),
+    "nahargarh": (
+        YouTubeVideo(
+            title="Nahargarh Fort Jaipur - Sunset Views",
+            video_id="nahargarh_fort",
+            url="https://www.youtube.com/results?search_query=nahargarh+fort+jaipur+sunset+views",
+            channel="Fort Explorer",
+            description="Best sunset views from Nahargarh Fort",
+            thumbnail=""
+        )
+    ),
+    "day 1": (
+        YouTubeVideo(
+            title="Jaipur Day 1 Itinerary - Amber Fort & More",
+            video_id="jaipur_day1",
+            url="https://www.youtube.com/results?search_query=jaipur+one+day+itinerary+amber+fort",
+            channel="Travel Planner",
+            description="Perfect Day 1 itinerary for Jaipur",
+            thumbnail=""
+        )
+    ),
+    "day 2": (
+        YouTubeVideo(
+            title="Jaipur Day 2 - Forts & Local Experience",
+            video_id="jaipur_day2",
+            url="https://www.youtube.com/results?search_query=jaipur+nahargarh+jaigarh+fort+tour",
+            channel="Travel Guide",
+            description="Explore Nahargarh and Jaigarh forts",
+            thumbnail=""
+        )
+    ),
+}
+
+_DEFAULT_RAJASTHAN_VIDEOS: Tuple[YouTubeVideo, ...] = (
+    YouTubeVideo(
+        title="Rajasthan Travel Guide - Complete Tour",
+        video_id="rajasthan_guide",
+        url="https://www.youtube.com/results?search_query=rajasthan+travel+guide+complete+tour",
+        channel="India Travel",
+        description="Complete guide to exploring Rajasthan",
+        thumbnail=""
+    ),
+    YouTubeVideo(
+        title="Best of Rajasthan - Top Places to Visit",
+        video_id="rajasthan_top",
+        url="https://www.youtube.com/results?search_query=rajasthan+best+places+to+visit",
+        channel="Travel India",
+        description="Top attractions in Rajasthan",
+        thumbnail=""
+    )
+)
+
+# Keywords of the predefined video sets, in lookup priority order
+_VIDEO_KEYWORDS = tuple(_VIDEO_DATABASE)
+# One pass over the query finds every keyword occurrence; the lookahead keeps
+# overlapping matches so the highest-priority keyword always wins
+_VIDEO_KEYWORD_RE = re.compile("(?=(" + "|".join(map(re.escape, _VIDEO_KEYWORDS)) + "))")
+_VIDEO_KEYWORD_PRIORITY = {keyword: i for i, keyword in enumerate(_VIDEO_KEYWORDS)}
+
+
+@lru_cache(maxsize=256)
+def _lookup_videos(query_lower: str) -> Tuple[YouTubeVideo, ...]:
+    """Predefined videos for a lowercased query (memoized: planners repeat the same queries)"""
+    # Find matching videos
+    matches = _VIDEO_KEYWORD_RE.findall(query_lower)
+    if matches:
+        return _VIDEO_DATABASE[min(matches, key=_VIDEO_KEYWORD_PRIORITY.__getitem__)]
+
+    # Default Rajasthan videos
+    return _DEFAULT_RAJASTHAN_VIDEOS
+
+
 class YouTubeSearchTool:
     """
     YouTube Search Tool using YouTube Data API v3.
@@ -28,6 +243,30 @@ class YouTubeSearchTool:
     def __init__(self, api_key: Optional[str] = None):
         self.api_key = api_key or os.getenv("YOUTUBE_API_KEY")
         self.base_url = "https://www.googleapis.com/youtube/v3/search"
+        self._client: Optional[httpx.Client] = None
+        self._http_version_logged = False
+
+    def _get_client(self) -> httpx.Client:
+        """Get or create this tool's pooled client (keep-alive connections are reused across searches)"""
+        if self._client is None:
+            self._client = httpx.Client(
+                http2=True,
+                timeout=10.0,
+                limits=httpx.Limits(max_keepalive_connections=16, max_connections=20, keepalive_expiry=60.0)
+            )
+        return self._client
+
+    def close(self):
+        """Close the pooled client"""
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
 
     def search(self, query: str, max_results: int = 2) -> List[YouTubeVideo]:
         """
@@ -51,8 +290,6 @@ class YouTubeSearchTool:
     def _search_with_api(self, query: str, max_results: int) -> List[YouTubeVideo]:
         """Search using YouTube Data API v3"""
         try:
-            import httpx
-
             params = {
                 "part": "snippet",
                 "q": query,
@@ -64,10 +301,12 @@ class YouTubeSearchTool:
                 "order": "relevance"
             }
 
-            with httpx.Client() as client:
-                response = client.get(self.base_url, params=params)
-                response.raise_for_status()
-                data = response.json()
+            response = self._get_client().get(self.base_url, params=params)
+            response.raise_for_status()
+            if not self._http_version_logged:
+                self._http_version_logged = True
+                logger.debug("YouTube API connection uses %s", response.http_version)
+            data = response.json()
 
             videos = []
             for item in data.get("items", []):
@@ -79,7 +318,7 @@ class YouTubeSearchTool:
                         title=snippet.get("title", ""),
                         video_id=video_id,
                         url=f"https://www.youtube.com/watch?v={video_id}",
-                        channel=snippet.get("channelTitle", ""),
+                        channel=sys.intern(snippet.get("channelTitle") or ""),
                         description=snippet.get("description", "")[:200],
                         thumbnail=snippet.get("thumbnails", {}).get("medium", {}).get("url", "")
                     ))
@@ -87,7 +326,7 @@ class YouTubeSearchTool:
             return videos
 
         except Exception as e:
-            print(f"[YouTube API Error] {e}")
+            logger.warning("YouTube API error: %s", e)
             return self._generate_search_urls(query, max_results)
 
     def _generate_search_urls(self, query: str, max_results: int) -> List[YouTubeVideo]:
@@ -95,244 +334,58 @@ class YouTubeSearchTool:
         Generate YouTube search URLs when API is not available.
         This provides direct search links for the user.
         """
-        # Clean query for URL
-        clean_query = re.sub(r'[^\w\s]', '', query)
-        url_query = clean_query.replace(' ', '+')
-
-        # Generate search URL
-        search_url = f"https://www.youtube.com/results?search_query={url_query}"
-
         # Create predefined video suggestions based on common Rajasthan destinations
         rajasthan_videos = self._get_predefined_videos(query)
 
         if rajasthan_videos:
-            return rajasthan_videos[:max_results]
+            return list(rajasthan_videos[:max_results])
 
         # Fallback to search URL
         return [YouTubeVideo(
             title=f"Search YouTube: {query}",
             video_id="search",
-            url=search_url,
+            url=f"https://www.youtube.com/results?search_query={quote_plus(query)}",
             channel="YouTube Search",
             description=f"Click to search for videos about {query}",
             thumbnail=""
         )]
 
-    def _get_predefined_videos(self, query: str) -> List[YouTubeVideo]:
+    def _get_predefined_videos(self, query: str) -> Tuple[YouTubeVideo, ...]:
         """
         Return predefined popular travel videos for Rajasthan destinations.
         These are well-known travel videos that are likely to be helpful.
+        The shared module-level tuple is returned as is; callers copy what they keep.
         """
-        query_lower = query.lower()
-
-        # Popular video mappings for Rajasthan destinations
-        video_database = {
-            "amber fort": [
-                YouTubeVideo(
-                    title="Amber Fort Jaipur - Complete Tour Guide",
-                    video_id="amber_fort_guide",
-                    url="https://www.youtube.com/results?search_query=amber+fort+jaipur+complete+guide",
-                    channel="Travel Guide",
-                    description="Complete walkthrough of Amber Fort with history and tips",
-                    thumbnail=""
-                ),
-                YouTubeVideo(
-                    title="Amber Fort History & Architecture",
-                    video_id="amber_fort_history",
-                    url="https://www.youtube.com/results?search_query=amber+fort+history+architecture",
-                    channel="India Travel",
-                    description="Learn about the rich history of Amber Fort",
-                    thumbnail=""
-                )
-            ],
-            "jaipur": [
-                YouTubeVideo(
-                    title="Jaipur Travel Guide - Top Things to Do",
-                    video_id="jaipur_guide",
-                    url="https://www.youtube.com/results?search_query=jaipur+travel+guide+things+to+do",
-                    channel="Travel Vlog",
-                    description="Complete Jaipur travel guide with top attractions",
-                    thumbnail=""
-                ),
-                YouTubeVideo(
-                    title="Pink City Jaipur - Full Day Tour",
-                    video_id="jaipur_tour",
-                    url="https://www.youtube.com/results?search_query=jaipur+pink+city+full+day+tour",
-                    channel="India Explorer",
-                    description="Explore the Pink City of India",
-                    thumbnail=""
-                )
-            ],
-            "hawa mahal": [
-                YouTubeVideo(
-                    title="Hawa Mahal - Palace of Winds Jaipur",
-                    video_id="hawa_mahal_guide",
-                    url="https://www.youtube.com/results?search_query=hawa+mahal+palace+of+winds+jaipur",
-                    channel="Heritage Tours",
-                    description="Explore the iconic Hawa Mahal",
-                    thumbnail=""
-                )
-            ],
-            "mehrangarh": [
-                YouTubeVideo(
-                    title="Mehrangarh Fort Jodhpur - Complete Guide",
-                    video_id="mehrangarh_guide",
-                    url="https://www.youtube.com/results?search_query=mehrangarh+fort+jodhpur+complete+guide",
-                    channel="Fort Tours",
-                    description="Explore one of India's largest forts",
-                    thumbnail=""
-                ),
-                YouTubeVideo(
-                    title="Mehrangarh Fort - Blue City Views",
-                    video_id="mehrangarh_views",
-                    url="https://www.youtube.com/results?search_query=mehrangarh+fort+blue+city+jodhpur",
-                    channel="Travel India",
-                    description="Amazing views of the Blue City from Mehrangarh",
-                    thumbnail=""
-                )
-            ],
-            "jodhpur": [
-                YouTubeVideo(
-                    title="Jodhpur Travel Guide - Blue City",
-                    video_id="jodhpur_guide",
-                    url="https://www.youtube.com/results?search_query=jodhpur+blue+city+travel+guide",
-                    channel="Rajasthan Travel",
-                    description="Complete guide to exploring Jodhpur",
-                    thumbnail=""
-                )
-            ],
-            "udaipur": [
-                YouTubeVideo(
-                    title="Udaipur - Venice of the East",
-                    video_id="udaipur_guide",
-                    url="https://www.youtube.com/results?search_query=udaipur+venice+of+east+travel+guide",
-                    channel="Lake City Tours",
-                    description="Explore the romantic city of Udaipur",
-                    thumbnail=""
-                ),
-                YouTubeVideo(
-                    title="Lake Pichola Udaipur Boat Ride",
-                    video_id="pichola_boat",
-                    url="https://www.youtube.com/results?search_query=lake+pichola+udaipur+boat+ride",
-                    channel="Udaipur Vlogs",
-                    description="Experience the beautiful Lake Pichola",
-                    thumbnail=""
-                )
-            ],
-            "city palace": [
-                YouTubeVideo(
-                    title="City Palace Udaipur - Royal Heritage",
-                    video_id="city_palace_udaipur",
-                    url="https://www.youtube.com/results?search_query=city+palace+udaipur+tour+guide",
-                    channel="Royal Rajasthan",
-                    description="Tour the magnificent City Palace of Udaipur",
-                    thumbnail=""
-                )
-            ],
-            "pushkar": [
-                YouTubeVideo(
-                    title="Pushkar Travel Guide - Holy Town",
-                    video_id="pushkar_guide",
-                    url="https://www.youtube.com/results?search_query=pushkar+travel+guide+brahma+temple",
-                    channel="Spiritual India",
-                    description="Explore the sacred town of Pushkar",
-                    thumbnail=""
-                )
-            ],
-            "ranakpur": [
-                YouTubeVideo(
-                    title="Ranakpur Jain Temple - Marble Marvel",
-                    video_id="ranakpur_temple",
-                    url="https://www.youtube.com/results?search_query=ranakpur+jain+temple+guide",
-                    channel="Temple Tours",
-                    description="Explore the stunning Ranakpur Jain Temple",
-                    thumbnail=""
-                )
-            ],
-            "chokhi dhani": [
-                YouTubeVideo(
-                    title="Chokhi Dhani Jaipur - Village Experience",
-                    video_id="chokhi_dhani",
-                    url="https://www.youtube.com/results?search_query=chokhi+dhani+jaipur+village+experience",
-                    channel="Food & Culture",
-                    description="Experience Rajasthani culture at Chokhi Dhani",
-                    thumbnail=""
-                )
-            ],
-            "nahargarh": [
-                YouTubeVideo(
-                    title="Nahargarh Fort Jaipur - Sunset Views",
-                    video_id="nahargarh_fort",
-                    url="https://www.youtube.com/results?search_query=nahargarh+fort+jaipur+sunset+views",
-                    channel="Fort Explorer",
-                    description="Best sunset views from Nahargarh Fort",
-                    thumbnail=""
-                )
-            ],
-            "day 1": [
-                YouTubeVideo(
-                    title="Jaipur Day 1 Itinerary - Amber Fort & More",
-                    video_id="jaipur_day1",
-                    url="https://www.youtube.com/results?search_query=jaipur+one+day+itinerary+amber+fort",
-                    channel="Travel Planner",
-                    description="Perfect Day 1 itinerary for Jaipur",
-                    thumbnail=""
-                )
-            ],
-            "day 2": [
-                YouTubeVideo(
-                    title="Jaipur Day 2 - Forts & Local Experience",
-                    video_id="jaipur_day2",
-                    url="https://www.youtube.com/results?search_query=jaipur+nahargarh+jaigarh+fort+tour",
-                    channel="Travel Guide",
-                    description="Explore Nahargarh and Jaigarh forts",
-                    thumbnail=""
-                )
-            ]
-        }
-
-        # Find matching videos
-        for keyword, videos in video_database.items():
-            if keyword in query_lower:
-                return videos
-
-        # Default Rajasthan videos
-        return [
-            YouTubeVideo(
-                title="Rajasthan Travel Guide - Complete Tour",
-                video_id="rajasthan_guide",
-                url="https://www.youtube.com/results?search_query=rajasthan+travel+guide+complete+tour",
-                channel="India Travel",
-                description="Complete guide to exploring Rajasthan",
-                thumbnail=""
-            ),
-            YouTubeVideo(
-                title="Best of Rajasthan - Top Places to Visit",
-                video_id="rajasthan_top",
-                url="https://www.youtube.com/results?search_query=rajasthan+best+places+to+visit",
-                channel="Travel India",
-                description="Top attractions in Rajasthan",
-                thumbnail=""
-            )
-        ]
+        return _lookup_videos(query.lower())
 
     def format_results(self, videos: List[YouTubeVideo]) -> str:
         """Format video results for display"""
         if not videos:
             return "No videos found."
 
-        result = "YouTube Videos:\n"
+        parts = ["YouTube Videos:\n"]
         for i, video in enumerate(videos, 1):
-            result += f"\n{i}. {video.title}\n"
-            result += f"   Channel: {video.channel}\n"
-            result += f"   Link: {video.url}\n"
+            parts.append(f"\n{i}. {video.title}\n   Channel: {video.channel}\n   Link: {video.url}\n")
+
+        return "".join(parts)
+
+
+# Shared by search_youtube_videos so its searches reuse one connection pool
+_default_tool: Optional[YouTubeSearchTool] = None
 
-        return result
+
+def _get_default_tool() -> YouTubeSearchTool:
+    """Get or create the shared YouTubeSearchTool"""
+    global _default_tool
+    if _default_tool is None:
+        _default_tool = YouTubeSearchTool()
+    return _default_tool
 
 
 def search_youtube_videos(query: str, max_results: int = 2) -> List[Dict[str, str]]:
     """
     Convenience function to search YouTube videos.
+    Blocks on the network: inside an event loop, use asearch_youtube_videos instead.
 
     Args:
         query: Search query
@@ -341,8 +394,7 @@ def search_youtube_videos(query: str, max_results: int = 2) -> List[Dict[str, st
     Returns:
         List of video dictionaries with title, url, channel, description
     """
-    tool = YouTubeSearchTool()
-    videos = tool.search(query, max_results)
+    videos = _get_default_tool().search(query, max_results)
 
     return [
         {
@@ -355,6 +407,11 @@ def search_youtube_videos(query: str, max_results: int = 2) -> List[Dict[str, st
     ]
 
 
+async def asearch_youtube_videos(query: str, max_results: int = 2) -> List[Dict[str, str]]:
+    """Async version of search_youtube_videos(); the blocking search runs in a worker thread"""
+    return await asyncio.to_thread(search_youtube_videos, query, max_results)
+
+
 if __name__ == "__main__":
     # Test the tool
     tool = YouTubeSearchTool()
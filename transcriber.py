@@ -1,26 +1,137 @@
 """
-Voice Transcription Module using OpenAI Whisper
+Voice Transcription Module using OpenAI Whisper (or local faster-whisper)
 Handles WhatsApp voice messages and converts them to text
 For Travel Business RAG System
 """
+import io
 import os
-import tempfile
+import hmac
+import time
+import asyncio
+import bisect
+import random
+import hashlib
+import logging
+import sqlite3
+import threading
 import httpx
-from typing import Optional, Tuple
-from openai import OpenAI
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from openai import AsyncOpenAI
+
+try:
+    # Optional local Whisper (CTranslate2) for TRANSCRIBE_BACKEND=faster_whisper
+    import faster_whisper
+except ImportError:
+    faster_whisper = None
+
+logger = logging.getLogger("travel_bot.voice")
+
+
+# ============================================================================
+# TRANSCRIPTION CACHE
+# ============================================================================
+
+# A WhatsApp media_id is a stable handle for one uploaded clip, and users
+# often forward or resend the same voice note, so finished transcriptions
+# are kept (media_id, language) -> text to skip the download and the paid
+# Whisper call entirely. Forwards of the same clip arrive under new media_ids,
+# so a second cache keyed by a digest of the downloaded bytes catches those
+# before Whisper is called.
+VOICE_CACHE_SIZE = int(os.getenv("VOICE_CACHE_SIZE", "1024"))
+VOICE_CACHE_TTL = int(os.getenv("VOICE_CACHE_TTL", "86400"))  # seconds
+
+# The in-process caches sit in front of a shared store so transcriptions
+# survive restarts and are shared by all workers: Redis when REDIS_URL is set,
+# otherwise a sqlite file at VOICE_CACHE_PATH ("" disables it)
+REDIS_URL = os.getenv("REDIS_URL")
+VOICE_CACHE_PATH = os.getenv("VOICE_CACHE_PATH", os.path.join(".cache", "voice_transcripts.sqlite3"))
+VOICE_REDIS_PREFIX = "vv:"
+
+# Caps concurrent Whisper uploads per transcriber so webhook bursts stay
+# inside the OpenAI rate limits
+WHISPER_CONCURRENCY = int(os.getenv("WHISPER_CONCURRENCY", "3"))
+
+# Clips smaller than this are accidental taps with no usable speech; they are
+# answered with an empty transcript instead of a Whisper call
+VOICE_MIN_BYTES = int(os.getenv("VOICE_MIN_BYTES", "2000"))
+
+# Upper bounds (seconds) of the Whisper latency histogram reported by stats()
+WHISPER_LATENCY_BUCKETS = (0.1, 0.5, 1, 2, 5, 10)
+
+# Transcription backend: "openai" (hosted Whisper API) or "faster_whisper"
+# (local int8 CTranslate2 model, no network hop or per-minute fee)
+TRANSCRIBE_BACKEND = os.getenv("TRANSCRIBE_BACKEND", "openai")
+
+FW_MODEL = os.getenv("FW_MODEL", "small")
+FW_DEVICE = os.getenv("FW_DEVICE", "auto")
+FW_COMPUTE_TYPE = os.getenv("FW_COMPUTE_TYPE", "int8")  # "int8_float16" on GPU
+FW_BATCH_SIZE = int(os.getenv("FW_BATCH_SIZE", "8"))  # segments decoded together; 1 disables batching
+
+
+# Transient failures (transport errors, 429, 5xx) are retried in-process on
+# the pooled connection rather than failing the webhook and redoing it all
+MAX_ATTEMPTS = 3
+BACKOFF_BASE = 0.5  # seconds
+BACKOFF_MAX = 4.0
+
+
+def _is_retryable(status_code: int) -> bool:
+    return status_code == 429 or status_code >= 500
+
+
+def _backoff(attempt: int) -> float:
+    """Full-jitter delay before retry number attempt + 1"""
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+# Content types for uploads, by extension, so the SDK never has to guess
+AUDIO_MIME_TYPES = {
+    ".ogg": "audio/ogg",
+    ".opus": "audio/ogg",
+    ".mp3": "audio/mpeg",
+    ".m4a": "audio/mp4",
+    ".mp4": "audio/mp4",
+    ".aac": "audio/aac",
+    ".amr": "audio/amr",
+    ".wav": "audio/wav",
+    ".webm": "audio/webm",
+}
+
+
+def _audio_mime_type(filename: str) -> str:
+    return AUDIO_MIME_TYPES.get(os.path.splitext(filename)[1].lower(), "application/octet-stream")
+
+
+# One AsyncOpenAI client (and so one connection pool) per API key, shared by
+# every transcriber in the process
+_openai_clients: Dict[str, AsyncOpenAI] = {}
+_openai_clients_lock = threading.Lock()
+
+
+def _get_openai_client(api_key: str) -> AsyncOpenAI:
+    with _openai_clients_lock:
+        client = _openai_clients.get(api_key)
+        if client is None:
+            # The SDK already retries 429, 5xx, timeouts and connection errors with backoff
+            client = AsyncOpenAI(api_key=api_key, max_retries=MAX_ATTEMPTS - 1)
+            _openai_clients[api_key] = client
+        return client
 
 
 class WhisperTranscriber:
     """
     Transcribes audio files using OpenAI Whisper API.
     Supports WhatsApp voice messages (OGG/Opus format).
+    Calls are async so a slow transcription never blocks the event loop.
     """
 
     def __init__(self, openai_api_key: str, model: str = "whisper-1"):
-        self.client = OpenAI(api_key=openai_api_key)
+        self.client = _get_openai_client(openai_api_key)
         self.model = model
+        self._semaphore = asyncio.Semaphore(WHISPER_CONCURRENCY)
 
-    def transcribe_file(self, file_path: str, language: str = "en") -> Tuple[str, Optional[str]]:
+    async def transcribe_file(self, file_path: str, language: str = "en") -> Tuple[str, Optional[str]]:
         """
         Transcribe an audio file to text.
 
@@ -33,17 +144,18 @@ class WhisperTranscriber:
         """
         try:
             with open(file_path, "rb") as audio_file:
-                response = self.client.audio.transcriptions.create(
-                    model=self.model,
-                    file=audio_file,
-                    language=language,
-                    response_format="text"
-                )
+                async with self._semaphore:
+                    response = await self.client.audio.transcriptions.create(
+                        model=self.model,
+                        file=audio_file,
+                        language=language,
+                        response_format="text"
+                    )
             return response, None
         except Exception as e:
             return "", f"Transcription error: {str(e)}"
 
-    def transcribe_bytes(self, audio_bytes: bytes, filename: str = "audio.ogg", language: str = "en") -> Tuple[str, Optional[str]]:
+    async def transcribe_bytes(self, audio_bytes: bytes, filename: str = "audio.ogg", language: str = "en") -> Tuple[str, Optional[str]]:
         """
         Transcribe audio bytes to text.
 
@@ -56,22 +168,178 @@ class WhisperTranscriber:
             Tuple of (transcribed_text, error_message)
         """
         try:
-            # Create a temporary file
-            suffix = os.path.splitext(filename)[1] or ".ogg"
-            with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as temp_file:
-                temp_file.write(audio_bytes)
-                temp_path = temp_file.name
-
-            try:
-                result, error = self.transcribe_file(temp_path, language)
-                return result, error
-            finally:
-                # Clean up temp file
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
+            # Upload straight from memory; the filename tells the API the format
+            async with self._semaphore:
+                response = await self.client.audio.transcriptions.create(
+                    model=self.model,
+                    file=(filename, io.BytesIO(audio_bytes), _audio_mime_type(filename)),
+                    language=language,
+                    response_format="text"
+                )
+            return response, None
+        except Exception as e:
+            return "", f"Transcription error: {str(e)}"
+
 
+class LocalWhisperTranscriber:
+    """
+    Transcribes audio with a local faster-whisper model.
+    Same interface as WhisperTranscriber; decoding runs in a worker thread,
+    and the hosted API is used as a fallback when one is given.
+    """
+
+    def __init__(
+        self,
+        model: str = FW_MODEL,
+        device: str = FW_DEVICE,
+        compute_type: str = FW_COMPUTE_TYPE,
+        batch_size: int = FW_BATCH_SIZE,
+        fallback: Optional[WhisperTranscriber] = None
+    ):
+        if faster_whisper is None:
+            raise ImportError("TRANSCRIBE_BACKEND=faster_whisper requires faster-whisper (pip install faster-whisper)")
+        # Loaded once; the handler is built at startup, not per message
+        self._model = faster_whisper.WhisperModel(model, device=device, compute_type=compute_type)
+        self._batched = None
+        if batch_size > 1 and hasattr(faster_whisper, "BatchedInferencePipeline"):
+            self._batched = faster_whisper.BatchedInferencePipeline(model=self._model)
+        self.batch_size = batch_size
+        self.fallback = fallback
+        self._semaphore = asyncio.Semaphore(WHISPER_CONCURRENCY)
+
+    def _transcribe_sync(self, audio, language: str) -> str:
+        if self._batched is not None:
+            segments, _ = self._batched.transcribe(audio, language=language, beam_size=1, batch_size=self.batch_size)
+        else:
+            segments, _ = self._model.transcribe(audio, language=language, beam_size=1, vad_filter=True)
+        # segments is lazy; decoding happens while it is consumed
+        return "".join(segment.text for segment in segments).strip()
+
+    async def _transcribe(self, audio, language: str) -> Tuple[str, Optional[str]]:
+        try:
+            async with self._semaphore:
+                return await asyncio.to_thread(self._transcribe_sync, audio, language), None
         except Exception as e:
-            return "", f"Error processing audio: {str(e)}"
+            return "", f"Transcription error: {str(e)}"
+
+    async def transcribe_file(self, file_path: str, language: str = "en") -> Tuple[str, Optional[str]]:
+        """Transcribe an audio file to text. Returns (transcribed_text, error_message)"""
+        text, error = await self._transcribe(file_path, language)
+        if error and self.fallback is not None:
+            return await self.fallback.transcribe_file(file_path, language)
+        return text, error
+
+    async def transcribe_bytes(self, audio_bytes: bytes, filename: str = "audio.ogg", language: str = "en") -> Tuple[str, Optional[str]]:
+        """Transcribe audio bytes to text. Returns (transcribed_text, error_message)"""
+        text, error = await self._transcribe(io.BytesIO(audio_bytes), language)
+        if error and self.fallback is not None:
+            return await self.fallback.transcribe_bytes(audio_bytes, filename, language)
+        return text, error
+
+
+def create_transcriber(openai_api_key: Optional[str], backend: str = TRANSCRIBE_BACKEND):
+    """Transcriber by backend name: 'openai' or 'faster_whisper'"""
+    if backend == "openai":
+        return WhisperTranscriber(openai_api_key)
+    if backend == "faster_whisper":
+        fallback = WhisperTranscriber(openai_api_key) if openai_api_key else None
+        return LocalWhisperTranscriber(fallback=fallback)
+    raise ValueError(f"Unknown transcription backend: {backend!r} (expected 'openai' or 'faster_whisper')")
+
+
+# ============================================================================
+# SHARED CACHE
+# ============================================================================
+
+_redis_client = None
+_shared_cache_db: Optional[sqlite3.Connection] = None
+_shared_cache_lock = threading.Lock()
+
+
+def _get_redis():
+    """Get the shared async Redis client (only used when REDIS_URL is set)"""
+    global _redis_client
+    if _redis_client is None:
+        import redis.asyncio
+        _redis_client = redis.asyncio.Redis.from_url(REDIS_URL)
+    return _redis_client
+
+
+def _get_shared_cache_db() -> Optional[sqlite3.Connection]:
+    """Open the sqlite cache on first use (None when disabled or unavailable)"""
+    global _shared_cache_db
+    if _shared_cache_db is None and VOICE_CACHE_PATH:
+        try:
+            os.makedirs(os.path.dirname(VOICE_CACHE_PATH) or ".", exist_ok=True)
+            _shared_cache_db = sqlite3.connect(VOICE_CACHE_PATH, check_same_thread=False)
+            _shared_cache_db.execute(
+                "CREATE TABLE IF NOT EXISTS transcripts (key TEXT PRIMARY KEY, expires REAL NOT NULL, text TEXT NOT NULL)"
+            )
+        except sqlite3.Error as e:
+            logger.warning("Voice disk cache disabled: %s", e)
+            return None
+    return _shared_cache_db
+
+
+def _disk_get(key: str) -> Optional[str]:
+    with _shared_cache_lock:
+        db = _get_shared_cache_db()
+        if db is None:
+            return None
+        try:
+            row = db.execute("SELECT expires, text FROM transcripts WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Voice disk cache read failed: %s", e)
+            return None
+    if row is None or row[0] <= time.time():
+        return None
+    return row[1]
+
+
+def _disk_put(key: str, text: str):
+    with _shared_cache_lock:
+        db = _get_shared_cache_db()
+        if db is None:
+            return
+        try:
+            with db:
+                db.execute(
+                    "INSERT OR REPLACE INTO transcripts (key, expires, text) VALUES (?, ?, ?)",
+                    (key, time.time() + VOICE_CACHE_TTL, text)
+                )
+        except sqlite3.Error as e:
+            logger.warning("Voice disk cache write failed: %s", e)
+
+
+async def _shared_get(key: str) -> Optional[str]:
+    if REDIS_URL:
+        try:
+            value = await _get_redis().get(VOICE_REDIS_PREFIX + key)
+        except Exception as e:
+            logger.warning("Voice Redis cache read failed: %s", e)
+            return None
+        return value.decode("utf-8") if value is not None else None
+
+    if not VOICE_CACHE_PATH:
+        return None
+    # Blocking sqlite I/O (and its lock) runs in a worker thread, off the event loop
+    return await asyncio.to_thread(_disk_get, key)
+
+
+async def _shared_put(key: str, text: str):
+    if REDIS_URL:
+        try:
+            await _get_redis().setex(VOICE_REDIS_PREFIX + key, VOICE_CACHE_TTL, text)
+        except Exception as e:
+            logger.warning("Voice Redis cache write failed: %s", e)
+        return
+
+    if VOICE_CACHE_PATH:
+        await asyncio.to_thread(_disk_put, key, text)
+
+
+# Read size for streamed media downloads
+MEDIA_CHUNK_SIZE = 64 * 1024
 
 
 class WhatsAppAudioDownloader:
@@ -79,14 +347,46 @@ class WhatsAppAudioDownloader:
     Downloads audio files from WhatsApp Cloud API.
     """
 
+    GRAPH_MEDIA_URL = "https://graph.facebook.com/v18.0/{media_id}"
+
     def __init__(self, access_token: str, app_secret: str):
         self.access_token = access_token
         self.app_secret = app_secret
+        # Token and secret are fixed for the downloader's lifetime, so the proof and headers are too
+        self._appsecret_proof = self._generate_appsecret_proof()
+        self._auth_headers = {"Authorization": f"Bearer {access_token}"}
+        self._params = {"appsecret_proof": self._appsecret_proof}
+        # Pooled HTTP/2 client shared by the media-URL lookup and the download,
+        # so both requests ride kept-alive, multiplexed connections to the
+        # Graph API and CDN; the bearer header is a client default
+        self._client: Optional[httpx.AsyncClient] = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get or create the pooled client (created lazily, inside the event loop)"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                headers=self._auth_headers,
+                timeout=httpx.Timeout(30.0),
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=60),
+                follow_redirects=True
+            )
+        return self._client
+
+    async def aclose(self):
+        """Close the pooled client"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def __aenter__(self) -> "WhatsAppAudioDownloader":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
 
     def _generate_appsecret_proof(self) -> str:
         """Generate appsecret_proof for API authentication"""
-        import hmac
-        import hashlib
         return hmac.new(
             self.app_secret.encode('utf-8'),
             self.access_token.encode('utf-8'),
@@ -103,25 +403,22 @@ class WhatsAppAudioDownloader:
         Returns:
             Tuple of (media_url, error_message)
         """
-        url = f"https://graph.facebook.com/v18.0/{media_id}"
-        proof = self._generate_appsecret_proof()
-
-        headers = {
-            "Authorization": f"Bearer {self.access_token}"
-        }
-
+        url = self.GRAPH_MEDIA_URL.format(media_id=media_id)
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{url}?appsecret_proof={proof}",
-                    headers=headers
-                )
-
-                if response.status_code == 200:
-                    data = response.json()
-                    return data.get("url"), None
+            for attempt in range(MAX_ATTEMPTS):
+                final = attempt == MAX_ATTEMPTS - 1
+                try:
+                    response = await self._get_client().get(url, params=self._params)
+                except httpx.TransportError:
+                    if final:
+                        raise
                 else:
-                    return None, f"Failed to get media URL: {response.status_code} - {response.text}"
+                    if response.status_code == 200:
+                        data = response.json()
+                        return data.get("url"), None
+                    if final or not _is_retryable(response.status_code):
+                        return None, f"Failed to get media URL: {response.status_code} - {response.text}"
+                await asyncio.sleep(_backoff(attempt))
 
         except Exception as e:
             return None, f"Error getting media URL: {str(e)}"
@@ -136,22 +433,23 @@ class WhatsAppAudioDownloader:
         Returns:
             Tuple of (audio_bytes, error_message)
         """
-        headers = {
-            "Authorization": f"Bearer {self.access_token}"
-        }
-
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    media_url,
-                    headers=headers,
-                    follow_redirects=True
-                )
-
-                if response.status_code == 200:
-                    return response.content, None
-                else:
-                    return None, f"Failed to download media: {response.status_code}"
+            for attempt in range(MAX_ATTEMPTS):
+                final = attempt == MAX_ATTEMPTS - 1
+                try:
+                    async with self._get_client().stream("GET", media_url) as response:
+                        if response.status_code == 200:
+                            # Copy chunks as they arrive instead of letting httpx buffer and re-join the body
+                            buffer = io.BytesIO()
+                            async for chunk in response.aiter_bytes(MEDIA_CHUNK_SIZE):
+                                buffer.write(chunk)
+                            return buffer.getvalue(), None
+                        if final or not _is_retryable(response.status_code):
+                            return None, f"Failed to download media: {response.status_code}"
+                except httpx.TransportError:
+                    if final:
+                        raise
+                await asyncio.sleep(_backoff(attempt))
 
         except Exception as e:
             return None, f"Error downloading media: {str(e)}"
@@ -186,11 +484,97 @@ class VoiceMessageHandler:
         openai_api_key: str,
         whatsapp_access_token: str,
         whatsapp_app_secret: str,
-        default_language: str = "en"
+        default_language: str = "en",
+        transcribe_backend: str = TRANSCRIBE_BACKEND
     ):
-        self.transcriber = WhisperTranscriber(openai_api_key)
+        self.transcriber = create_transcriber(openai_api_key, transcribe_backend)
         self.downloader = WhatsAppAudioDownloader(whatsapp_access_token, whatsapp_app_secret)
         self.default_language = default_language
+        self._cache: "OrderedDict[Tuple[str, str], Tuple[float, str]]" = OrderedDict()
+        self._audio_cache: "OrderedDict[Tuple[int, bytes, str], Tuple[float, str]]" = OrderedDict()
+        # (media_id, lang) -> future of the pipeline already running for it, so
+        # webhook retries of a clip share one download and Whisper call
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        # Counters for sizing the caches; reported by stats()
+        self._cache_hits = 0
+        self._audio_cache_hits = 0
+        self._shared_cache_hits = 0
+        self._cache_misses = 0
+        self._inflight_coalesced = 0
+        self._whisper_calls = 0
+        self._whisper_errors = 0
+        self._whisper_seconds = 0.0
+        self._whisper_latency_counts = [0] * (len(WHISPER_LATENCY_BUCKETS) + 1)
+
+    @staticmethod
+    def _cache_get(cache: OrderedDict, key: tuple) -> Optional[str]:
+        entry = cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] <= time.monotonic():
+            del cache[key]
+            return None
+        cache.move_to_end(key)
+        return entry[1]
+
+    @staticmethod
+    def _cache_put(cache: OrderedDict, key: tuple, text: str):
+        cache[key] = (time.monotonic() + VOICE_CACHE_TTL, text)
+        cache.move_to_end(key)
+        if len(cache) > VOICE_CACHE_SIZE:
+            cache.popitem(last=False)
+
+    @staticmethod
+    def _audio_key(audio_bytes: bytes, lang: str) -> Tuple[int, bytes, str]:
+        """Content key for a clip: its length plus a 128-bit BLAKE2b digest"""
+        return (len(audio_bytes), hashlib.blake2b(audio_bytes, digest_size=16).digest(), lang)
+
+    @staticmethod
+    def _shared_key(key: tuple) -> str:
+        """Shared-store key for a media key (media_id, lang) or an audio key (length, digest, lang)"""
+        if len(key) == 2:
+            return f"m:{key[0]}:{key[1]}"
+        return f"a:{key[0]}:{key[1].hex()}:{key[2]}"
+
+    async def _lookup(self, cache: OrderedDict, key: tuple) -> Optional[str]:
+        """In-process cache first, then the shared store (filling the local cache on a hit)"""
+        text = self._cache_get(cache, key)
+        if text is None:
+            text = await _shared_get(self._shared_key(key))
+            if text is not None:
+                self._shared_cache_hits += 1
+                self._cache_put(cache, key, text)
+        return text
+
+    async def _store(self, cache: OrderedDict, key: tuple, text: str):
+        self._cache_put(cache, key, text)
+        await _shared_put(self._shared_key(key), text)
+
+    async def aclose(self):
+        """Release pooled connections"""
+        await self.downloader.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache and Whisper statistics"""
+        # Cumulative counts per upper bound, as in a Prometheus histogram
+        latency, total = {}, 0
+        for bound, count in zip(WHISPER_LATENCY_BUCKETS + ("+Inf",), self._whisper_latency_counts):
+            total += count
+            latency[f"le_{bound}"] = total
+        return {
+            "backend": type(self.transcriber).__name__,
+            "cache_size": len(self._cache),
+            "audio_cache_size": len(self._audio_cache),
+            "cache_hits": self._cache_hits,
+            "audio_cache_hits": self._audio_cache_hits,
+            "shared_cache_hits": self._shared_cache_hits,
+            "cache_misses": self._cache_misses,
+            "inflight_coalesced": self._inflight_coalesced,
+            "whisper_calls": self._whisper_calls,
+            "whisper_errors": self._whisper_errors,
+            "whisper_seconds": round(self._whisper_seconds, 3),
+            "whisper_latency_seconds": latency
+        }
 
     async def process_voice_message(
         self,
@@ -209,23 +593,88 @@ class VoiceMessageHandler:
         """
         lang = language or self.default_language
 
-        print(f"[Voice] Downloading audio (media_id: {media_id})...")
+        key = (media_id, lang)
+        cached = self._cache_get(self._cache, key)
+        if cached is not None:
+            logger.debug("Voice cache hit (media_id: %s)", media_id)
+            self._cache_hits += 1
+            return cached, None
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            logger.debug("Voice joining in-flight transcription (media_id: %s)", media_id)
+            self._inflight_coalesced += 1
+            # Shielded so a waiter being cancelled doesn't cancel the result for everyone else
+            return await asyncio.shield(inflight)
+
+        self._cache_misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._download_and_transcribe(media_id, lang, key)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            # Waiters get the leader's error; retrieve it here so a future nobody
+            # joined doesn't log "exception was never retrieved"
+            future.set_exception(exc)
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        future.set_result(result)
+        return result
+
+    async def _download_and_transcribe(
+        self,
+        media_id: str,
+        lang: str,
+        key: Tuple[str, str]
+    ) -> Tuple[str, Optional[str]]:
+        """Cold path of process_voice_message: download, dedupe by content, transcribe"""
+        text = await self._lookup(self._cache, key)
+        if text is not None:
+            logger.debug("Voice shared cache hit (media_id: %s)", media_id)
+            return text, None
+
+        logger.info("Voice downloading audio (media_id: %s)", media_id)
 
         # Download audio
         audio_bytes, error = await self.downloader.download_audio(media_id)
         if error:
-            print(f"[Voice] Download error: {error}")
+            logger.warning("Voice download error: %s", error)
             return "", error
 
-        print(f"[Voice] Downloaded {len(audio_bytes)} bytes, transcribing...")
+        if len(audio_bytes) < VOICE_MIN_BYTES:
+            logger.info("Voice clip too short to transcribe (%d bytes)", len(audio_bytes))
+            return "", None
+
+        audio_key = self._audio_key(audio_bytes, lang)
+        cached = await self._lookup(self._audio_cache, audio_key)
+        if cached is not None:
+            logger.debug("Voice audio already transcribed under another media_id (media_id: %s)", media_id)
+            self._audio_cache_hits += 1
+            await self._store(self._cache, key, cached)
+            return cached, None
+
+        logger.info("Voice downloaded %d bytes, transcribing", len(audio_bytes))
 
         # Transcribe
-        text, error = self.transcriber.transcribe_bytes(audio_bytes, "voice.ogg", lang)
+        started = time.perf_counter()
+        text, error = await self.transcriber.transcribe_bytes(audio_bytes, "voice.ogg", lang)
+        elapsed = time.perf_counter() - started
+        self._whisper_calls += 1
+        self._whisper_seconds += elapsed
+        self._whisper_latency_counts[bisect.bisect_left(WHISPER_LATENCY_BUCKETS, elapsed)] += 1
         if error:
-            print(f"[Voice] Transcription error: {error}")
+            self._whisper_errors += 1
+            logger.warning("Voice transcription error: %s", error)
             return "", error
 
-        print(f"[Voice] Transcribed: '{text[:100]}...'")
+        logger.info("Voice transcribed: %.100s", text)
+        await self._store(self._cache, key, text)
+        await self._store(self._audio_cache, audio_key, text)
         return text, None
 
 
@@ -250,12 +699,12 @@ if __name__ == "__main__":
     load_dotenv()
 
     api_key = os.getenv("OPENAI_API_KEY")
-    transcriber = WhisperTranscriber(api_key)
+    transcriber = create_transcriber(api_key)
 
     if len(sys.argv) > 1:
         file_path = sys.argv[1]
         print(f"Transcribing: {file_path}")
-        text, error = transcriber.transcribe_file(file_path)
+        text, error = asyncio.run(transcriber.transcribe_file(file_path))
         if error:
             print(f"Error: {error}")
         else: